@@ -0,0 +1,66 @@
+"""
+Throughput of AsyncEventSystem with a growing number of queue consumers.
+
+Every event is handled by one I/O-bound handler (an asyncio.sleep), spread over a
+number of topics, with and without per-topic ordering.
+
+Usage: python -m benchmarks.async_consumers [--events 2000] [--topics 16] [--latency 0.001]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict
+
+from event_systems.instanced.async_event_system import AsyncEventSystem
+
+
+async def measure_throughput(
+    consumers: int,
+    preserve_topic_order: bool,
+    events: int,
+    topics: int,
+    latency: float,
+) -> float:
+    es = AsyncEventSystem(
+        consumers=consumers,
+        preserve_topic_order=preserve_topic_order,
+    )
+
+    async def io_bound_handler(data: Dict[str, Any]) -> None:
+        await asyncio.sleep(latency)
+
+    for topic in range(topics):
+        await es.subscribe(f"topic_{topic}", io_bound_handler)
+    await es.start()
+
+    start = time.perf_counter()
+    for i in range(events):
+        await es.post(f"topic_{i % topics}", {"i": i})
+    await es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    await es.stop()
+    return events / elapsed
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"{'consumers':>9} {'ordered':>8} {'events/s':>10}")
+    for consumers in (1, 4, 16):
+        for ordered in (False, True):
+            throughput = await measure_throughput(
+                consumers, ordered, args.events, args.topics, args.latency
+            )
+            print(f"{consumers:>9} {str(ordered):>8} {throughput:>10,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.001)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Handler invocations and drain time for bursts of state updates, with and without
+coalescing.
+
+Posts a burst of price ticks for a number of symbols to ThreadedEventSystem and
+AsyncEventSystem, once plainly and once with the symbol as coalesce key, and waits
+until all events are processed. The handler takes a few microseconds, like a cheap
+state update. Reports handler invocations and the time from the first post until
+the queue is drained.
+
+Usage: python -m benchmarks.coalescing [--ticks 50000] [--symbols 20]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Tuple
+
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+class PriceBook:
+    def __init__(self) -> None:
+        self.prices: Dict[str, int] = {}
+        self.invocations = 0
+
+    def update(self, data: Dict[str, Any]) -> None:
+        self.invocations += 1
+        self.prices[data["symbol"]] = data["price"]
+        sum(range(50))  # A few microseconds of work.
+
+
+def threaded_run(ticks: int, symbols: int, coalesce: bool) -> Tuple[int, float]:
+    book = PriceBook()
+    es = ThreadedEventSystem()
+    es.subscribe("price", book.update)
+    es.start()
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        symbol = f"S{tick % symbols}"
+        es.post(
+            "price",
+            {"symbol": symbol, "price": tick},
+            coalesce_key=symbol if coalesce else None,
+        )
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    return book.invocations, elapsed
+
+
+async def async_run(ticks: int, symbols: int, coalesce: bool) -> Tuple[int, float]:
+    book = PriceBook()
+    es = AsyncEventSystem()
+    await es.subscribe("price", book.update)
+    await es.start()
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        symbol = f"S{tick % symbols}"
+        await es.post(
+            "price",
+            {"symbol": symbol, "price": tick},
+            coalesce_key=symbol if coalesce else None,
+        )
+    await es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    await es.stop()
+    return book.invocations, elapsed
+
+
+def run(ticks: int, symbols: int) -> None:
+    print(f"{'system':<10} {'mode':<10} {'invocations':>12} {'drain (ms)':>12}")
+    for coalesce in (False, True):
+        mode = "coalesced" if coalesce else "plain"
+        invocations, elapsed = threaded_run(ticks, symbols, coalesce)
+        print(f"{'threaded':<10} {mode:<10} {invocations:>12} {elapsed * 1e3:>12.1f}")
+    for coalesce in (False, True):
+        mode = "coalesced" if coalesce else "plain"
+        invocations, elapsed = asyncio.run(async_run(ticks, symbols, coalesce))
+        print(f"{'async':<10} {mode:<10} {invocations:>12} {elapsed * 1e3:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=50000)
+    parser.add_argument("--symbols", type=int, default=20)
+    args = parser.parse_args()
+    run(args.ticks, args.symbols)
+
+
+if __name__ == "__main__":
+    main()
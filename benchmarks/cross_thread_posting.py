@@ -0,0 +1,96 @@
+"""
+Throughput of events posted into AsyncEventSystem from other threads.
+
+A number of producer threads post events into an AsyncEventSystem running on the
+main loop, once with one `run_coroutine_threadsafe(es.post(...))` per event, and
+once with `post_threadsafe()` and `post_many_threadsafe()`, which hand events to
+the loop with one wakeup per batch. Reports events per second from the first post
+until every event has been handled.
+
+Usage: python -m benchmarks.cross_thread_posting [--events 100000] [--threads 4] [--batch 100]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from event_systems.base.handler import Execution
+from event_systems.instanced.async_event_system import AsyncEventSystem
+
+
+class Counter:
+    def __init__(self, target: int) -> None:
+        self.count = 0
+        self.target = target
+        self.done = asyncio.Event()
+
+    def handle(self, data: Dict[str, Any]) -> None:
+        self.count += 1
+        if self.count == self.target:
+            self.done.set()
+
+
+async def run_mode(events: int, threads: int, batch: int, mode: str) -> float:
+    loop = asyncio.get_running_loop()
+    counter = Counter(events)
+    es = AsyncEventSystem()
+    await es.subscribe("tick", counter.handle, execution=Execution.INLINE)
+    await es.start()
+    per_thread = events // threads
+
+    def coroutine_threadsafe() -> None:
+        for n in range(per_thread):
+            asyncio.run_coroutine_threadsafe(es.post("tick", {"n": n}), loop)
+
+    def post_threadsafe() -> None:
+        for n in range(per_thread):
+            es.post_threadsafe("tick", {"n": n})
+
+    def post_many_threadsafe() -> None:
+        for start in range(0, per_thread, batch):
+            es.post_many_threadsafe(
+                ("tick", {"n": n}) for n in range(start, min(start + batch, per_thread))
+            )
+
+    producers: Dict[str, Callable[[], None]] = {
+        "run_coroutine_threadsafe": coroutine_threadsafe,
+        "post_threadsafe": post_threadsafe,
+        "post_many_threadsafe": post_many_threadsafe,
+    }
+    workers: List[threading.Thread] = [
+        threading.Thread(target=producers[mode]) for _ in range(threads)
+    ]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    await counter.done.wait()
+    elapsed = time.perf_counter() - start
+
+    for worker in workers:
+        worker.join()
+    await es.stop()
+    return events / elapsed
+
+
+def run(events: int, threads: int, batch: int) -> None:
+    events -= events % threads
+    print(f"{'mode':<26} {'events/s':>12}")
+    for mode in ("run_coroutine_threadsafe", "post_threadsafe", "post_many_threadsafe"):
+        rate = asyncio.run(run_mode(events, threads, batch, mode))
+        print(f"{mode:<26} {rate:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+    run(args.events, args.threads, args.batch)
+
+
+if __name__ == "__main__":
+    main()
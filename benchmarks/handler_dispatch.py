@@ -0,0 +1,205 @@
+"""
+Per-invocation cost of running a handler, before and after handlers were classified
+once at subscription time.
+
+The `per_call` scenarios check every handler before calling it, like dispatch used
+to: `callable()` and `asyncio.iscoroutinefunction()` for sync handlers on the
+threaded workers, `iscoroutinefunction()` for coroutine handlers on the async
+systems. The `compiled` scenarios call the runners `subscribe()` compiles today.
+The `threaded` and `async` scenarios post events with several no-op handlers
+through the event systems themselves, and divide the time by the handler calls.
+
+Reported per scenario: nanoseconds per handler invocation. Results can be stored
+and compared like those of `benchmarks.suite`.
+
+Usage:
+    python -m benchmarks.handler_dispatch [--calls 200000] [--handlers 5] [--json out.json]
+    python -m benchmarks.handler_dispatch --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import time
+from typing import Any, Callable, Dict, List, cast
+
+from event_systems.base.handler import (
+    Execution,
+    Handler,
+    compile_async_runner,
+    compile_sync_runner,
+)
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def sync_handler(data: Dict[str, Any]) -> None:
+    pass
+
+
+async def async_handler(data: Dict[str, Any]) -> None:
+    pass
+
+
+def run_classified_per_call(handler: Handler, event_data: Dict[str, Any]) -> None:
+    # What the threaded workers did for every handler of every event.
+    if not callable(handler):
+        raise TypeError("Handler is not callable.")
+    if asyncio.iscoroutinefunction(handler):
+        raise AssertionError("Only sync handlers are measured here.")
+    handler(event_data)
+
+
+async def await_classified_per_call(handler: Handler, event_data: Dict[str, Any]) -> None:
+    # What the async systems did for every handler of every event.
+    if asyncio.iscoroutinefunction(handler):
+        await handler(event_data)
+    else:
+        await asyncio.to_thread(cast(Callable[[Any], Any], handler), event_data)
+
+
+def sync_per_call(calls: int) -> float:
+    data: Dict[str, Any] = {}
+    start = time.perf_counter()
+    for _ in range(calls):
+        run_classified_per_call(sync_handler, data)
+    return time.perf_counter() - start
+
+
+def sync_compiled(calls: int) -> float:
+    runner = compile_sync_runner(sync_handler, asyncio.run)
+    data: Dict[str, Any] = {}
+    start = time.perf_counter()
+    for _ in range(calls):
+        runner(data)
+    return time.perf_counter() - start
+
+
+def async_per_call(calls: int) -> float:
+    async def run() -> float:
+        data: Dict[str, Any] = {}
+        start = time.perf_counter()
+        for _ in range(calls):
+            await await_classified_per_call(async_handler, data)
+        return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def async_compiled(calls: int) -> float:
+    async def run() -> float:
+        runner = compile_async_runner(async_handler)
+        data: Dict[str, Any] = {}
+        start = time.perf_counter()
+        for _ in range(calls):
+            await runner(data)
+        return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def threaded_system(calls: int, handlers: int) -> float:
+    es = ThreadedEventSystem()
+    for _ in range(handlers):
+        es.subscribe("some_event", sync_handler, Execution.INLINE)
+    es.start()
+    start = time.perf_counter()
+    for _ in range(calls // handlers):
+        es.post("some_event", {})
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+    es.stop()
+    return elapsed
+
+
+def async_system(calls: int, handlers: int) -> float:
+    async def run() -> float:
+        es = AsyncEventSystem()
+        await es.start()
+        for _ in range(handlers):
+            await es.subscribe("some_event", async_handler)
+        start = time.perf_counter()
+        for _ in range(calls // handlers):
+            await es.post("some_event", {})
+        await es.process_all_events()
+        elapsed = time.perf_counter() - start
+        await es.stop()
+        return elapsed
+
+    return asyncio.run(run())
+
+
+def run(calls: int, handlers: int) -> List[Dict[str, Any]]:
+    scenarios: Dict[str, Callable[[], float]] = {
+        "sync/per_call": lambda: sync_per_call(calls),
+        "sync/compiled": lambda: sync_compiled(calls),
+        "async/per_call": lambda: async_per_call(calls),
+        "async/compiled": lambda: async_compiled(calls),
+        "threaded/system": lambda: threaded_system(calls, handlers),
+        "async/system": lambda: async_system(calls, handlers),
+    }
+    results = []
+    for scenario, measure in scenarios.items():
+        invocations = calls if "system" not in scenario else calls // handlers * handlers
+        results.append(
+            {
+                "scenario": scenario,
+                "calls": invocations,
+                "ns_per_call": measure() / invocations * 1e9,
+            }
+        )
+    return results
+
+
+def print_results(
+    results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]
+) -> None:
+    header = f"{'scenario':<20} {'ns/call':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for result in results:
+        line = f"{result['scenario']:<20} {result['ns_per_call']:>10,.0f}"
+        if base := baseline.get(result["scenario"]):
+            line += f" {base['ns_per_call'] / result['ns_per_call']:>7.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--handlers", type=int, default=5)
+    parser.add_argument("--json", help="Write machine-readable results to this file.")
+    parser.add_argument(
+        "--compare", help="Results file of an earlier run to compare speed with."
+    )
+    args = parser.parse_args()
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = {r["scenario"]: r for r in json.load(file)["results"]}
+
+    results = run(args.calls, args.handlers)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Throughput cost of journaling posted events, per fsync policy.
+
+Posts events from one or more threads into ThreadedEventSystem for a fixed time,
+without a journal and with a journal under each `Fsync` policy, and reports events
+per second until all of them have been handled. With several posting threads,
+`Fsync.ALWAYS` commits posts that arrive during an fsync together, so it issues
+fewer fsyncs than there are events. Pass `--directory` to measure a specific disk.
+
+Usage: python -m benchmarks.journal_fsync [--seconds 2.0] [--posters 1 4] [--directory DIR]
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from event_systems.base.handler import Execution
+from event_systems.base.journal import Fsync, Journal
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def handle(self, data: Dict[str, Any]) -> None:
+        self.count += 1
+
+
+def measure(
+    fsync: Fsync | None, posters: int, seconds: float, directory: str | None
+) -> Tuple[float, int]:
+    with tempfile.TemporaryDirectory(dir=directory) as path:
+        journal = Journal(path, fsync) if fsync is not None else None
+        counter = Counter()
+        es = ThreadedEventSystem(journal=journal)
+        es.subscribe("tick", counter.handle, Execution.INLINE)
+        es.start()
+        deadline = time.perf_counter() + seconds
+
+        def post() -> None:
+            while time.perf_counter() < deadline:
+                es.post("tick", {"payload": "x" * 64})
+
+        threads = [threading.Thread(target=post) for _ in range(posters)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        es.process_all_events()
+        elapsed = time.perf_counter() - start
+        es.stop()
+        return counter.count / elapsed, journal.fsyncs if journal is not None else 0
+
+
+def run(seconds: float, posters: List[int], directory: str | None) -> None:
+    print(f"{'journal':<10} {'posters':>8} {'events/s':>12} {'fsyncs':>10}")
+    for count in posters:
+        for fsync in [None, Fsync.NEVER, Fsync.INTERVAL, Fsync.ALWAYS]:
+            rate, syncs = measure(fsync, count, seconds, directory)
+            label = fsync.value if fsync is not None else "none"
+            print(f"{label:<10} {count:>8} {rate:>12,.0f} {syncs:>10,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--posters", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--directory", default=None)
+    args = parser.parse_args()
+    run(args.seconds, args.posters, args.directory)
+
+
+if __name__ == "__main__":
+    main()
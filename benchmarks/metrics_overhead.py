@@ -0,0 +1,82 @@
+"""
+Throughput cost of enabling metrics.
+
+Posts the same batch of events to ThreadedEventSystem and AsyncEventSystem with
+`metrics` off and on, for a trivial sync handler, and reports events/s and the
+relative slowdown. The handler does no work, so this is the worst case: in real
+systems the overhead is a smaller share of the time spent per event.
+
+Usage: python -m benchmarks.metrics_overhead [--events 20000] [--repeats 3]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict
+
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def noop_handler(data: Dict[str, Any]) -> None:
+    pass
+
+
+def threaded_rate(metrics: bool, events: int) -> float:
+    es = ThreadedEventSystem(metrics=metrics)
+    es.subscribe("tick", noop_handler)
+    es.start()
+
+    start = time.perf_counter()
+    for i in range(events):
+        es.post("tick", {"i": i})
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    return events / elapsed
+
+
+async def async_rate(metrics: bool, events: int) -> float:
+    es = AsyncEventSystem(metrics=metrics)
+    await es.subscribe("tick", noop_handler)
+    await es.start()
+
+    start = time.perf_counter()
+    for i in range(events):
+        await es.post("tick", {"i": i})
+    await es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    await es.stop()
+    return events / elapsed
+
+
+def run(events: int, repeats: int) -> None:
+    print(f"{'system':<10} {'off (ev/s)':>12} {'on (ev/s)':>12} {'overhead':>10}")
+    for system in ("threaded", "async"):
+        rates: Dict[bool, float] = {}
+        for metrics in (False, True):
+            if system == "threaded":
+                samples = [threaded_rate(metrics, events) for _ in range(repeats)]
+            else:
+                samples = [
+                    asyncio.run(async_rate(metrics, events)) for _ in range(repeats)
+                ]
+            rates[metrics] = max(samples)
+        overhead = 1 - rates[True] / rates[False]
+        print(
+            f"{system:<10} {rates[False]:>12.0f} {rates[True]:>12.0f} {overhead:>10.1%}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.events, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
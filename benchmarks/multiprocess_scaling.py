@@ -0,0 +1,89 @@
+"""
+Throughput of CPU-bound handlers against the number of worker processes.
+
+Posts events to MultiprocessEventSystem with 1, 2, 4, ... worker processes, up to the
+number of CPUs, and to ThreadedEventSystem for comparison. Every event runs a handler
+which spends `--work` iterations of pure Python arithmetic and posts a reply, which
+the parent counts. Reports events per second until `process_all_events()` returns.
+
+Usage: python -m benchmarks.multiprocess_scaling [--events 20000] [--work 20000] [--max-processes 8]
+"""
+
+import argparse
+import functools
+import os
+import time
+from typing import Any, Dict, List
+
+from event_systems.instanced.multiprocess_event_system import (
+    MultiprocessEventSystem,
+    WorkerEventSystem,
+)
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def crunch(work: int, data: Dict[str, Any]) -> int:
+    return sum(i * i for i in range(work)) + data["n"]
+
+
+def worker_setup(work: int, es: WorkerEventSystem) -> None:
+    es.subscribe(
+        "job", lambda data: es.post("done", {"result": crunch(work, data)})
+    )
+
+
+def multiprocess_run(events: int, work: int, processes: int) -> float:
+    es = MultiprocessEventSystem(
+        functools.partial(worker_setup, work), processes=processes
+    )
+    done: List[int] = []
+    es.subscribe("done", lambda data: done.append(data["result"]))
+    es.start()
+
+    start = time.perf_counter()
+    for n in range(events):
+        es.post("job", {"n": n})
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    assert len(done) == events
+    return events / elapsed
+
+
+def threaded_run(events: int, work: int) -> float:
+    es = ThreadedEventSystem()
+    es.subscribe("job", functools.partial(crunch, work))
+    es.start()
+
+    start = time.perf_counter()
+    for n in range(events):
+        es.post("job", {"n": n})
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    return events / elapsed
+
+
+def run(events: int, work: int, max_processes: int) -> None:
+    print(f"{'system':<14} {'processes':>10} {'events/s':>12}")
+    print(f"{'threaded':<14} {1:>10} {threaded_run(events, work):>12.0f}")
+    processes = 1
+    while processes <= max_processes:
+        rate = multiprocess_run(events, work, processes)
+        print(f"{'multiprocess':<14} {processes:>10} {rate:>12.0f}")
+        processes *= 2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--work", type=int, default=20000)
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    run(args.events, args.work, args.max_processes)
+
+
+if __name__ == "__main__":
+    main()
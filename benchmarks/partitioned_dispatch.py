@@ -0,0 +1,67 @@
+"""
+Throughput of partitioned dispatch in ThreadedEventSystem.
+
+Posts events for a number of entities to a handler which blocks for a millisecond,
+like a small I/O call, and checks that every entity saw its events in order.
+Compares a single worker, the only ordered setup without partitions, with
+partitioned dispatch by entity on pools of increasing size.
+
+Usage: python -m benchmarks.partitioned_dispatch [--keys 16] [--events 1000]
+"""
+
+import argparse
+import threading
+import time
+from typing import Any, Dict, List
+
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def measure(keys: int, events: int, workers: int, partitioned: bool) -> float:
+    seen: Dict[int, List[int]] = {key: [] for key in range(keys)}
+    lock = threading.Lock()
+
+    def io_handler(data: Dict[str, Any]) -> None:
+        time.sleep(0.001)
+        with lock:
+            seen[data["key"]].append(data["sequence"])
+
+    es = ThreadedEventSystem(workers=workers)
+    es.subscribe("update", io_handler)
+    es.start()
+
+    start = time.perf_counter()
+    for sequence in range(events // keys):
+        for key in range(keys):
+            es.post(
+                "update",
+                {"key": key, "sequence": sequence},
+                partition_key=key if partitioned else None,
+            )
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+    es.stop()
+
+    ordered = all(sequences == sorted(sequences) for sequences in seen.values())
+    assert ordered, "Events of an entity were handled out of order."
+    return events / elapsed
+
+
+def run(keys: int, events: int) -> None:
+    print(f"{'setup':<28} {'events/s':>10}")
+    print(f"{'single worker':<28} {measure(keys, events, 1, False):>10.0f}")
+    for workers in (2, 4, 8, 16):
+        label = f"partitioned, {workers} workers"
+        print(f"{label:<28} {measure(keys, events, workers, True):>10.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=16)
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.keys, args.events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Enqueue and dequeue cost of the priority event queues compared with FIFO.
+
+Puts a number of events with random priorities into EventQueue and
+AsyncEventQueue and takes them all out again, in FIFO mode, with priorities, and
+with priorities plus aging. Reports nanoseconds per put and per get.
+
+Usage: python -m benchmarks.priority_queue [--events 100000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from event_systems.base.envelope import Envelope
+from event_systems.base.event_queue import AsyncEventQueue, EventQueue
+
+MODES: List[Tuple[str, Dict[str, Any]]] = [
+    ("fifo", {}),
+    ("priorities", {"priorities": True}),
+    ("priorities + aging", {"priorities": True, "aging": 1.0}),
+]
+
+
+def envelopes(events: int) -> List[Envelope]:
+    rng = random.Random(0)
+    return [Envelope("tick", {}, priority=rng.randrange(10)) for _ in range(events)]
+
+
+def threaded_costs(options: Dict[str, Any], batch: List[Envelope]) -> Tuple[float, float]:
+    queue = EventQueue(**options)
+    start = time.perf_counter()
+    for envelope in batch:
+        queue.put(envelope)
+    put_done = time.perf_counter()
+    for _ in batch:
+        queue.get()
+        queue.task_done()
+    get_done = time.perf_counter()
+    return (put_done - start) / len(batch), (get_done - put_done) / len(batch)
+
+
+async def async_costs(options: Dict[str, Any], batch: List[Envelope]) -> Tuple[float, float]:
+    queue = AsyncEventQueue(**options)
+    start = time.perf_counter()
+    for envelope in batch:
+        await queue.put(envelope)
+    put_done = time.perf_counter()
+    for _ in batch:
+        await queue.get()
+        queue.task_done()
+    get_done = time.perf_counter()
+    return (put_done - start) / len(batch), (get_done - put_done) / len(batch)
+
+
+def run(events: int) -> None:
+    batch = envelopes(events)
+    print(f"{'queue':<12} {'mode':<20} {'put (ns)':>10} {'get (ns)':>10}")
+    for label, options in MODES:
+        put, get = threaded_costs(options, batch)
+        print(f"{'threaded':<12} {label:<20} {put * 1e9:>10.0f} {get * 1e9:>10.0f}")
+    for label, options in MODES:
+        put, get = asyncio.run(async_costs(options, batch))
+        print(f"{'async':<12} {label:<20} {put * 1e9:>10.0f} {get * 1e9:>10.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100000)
+    run(parser.parse_args().events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Round trip throughput of request/reply with `post_and_collect()` compared with a
+second reply topic.
+
+Sends a number of requests, one at a time, to a handler which doubles a number.
+With a reply topic, the handler posts the result to a reply event whose handler
+resolves the waiting caller, correlated by a request id. With `post_and_collect()`
+the caller gets the handler's return value directly. Reports requests per second
+for ThreadedEventSystem and AsyncEventSystem.
+
+Usage: python -m benchmarks.request_reply [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from concurrent.futures import Future
+from typing import Any, Dict
+
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def threaded_run(requests: int, collect: bool) -> float:
+    es = ThreadedEventSystem()
+    pending: Dict[int, Future[int]] = {}
+    ids = itertools.count()
+
+    def double(data: Dict[str, Any]) -> int:
+        if not collect:
+            es.post("reply", {"id": data["id"], "result": data["n"] * 2})
+        return data["n"] * 2
+
+    def on_reply(data: Dict[str, Any]) -> None:
+        pending.pop(data["id"]).set_result(data["result"])
+
+    es.subscribe("double", double)
+    es.subscribe("reply", on_reply)
+    es.start()
+
+    start = time.perf_counter()
+    for n in range(requests):
+        if collect:
+            es.post_and_collect("double", {"n": n}).result()
+        else:
+            request_id = next(ids)
+            reply: Future[int] = Future()
+            pending[request_id] = reply
+            es.post("double", {"id": request_id, "n": n})
+            reply.result()
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    return requests / elapsed
+
+
+async def async_run(requests: int, collect: bool) -> float:
+    es = AsyncEventSystem()
+    pending: Dict[int, asyncio.Future[int]] = {}
+    ids = itertools.count()
+
+    async def double(data: Dict[str, Any]) -> int:
+        if not collect:
+            await es.post("reply", {"id": data["id"], "result": data["n"] * 2})
+        return data["n"] * 2
+
+    async def on_reply(data: Dict[str, Any]) -> None:
+        pending.pop(data["id"]).set_result(data["result"])
+
+    await es.subscribe("double", double)
+    await es.subscribe("reply", on_reply)
+    await es.start()
+
+    start = time.perf_counter()
+    for n in range(requests):
+        if collect:
+            await es.post_and_collect("double", {"n": n})
+        else:
+            request_id = next(ids)
+            reply = pending[request_id] = asyncio.get_running_loop().create_future()
+            await es.post("double", {"id": request_id, "n": n})
+            await reply
+    elapsed = time.perf_counter() - start
+
+    await es.stop()
+    return requests / elapsed
+
+
+def run(requests: int) -> None:
+    print(f"{'system':<10} {'mode':<14} {'requests/s':>12}")
+    for collect in (False, True):
+        mode = "collect" if collect else "reply topic"
+        print(f"{'threaded':<10} {mode:<14} {threaded_run(requests, collect):>12.0f}")
+    for collect in (False, True):
+        mode = "collect" if collect else "reply topic"
+        rate = asyncio.run(async_run(requests, collect))
+        print(f"{'async':<10} {mode:<14} {rate:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.requests)
+
+
+if __name__ == "__main__":
+    main()
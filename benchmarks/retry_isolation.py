@@ -0,0 +1,108 @@
+"""
+Throughput of healthy events while the handler of another topic keeps failing.
+
+Posts events to a healthy topic, interleaved with as many events to a topic whose
+handler always raises and is retried with backoff, on ThreadedEventSystem and
+AsyncEventSystem. Reports healthy events per second compared with a run without
+failing events, the time until every failing event has been dead-lettered, and
+the number of dead letters.
+
+Usage: python -m benchmarks.retry_isolation [--events 20000] [--attempts 3] [--delay 0.01]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Tuple
+
+from event_systems.base.handler import Execution
+from event_systems.base.retry import RetryPolicy
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.count = 0
+        self.done_at = 0.0
+        self.target = 0
+
+    def handle(self, data: Dict[str, Any]) -> None:
+        self.count += 1
+        if self.count == self.target:
+            self.done_at = time.perf_counter()
+
+
+def fail(data: Dict[str, Any]) -> None:
+    raise RuntimeError("failed")
+
+
+def threaded_run(events: int, failing: bool, policy: RetryPolicy) -> Tuple[float, float, int]:
+    counter = Counter()
+    counter.target = events
+    es = ThreadedEventSystem(workers=4)
+    es.subscribe("healthy", counter.handle, Execution.INLINE)
+    es.subscribe("failing", fail, Execution.INLINE, retry=policy)
+    es.start()
+
+    start = time.perf_counter()
+    for n in range(events):
+        es.post("healthy", {"n": n})
+        if failing:
+            es.post("failing", {"n": n})
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+    healthy = events / (counter.done_at - start)
+    es.stop()
+    return healthy, elapsed, len(es.dead_letters)
+
+
+async def async_run(events: int, failing: bool, policy: RetryPolicy) -> Tuple[float, float, int]:
+    counter = Counter()
+    counter.target = events
+    es = AsyncEventSystem()
+    await es.subscribe("healthy", counter.handle, Execution.INLINE)
+    await es.subscribe("failing", fail, Execution.INLINE, retry=policy)
+    await es.start()
+
+    start = time.perf_counter()
+    for n in range(events):
+        await es.post("healthy", {"n": n})
+        if failing:
+            await es.post("failing", {"n": n})
+    await es.process_all_events()
+    elapsed = time.perf_counter() - start
+    healthy = events / (counter.done_at - start)
+    await es.stop()
+    return healthy, elapsed, len(es.dead_letters)
+
+
+def run(events: int, attempts: int, delay: float) -> None:
+    policy = RetryPolicy(max_attempts=attempts, initial_delay=delay)
+    print(
+        f"{'system':<10} {'failing':<8} {'healthy events/s':>17} {'all done (ms)':>14} "
+        f"{'dead letters':>13}"
+    )
+    for failing in (False, True):
+        results = [
+            ("threaded", threaded_run(events, failing, policy)),
+            ("async", asyncio.run(async_run(events, failing, policy))),
+        ]
+        for system, (healthy, elapsed, dead_letters) in results:
+            print(
+                f"{system:<10} {str(failing):<8} {healthy:>17,.0f} "
+                f"{elapsed * 1e3:>14.1f} {dead_letters:>13,}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--delay", type=float, default=0.01)
+    args = parser.parse_args()
+    run(args.events, args.attempts, args.delay)
+
+
+if __name__ == "__main__":
+    main()
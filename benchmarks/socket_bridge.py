@@ -0,0 +1,90 @@
+"""
+Latency and throughput of the socket bridge for different batch sizes.
+
+Forwards events from a ThreadedEventSystem through a BridgeSender to a BridgeReceiver
+in another process over TCP on localhost. The receiving handler records when each
+event arrived. Reports events per second from the first post until the last event
+was handled remotely, and the median and 99th percentile latency from post to
+remote handler.
+
+Usage: python -m benchmarks.socket_bridge [--events 50000] [--batch-sizes 1,16,256,1024]
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from event_systems.base.handler import Execution
+from event_systems.base.socket_bridge import BridgeReceiver, BridgeSender
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def receive(events: int, addresses: Any, results: Any) -> None:
+    latencies: List[float] = []
+    done = threading.Event()
+
+    def record(data: Dict[str, Any]) -> None:
+        latencies.append(time.time() - data["sent_at"])
+        if len(latencies) == events:
+            done.set()
+
+    es = ThreadedEventSystem()
+    es.subscribe("tick", record, execution=Execution.INLINE)
+    es.start()
+    receiver = BridgeReceiver(es, ("127.0.0.1", 0))
+    receiver.start()
+    addresses.put(receiver.address)
+    done.wait()
+    results.put((time.time(), latencies))
+    receiver.stop()
+    es.stop()
+
+
+def run_batch_size(events: int, batch_size: int) -> Tuple[float, float, float]:
+    addresses: Any = multiprocessing.Queue()
+    results: Any = multiprocessing.Queue()
+    child = multiprocessing.Process(target=receive, args=(events, addresses, results))
+    child.start()
+    address = addresses.get()
+
+    es = ThreadedEventSystem()
+    es.start()
+    sender = BridgeSender(es, address, ["tick"], batch_size=batch_size)
+    sender.start()
+
+    start = time.time()
+    for n in range(events):
+        es.post("tick", {"n": n, "sent_at": time.time()})
+    finished, latencies = results.get()
+    child.join()
+    sender.stop()
+    es.stop()
+
+    latencies.sort()
+    return (
+        events / (finished - start),
+        statistics.median(latencies),
+        latencies[int(len(latencies) * 0.99)],
+    )
+
+
+def run(events: int, batch_sizes: List[int]) -> None:
+    print(f"{'batch size':>10} {'events/s':>12} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for batch_size in batch_sizes:
+        rate, p50, p99 = run_batch_size(events, batch_size)
+        print(f"{batch_size:>10} {rate:>12.0f} {p50 * 1e3:>10.2f} {p99 * 1e3:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--batch-sizes", default="1,16,256,1024")
+    args = parser.parse_args()
+    run(args.events, [int(size) for size in args.batch_sizes.split(",")])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Dispatch throughput while subscriptions change under load.
+
+Posts events to a topic with one steady handler, once undisturbed and once while
+another thread (ThreadedEventSystem) or task (AsyncEventSystem) keeps subscribing
+and cancelling short-lived handlers on the same topic. Reports events/s for both
+runs and the number of subscribe/cancel cycles completed during the churn run.
+
+Usage: python -m benchmarks.subscription_churn [--events 20000]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def noop_handler(data: Dict[str, Any]) -> None:
+    pass
+
+
+def threaded_run(events: int, churn: bool) -> Tuple[float, int]:
+    es = ThreadedEventSystem()
+    es.subscribe("tick", noop_handler)
+    es.start()
+    churning = threading.Event()
+    cycles = 0
+
+    def churn_subscriptions() -> None:
+        nonlocal cycles
+        while churning.is_set():
+            es.subscribe("tick", noop_handler).cancel()
+            cycles += 1
+
+    churner = threading.Thread(target=churn_subscriptions)
+    if churn:
+        churning.set()
+        churner.start()
+
+    start = time.perf_counter()
+    for i in range(events):
+        es.post("tick", {"i": i})
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    churning.clear()
+    if churn:
+        churner.join()
+    es.stop()
+    return events / elapsed, cycles
+
+
+async def async_run(events: int, churn: bool) -> Tuple[float, int]:
+    es = AsyncEventSystem()
+    await es.subscribe("tick", noop_handler)
+    await es.start()
+    cycles = 0
+
+    async def churn_subscriptions() -> None:
+        nonlocal cycles
+        while True:
+            (await es.subscribe("tick", noop_handler)).cancel()
+            cycles += 1
+            await asyncio.sleep(0)
+
+    churner = asyncio.create_task(churn_subscriptions()) if churn else None
+
+    start = time.perf_counter()
+    for i in range(events):
+        await es.post("tick", {"i": i})
+    await es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    if churner is not None:
+        churner.cancel()
+    await es.stop()
+    return events / elapsed, cycles
+
+
+def run(events: int) -> None:
+    print(f"{'system':<10} {'steady (ev/s)':>14} {'churn (ev/s)':>14} {'cycles':>8}")
+    for system in ("threaded", "async"):
+        if system == "threaded":
+            steady, _ = threaded_run(events, churn=False)
+            churned, cycles = threaded_run(events, churn=True)
+        else:
+            steady, _ = asyncio.run(async_run(events, churn=False))
+            churned, cycles = asyncio.run(async_run(events, churn=True))
+        print(f"{system:<10} {steady:>14.0f} {churned:>14.0f} {cycles:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    run(parser.parse_args().events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Throughput and latency benchmark suite for all event systems.
+
+Every scenario posts a fixed number of events to one of the event systems and waits
+until all of them are handled. Scenarios vary the number of topics (many vs one hot
+topic), the number of handlers per event, sync vs async handlers and the payload size.
+Each scenario runs in its own interpreter, so the reported peak RSS belongs to it alone.
+
+Reported per scenario: events/s, p50/p99 latency from posting an event until a handler
+runs it (events are posted as fast as possible, so this includes queueing) and peak RSS.
+
+Usage:
+    python -m benchmarks.suite [--events 5000] [--filter threaded] [--json out.json]
+    python -m benchmarks.suite --compare baseline.json --json out.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.common import peak_rss_mb, percentile
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+from event_systems.singleton.async_event_system import AsyncSingletonEventSystem
+
+SYSTEMS = ("threaded", "async", "async_singleton")
+TOPIC_COUNTS = {"many_topics": 64, "hot_topic": 1}
+HANDLER_COUNTS = {"1_handler": 1, "8_handlers": 8}
+HANDLER_KINDS = ("sync", "async")
+PAYLOADS = {
+    "tiny": lambda: {},
+    "large": lambda: {f"field_{i}": "x" * 100 for i in range(100)},
+}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    system: str
+    topics: str
+    handlers: str
+    kind: str
+    payload: str
+
+    @property
+    def id(self) -> str:
+        return "/".join(asdict(self).values())
+
+    @classmethod
+    def from_id(cls, scenario_id: str) -> "Scenario":
+        return cls(*scenario_id.split("/"))
+
+
+def all_scenarios() -> List[Scenario]:
+    return [
+        Scenario(*combination)
+        for combination in itertools.product(
+            SYSTEMS, TOPIC_COUNTS, HANDLER_COUNTS, HANDLER_KINDS, PAYLOADS
+        )
+    ]
+
+
+def build_workload(
+    scenario: Scenario, events: int
+) -> Tuple[List[str], List[Tuple[str, Dict[str, Any]]]]:
+    topics = [f"topic_{i}" for i in range(TOPIC_COUNTS[scenario.topics])]
+    make_payload = PAYLOADS[scenario.payload]
+    workload = [(topics[i % len(topics)], make_payload()) for i in range(events)]
+    return topics, workload
+
+
+def make_handler(
+    kind: str, latencies: List[float]
+) -> Callable[[Dict[str, Any]], Any]:
+    # list.append is atomic, so threaded handlers can share the list.
+    if kind == "sync":
+
+        def sync_handler(data: Dict[str, Any]) -> None:
+            latencies.append(time.perf_counter() - data["posted_at"])
+
+        return sync_handler
+
+    async def async_handler(data: Dict[str, Any]) -> None:
+        latencies.append(time.perf_counter() - data["posted_at"])
+
+    return async_handler
+
+
+def run_threaded(scenario: Scenario, events: int, latencies: List[float]) -> float:
+    topics, workload = build_workload(scenario, events)
+    es = ThreadedEventSystem()
+    for topic in topics:
+        for _ in range(HANDLER_COUNTS[scenario.handlers]):
+            es.subscribe(topic, make_handler(scenario.kind, latencies))
+    es.start()
+
+    start = time.perf_counter()
+    for topic, data in workload:
+        data["posted_at"] = time.perf_counter()
+        es.post(topic, data)
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    return elapsed
+
+
+async def run_async(scenario: Scenario, events: int, latencies: List[float]) -> float:
+    topics, workload = build_workload(scenario, events)
+    es: AsyncEventSystem | type[AsyncSingletonEventSystem]
+    if scenario.system == "async":
+        es = AsyncEventSystem()
+    else:
+        es = AsyncSingletonEventSystem
+    await es.start()
+    for topic in topics:
+        for _ in range(HANDLER_COUNTS[scenario.handlers]):
+            await es.subscribe(topic, make_handler(scenario.kind, latencies))
+
+    start = time.perf_counter()
+    for topic, data in workload:
+        data["posted_at"] = time.perf_counter()
+        await es.post(topic, data)
+    await es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    await es.stop()
+    return elapsed
+
+
+def run_scenario(scenario: Scenario, events: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    if scenario.system == "threaded":
+        elapsed = run_threaded(scenario, events, latencies)
+    else:
+        elapsed = asyncio.run(run_async(scenario, events, latencies))
+
+    latencies.sort()
+    return {
+        "scenario": scenario.id,
+        **asdict(scenario),
+        "events": events,
+        "events_per_sec": events / elapsed,
+        "p50_latency_us": percentile(latencies, 0.50) * 1e6,
+        "p99_latency_us": percentile(latencies, 0.99) * 1e6,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_in_subprocess(scenario: Scenario, events: int) -> Dict[str, Any]:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.suite",
+            "--run-one",
+            scenario.id,
+            "--events",
+            str(events),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result: Dict[str, Any] = json.loads(output.strip().splitlines()[-1])
+    return result
+
+
+def print_results(
+    results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]
+) -> None:
+    header = f"{'scenario':<52} {'events/s':>10} {'p50 us':>10} {'p99 us':>10} {'rss MiB':>8}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for result in results:
+        line = (
+            f"{result['scenario']:<52} {result['events_per_sec']:>10,.0f} "
+            f"{result['p50_latency_us']:>10,.0f} {result['p99_latency_us']:>10,.0f} "
+            f"{result['peak_rss_mb']:>8.1f}"
+        )
+        if base := baseline.get(result["scenario"]):
+            line += f" {result['events_per_sec'] / base['events_per_sec']:>7.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument(
+        "--filter", default="", help="Only run scenarios whose id contains this."
+    )
+    parser.add_argument("--json", help="Write machine-readable results to this file.")
+    parser.add_argument(
+        "--compare", help="Results file of an earlier run to compare throughput with."
+    )
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_scenario(Scenario.from_id(args.run_one), args.events)))
+        return
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = {r["scenario"]: r for r in json.load(file)["results"]}
+
+    scenarios = [s for s in all_scenarios() if args.filter in s.id]
+    results = [run_in_subprocess(scenario, args.events) for scenario in scenarios]
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
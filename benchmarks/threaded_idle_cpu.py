@@ -0,0 +1,75 @@
+"""
+Idle CPU and throughput benchmark for ThreadedEventSystem.
+
+Starts a number of idle instances and measures the process CPU time they burn
+while no events are posted, then measures dispatch throughput under load.
+
+Usage: python -m benchmarks.threaded_idle_cpu [--instances 16] [--idle 2.0] [--events 20000]
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def noop_handler(data: Dict[str, Any]) -> None:
+    pass
+
+
+def measure_idle_cpu(instances: int, idle_seconds: float) -> float:
+    systems: List[ThreadedEventSystem] = []
+    for _ in range(instances):
+        es = ThreadedEventSystem()
+        es.subscribe("tick", noop_handler)
+        es.start()
+        systems.append(es)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    time.sleep(idle_seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    for es in systems:
+        es.stop()
+
+    # Share of one core used by all idle instances together.
+    return cpu / wall
+
+
+def measure_throughput(events: int) -> float:
+    es = ThreadedEventSystem()
+    es.subscribe("tick", noop_handler)
+    es.start()
+
+    start = time.perf_counter()
+    for i in range(events):
+        es.post("tick", {"i": i})
+    es.process_all_events()
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    return events / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instances", type=int, default=16)
+    parser.add_argument("--idle", type=float, default=2.0)
+    parser.add_argument("--events", type=int, default=20_000)
+    args = parser.parse_args()
+
+    idle_cpu = measure_idle_cpu(args.instances, args.idle)
+    print(
+        f"idle cpu: {idle_cpu * 100:.2f}% of one core "
+        f"({args.instances} instances, {args.idle:.1f}s)"
+    )
+
+    throughput = measure_throughput(args.events)
+    print(f"throughput: {throughput:,.0f} events/s ({args.events} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Scheduling cost and memory of many pending delayed events, with the timer heap and
+with one `asyncio.sleep` task per event.
+
+Schedules a number of events with random delays on AsyncEventSystem, once with
+`post_after()` and once the way it had to be emulated before, with a task per event
+which sleeps and then posts. Also schedules them with
+`ThreadedEventSystem.post_after()`. Reports the time to schedule all events, the
+memory allocated while they are pending and the time until the last one has been
+handled.
+
+Usage: python -m benchmarks.timers [--events 50000] [--max-delay 1.0]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from event_systems.base.handler import Execution
+from event_systems.instanced.async_event_system import AsyncEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def handle(self, data: Dict[str, Any]) -> None:
+        self.count += 1
+
+
+async def async_run(delays: List[float], use_timers: bool) -> Tuple[float, int, float]:
+    counter = Counter()
+    es = AsyncEventSystem()
+    await es.subscribe("tick", counter.handle, execution=Execution.INLINE)
+    await es.start()
+    tasks = []
+
+    async def post_later(delay: float) -> None:
+        await asyncio.sleep(delay)
+        await es.post("tick", {})
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for delay in delays:
+        if use_timers:
+            await es.post_after(delay, "tick", {})
+        else:
+            tasks.append(asyncio.create_task(post_later(delay)))
+    scheduled = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    while counter.count < len(delays):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    await es.stop()
+    return scheduled, memory, elapsed
+
+
+def threaded_run(delays: List[float]) -> Tuple[float, int, float]:
+    counter = Counter()
+    es = ThreadedEventSystem()
+    es.subscribe("tick", counter.handle)
+    es.start()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for delay in delays:
+        es.post_after(delay, "tick", {})
+    scheduled = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    while counter.count < len(delays):
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    es.stop()
+    return scheduled, memory, elapsed
+
+
+def run(events: int, max_delay: float) -> None:
+    delays = [random.uniform(0, max_delay) for _ in range(events)]
+    print(
+        f"{'system':<10} {'mode':<12} {'schedule (ms)':>14} {'memory (MiB)':>13} "
+        f"{'done (ms)':>10}"
+    )
+    results = [
+        ("async", "sleep tasks", asyncio.run(async_run(delays, use_timers=False))),
+        ("async", "timer heap", asyncio.run(async_run(delays, use_timers=True))),
+        ("threaded", "timer heap", threaded_run(delays)),
+    ]
+    for system, mode, (scheduled, memory, elapsed) in results:
+        print(
+            f"{system:<10} {mode:<12} {scheduled * 1e3:>14.1f} "
+            f"{memory / 2**20:>13.1f} {elapsed * 1e3:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--max-delay", type=float, default=1.0)
+    args = parser.parse_args()
+    run(args.events, args.max_delay)
+
+
+if __name__ == "__main__":
+    main()
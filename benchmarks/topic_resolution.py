@@ -0,0 +1,73 @@
+"""
+Cost of resolving a posted topic to its handlers.
+
+Compares a plain dict lookup with the subscription registry for a topic with an
+exact subscription which also matches wildcard patterns, once served from the
+resolution cache and once with the cache discarded before every lookup, i.e. a
+full trie walk and merge. The registry holds one exact subscription per
+`orders.<region>.<type>` topic plus a few patterns.
+
+Usage: python -m benchmarks.topic_resolution [--lookups 200000]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict
+
+from event_systems.base.subscription import Subscription, SubscriptionRegistry
+
+REGIONS = ["eu", "us", "apac", "latam"]
+TYPES = [f"type{i}" for i in range(50)]
+PATTERNS = ["orders.#", "orders.*.type7", "#.type7"]
+
+
+def noop_handler(data: Dict[str, Any]) -> None:
+    pass
+
+
+def build_registry() -> SubscriptionRegistry[Callable[[Dict[str, Any]], Any]]:
+    registry: SubscriptionRegistry[Callable[[Dict[str, Any]], Any]] = (
+        SubscriptionRegistry()
+    )
+    for region in REGIONS:
+        for type_ in TYPES:
+            name = f"orders.{region}.{type_}"
+            registry.add(Subscription(name, noop_handler), noop_handler)
+    for pattern in PATTERNS:
+        registry.add(Subscription(pattern, noop_handler), noop_handler)
+    return registry
+
+
+def ns_per_lookup(lookup: Callable[[], Any], lookups: int) -> float:
+    start = time.perf_counter()
+    for _ in range(lookups):
+        lookup()
+    return (time.perf_counter() - start) / lookups * 1e9
+
+
+def run(lookups: int) -> None:
+    registry = build_registry()
+    plain = {f"orders.{r}.{t}": (noop_handler,) for r in REGIONS for t in TYPES}
+
+    def uncached() -> Any:
+        registry._snapshots = {}
+        return registry.runners("orders.eu.type7")
+
+    cases = [
+        ("dict lookup", lambda: plain.get("orders.eu.type7")),
+        ("registry, cached", lambda: registry.runners("orders.eu.type7")),
+        ("registry, uncached", uncached),
+    ]
+    print(f"{'case':<22} {'ns/lookup':>10}")
+    for label, lookup in cases:
+        print(f"{label:<22} {ns_per_lookup(lookup, lookups):>10.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=200000)
+    run(parser.parse_args().lookups)
+
+
+if __name__ == "__main__":
+    main()
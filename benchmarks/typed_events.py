@@ -0,0 +1,118 @@
+"""
+Memory and allocations of typed event objects compared with dict payloads.
+
+Queues a number of price ticks in AsyncEventSystem, once as dicts posted with
+`post()` and once as `dataclass(slots=True)` objects posted with `post_event()`,
+and reports the traced memory and the allocated memory blocks per queued event.
+Then measures end-to-end throughput with an inline handler which reads the fields,
+and the garbage collector runs triggered meanwhile.
+
+Usage: python -m benchmarks.typed_events [--events 100000]
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from event_systems.base.handler import Execution
+from event_systems.instanced.async_event_system import AsyncEventSystem
+
+
+@dataclass(slots=True)
+class PriceTick:
+    symbol: str
+    price: float
+
+
+SYMBOLS = [f"S{i}" for i in range(100)]
+
+
+def dict_handler(data: Dict[str, Any]) -> None:
+    data["symbol"], data["price"]
+
+
+def typed_handler(event: PriceTick) -> None:
+    event.symbol, event.price
+
+
+async def post_dicts(es: AsyncEventSystem, events: int) -> None:
+    for i in range(events):
+        await es.post("tick", {"symbol": SYMBOLS[i % 100], "price": float(i)})
+
+
+async def post_typed(es: AsyncEventSystem, events: int) -> None:
+    for i in range(events):
+        await es.post_event(PriceTick(SYMBOLS[i % 100], float(i)))
+
+
+async def new_system() -> AsyncEventSystem:
+    es = AsyncEventSystem()
+    await es.subscribe("tick", dict_handler, Execution.INLINE)
+    await es.subscribe(PriceTick, typed_handler, Execution.INLINE)
+    await es.start()
+    return es
+
+
+async def queued_memory(
+    post: Callable[[AsyncEventSystem, int], Awaitable[None]], events: int
+) -> Dict[str, float]:
+    # Posting never yields to the consumer, so all events stay queued meanwhile.
+    es = await new_system()
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    await post(es, events)
+    blocks = (sys.getallocatedblocks() - blocks_before) / events
+    await es.process_all_events()
+
+    gc.collect()
+    tracemalloc.start()
+    traced_before, _ = tracemalloc.get_traced_memory()
+    await post(es, events)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await es.process_all_events()
+    await es.stop()
+    return {"bytes": (traced - traced_before) / events, "blocks": blocks}
+
+
+async def throughput(
+    post: Callable[[AsyncEventSystem, int], Awaitable[None]], events: int
+) -> Tuple[float, int]:
+    es = await new_system()
+    collections_before = sum(stat["collections"] for stat in gc.get_stats())
+    start = time.perf_counter()
+    await post(es, events)
+    await es.process_all_events()
+    elapsed = time.perf_counter() - start
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    await es.stop()
+    return events / elapsed, collections - collections_before
+
+
+async def run(events: int) -> None:
+    print(
+        f"{'payload':<8} {'bytes/event':>12} {'blocks/event':>13} "
+        f"{'gc runs':>8} {'events/s':>10}"
+    )
+    for label, post in (("dict", post_dicts), ("typed", post_typed)):
+        memory = await queued_memory(post, events)
+        rate, collections = await throughput(post, events)
+        print(
+            f"{label:<8} {memory['bytes']:>12.0f} {memory['blocks']:>13.2f} "
+            f"{collections:>8} {rate:>10.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100000)
+    asyncio.run(run(parser.parse_args().events))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,93 @@
 import asyncio
-from typing import Optional, Protocol, Any, List, Dict, runtime_checkable
-
-from event_systems.base.handler import Handler
+from typing import (
+    Hashable,
+    Iterable,
+    Optional,
+    Protocol,
+    Any,
+    List,
+    Dict,
+    Tuple,
+    runtime_checkable,
+)
+
+from event_systems.base.event_queue import Overflow
+from event_systems.base.fan_out import FanOut
+from event_systems.base.handler import Execution, Handler
+from event_systems.base.retry import DeadLetterQueue, RetryPolicy
+from event_systems.base.subscription import Subscription
+from event_systems.base.timers import Timer
 
 # TODO: Write Documentation
-# TODO: Unsubscribe
 
 
 @runtime_checkable
 class Async(Protocol):
+    dead_letters: DeadLetterQueue
+
     async def name(self) -> str | None: ...
 
     async def start(self) -> None: ...
 
     async def stop(self) -> None: ...
 
-    async def subscribe(self, event_name: str, fn: Handler) -> Dict[str, Any]: ...
-
-    async def post(self, event_name: str, event_data: Dict[str, Any]) -> None: ...
+    async def subscribe(
+        self,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription: ...
+
+    async def post(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None: ...
+
+    async def post_event(
+        self,
+        event: object,
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None: ...
+
+    async def post_and_collect(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        timeout: float | None = None,
+    ) -> List[Any]: ...
+
+    async def post_after(
+        self,
+        delay: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer: ...
+
+    async def post_at(
+        self,
+        timestamp: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer: ...
+
+    async def post_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None: ...
 
     async def get_subscriptions(self) -> Dict[str, List[Handler]]: ...
 
+    async def get_dropped_events(self) -> Dict[str, int]: ...
+
+    async def replay_dead_letters(self, event_name: str | None = None) -> int: ...
+
     async def process_all_events(self) -> None: ...
 
     async def is_running(self) -> bool: ...
@@ -29,9 +96,27 @@ class Async(Protocol):
 
 
 class AsyncSingleton(Protocol):
+    dead_letters: DeadLetterQueue
+
     @property
     def name(self) -> str | None: ...
 
+    @classmethod
+    async def configure(
+        cls,
+        fan_out: FanOut = FanOut.SEQUENTIAL,
+        max_concurrent_handlers: int | None = None,
+        max_queue_size: int = 0,
+        overflow: Overflow = Overflow.BLOCK,
+        sync_workers: int | None = None,
+        process_workers: int | None = None,
+        metrics: bool = False,
+        priorities: bool = False,
+        priority_aging: float | None = None,
+        flush_timers: bool = False,
+        max_dead_letters: int = 10_000,
+    ) -> None: ...
+
     @classmethod
     async def start(cls) -> None: ...
 
@@ -39,14 +124,72 @@ class AsyncSingleton(Protocol):
     async def stop(cls) -> None: ...
 
     @classmethod
-    async def subscribe(cls, event_name: str, fn: Handler) -> Dict[str, Any]: ...
+    async def subscribe(
+        cls,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription: ...
+
+    @classmethod
+    async def post(
+        cls,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None: ...
+
+    @classmethod
+    async def post_event(
+        cls,
+        event: object,
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None: ...
+
+    @classmethod
+    async def post_and_collect(
+        cls,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        timeout: float | None = None,
+    ) -> List[Any]: ...
 
     @classmethod
-    async def post(cls, event_name: str, event_data: Dict[str, Any]) -> None: ...
+    async def post_after(
+        cls,
+        delay: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer: ...
+
+    @classmethod
+    async def post_at(
+        cls,
+        timestamp: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer: ...
+
+    @classmethod
+    async def post_many(cls, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None: ...
 
     @classmethod
     async def get_subscriptions(cls) -> Dict[str, List[Handler]]: ...
 
+    @classmethod
+    async def get_dropped_events(cls) -> Dict[str, int]: ...
+
+    @classmethod
+    async def replay_dead_letters(cls, event_name: str | None = None) -> int: ...
+
     @classmethod
     async def process_all_events(cls) -> None: ...
 
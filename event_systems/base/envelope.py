@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List
+
+if TYPE_CHECKING:
+    from event_systems.base.retry import FailedDelivery
+
+# Resolves to the results of an event's handlers, see `post_and_collect()`.
+Reply = Future[List[Any]] | asyncio.Future[List[Any]]
+
+_event_topics: Dict[type, str] = {}
+
+
+def event_topic(event_type: type) -> str:
+    """
+    The event name typed events are posted and subscribed under: the qualified name
+    of their class, so wildcards such as `myapp.events.#` select them by module.
+    """
+    if (topic := _event_topics.get(event_type)) is None:
+        topic = _event_topics[event_type] = (
+            f"{event_type.__module__}.{event_type.__qualname__}"
+        )
+    return topic
+
+
+class Envelope:
+    """A posted event on its way through an event queue."""
+
+    __slots__ = (
+        "name",
+        "data",
+        "posted_at",
+        "priority",
+        "coalesce_key",
+        "partition_key",
+        "reply",
+        "sequence",
+        "retry",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        data: Any,
+        posted_at: float = 0.0,
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+        reply: Reply | None = None,
+    ) -> None:
+        self.name = name
+        # A dict, or a typed event object posted with `post_event()`.
+        self.data = data
+        # perf_counter() timestamp of the post, only taken if metrics are enabled.
+        self.posted_at = posted_at
+        # Lower values are dispatched first, only honoured by priority queues.
+        self.priority = priority
+        # Pending events with the same name and key are replaced by newer posts.
+        self.coalesce_key = coalesce_key
+        # Events with the same partition key are handled one after another.
+        self.partition_key = partition_key
+        # Set by `post_and_collect()`, resolved once the handlers have run.
+        self.reply = reply
+        # Position in the event system's journal, 0 if it isn't journaled.
+        self.sequence = 0
+        # Set on timers which run a failed handler again instead of posting.
+        self.retry: "FailedDelivery | None" = None
+
+    def drop(self, exception: Exception) -> None:
+        """Fail the reply of an event which is dropped instead of dispatched."""
+        if self.reply is not None and not self.reply.done():
+            self.reply.set_exception(exception)
@@ -0,0 +1,356 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter, deque
+from enum import Enum
+from queue import Full, Queue
+from typing import Callable, Deque, Dict, Hashable, List, Sequence, Tuple
+
+from event_systems.base.envelope import Envelope
+
+
+class Overflow(Enum):
+    """What posting does when a bounded event queue is full."""
+
+    BLOCK = "block"  # Wait (or await) until there is room.
+    DROP_NEWEST = "drop_newest"  # Discard the event being posted.
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued event to make room.
+    RAISE = "raise"  # Raise queue.Full or asyncio.QueueFull respectively.
+
+
+HeapEntry = Tuple[float, int, Envelope | None]
+
+
+class PriorityHeap:
+    """
+    Heap storage for the event queues which orders events by their priority.
+
+    Lower priorities are taken first, and events of equal priority in posting order.
+    With `aging`, an event moves up one priority level for every `aging` seconds it
+    waits, so a steady stream of urgent events can't starve the others. Aging
+    doesn't need reordering: waiting changes the effective priority of all events
+    alike, so the order only depends on priority plus enqueue time divided by
+    `aging`, which is fixed once an event is enqueued.
+    """
+
+    def __init__(self, aging: float | None = None) -> None:
+        self.aging = aging
+        self.entries: List[HeapEntry] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def push(self, item: Envelope | None) -> None:
+        if item is None:
+            # The shutdown sentinel goes behind every event.
+            key = math.inf
+        elif self.aging:
+            key = item.priority + time.monotonic() / self.aging
+        else:
+            key = item.priority
+        heapq.heappush(self.entries, (key, next(self._sequence), item))
+
+    def pop(self) -> Envelope | None:
+        return heapq.heappop(self.entries)[2]
+
+    def pop_least_urgent(self) -> Envelope | None:
+        # Linear, but only needed when a bounded queue overflows.
+        index = max(range(len(self.entries)), key=self.entries.__getitem__)
+        entry = self.entries[index]
+        self.entries[index] = self.entries[-1]
+        self.entries.pop()
+        heapq.heapify(self.entries)
+        return entry[2]
+
+
+class CoalescingIndex:
+    """
+    The pending events of an event queue which were posted with a coalesce key.
+
+    Posting an event whose name and key match a pending one replaces the pending
+    event's data in place, so it keeps its queue position and handlers only see the
+    latest value. Replaced events are counted per event name in `coalesced`.
+    """
+
+    def __init__(self) -> None:
+        self.pending: Dict[Tuple[str, Hashable], Envelope] = {}
+        self.coalesced: Counter[str] = Counter()
+
+    def coalesce(self, item: Envelope) -> bool:
+        """Merge the item into a pending event, if there is one."""
+        if item.coalesce_key is None:
+            return False
+        if (pending := self.pending.get((item.name, item.coalesce_key))) is None:
+            return False
+        pending.data = item.data
+        # The pending event now carries the newer journal record, the older one is done.
+        pending.sequence, item.sequence = item.sequence, pending.sequence
+        self.coalesced[item.name] += 1
+        return True
+
+    def count_new(self, items: Sequence[Envelope]) -> int:
+        """How many of the items would take up a queue slot."""
+        keys = set()
+        new = 0
+        for item in items:
+            if item.coalesce_key is None:
+                new += 1
+            elif (key := (item.name, item.coalesce_key)) not in self.pending and (
+                key not in keys
+            ):
+                keys.add(key)
+                new += 1
+        return new
+
+    def track(self, item: Envelope | None) -> None:
+        if item is not None and item.coalesce_key is not None:
+            self.pending[(item.name, item.coalesce_key)] = item
+
+    def forget(self, item: Envelope | None) -> None:
+        if item is not None and item.coalesce_key is not None:
+            self.pending.pop((item.name, item.coalesce_key), None)
+
+
+class EventQueue(Queue[Envelope | None]):
+    """
+    A thread-safe FIFO event queue which can take a whole batch of events at once.
+
+    With a `maxsize`, a full queue is handled according to `overflow`. Dropped events
+    are counted per event name in `dropped`.
+
+    With `priorities`, events are taken by priority instead, see `PriorityHeap`. In
+    that case `Overflow.DROP_OLDEST` drops the least urgent event instead of the
+    oldest one.
+
+    Events with a coalesce key are merged into a pending event with the same name and
+    key, see `CoalescingIndex`.
+
+    `on_discard`, if set, is called with every event which is dropped or merged into
+    a pending one, so it won't be dispatched.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        overflow: Overflow = Overflow.BLOCK,
+        priorities: bool = False,
+        aging: float | None = None,
+    ) -> None:
+        # Set before Queue.__init__, which calls _init().
+        self.heap = PriorityHeap(aging) if priorities else None
+        super().__init__(maxsize)
+        self.overflow = overflow
+        self.dropped: Counter[str] = Counter()
+        self.coalescing = CoalescingIndex()
+        self.on_discard: Callable[[Envelope], None] | None = None
+
+    def _qsize(self) -> int:
+        return len(self.heap) if self.heap is not None else len(self.queue)
+
+    def _put(self, item: Envelope | None) -> None:
+        self.coalescing.track(item)
+        if self.heap is not None:
+            self.heap.push(item)
+        else:
+            self.queue.append(item)
+
+    def _get(self) -> Envelope | None:
+        item = self.heap.pop() if self.heap is not None else self.queue.popleft()
+        self.coalescing.forget(item)
+        return item
+
+    def put(self, item: Envelope | None, block: bool = True, timeout: float | None = None) -> None:
+        # The shutdown sentinel (None) always takes the regular path. Coalescing has to
+        # look up the pending event under the same lock as enqueueing, like batches do.
+        if item is None or (
+            self.overflow is Overflow.BLOCK and item.coalesce_key is None
+        ):
+            super().put(item, block, timeout)
+        elif self.overflow is Overflow.RAISE and item.coalesce_key is None:
+            super().put(item, block=False)
+        else:
+            self.put_many([item])
+
+    def put_many(self, items: Sequence[Envelope]) -> None:
+        """
+        Enqueue all items with a single lock acquisition and wakeup.
+
+        The batch becomes visible at once, so `join()` never observes a partial batch,
+        unless the queue is bounded, blocking and runs full halfway through the batch.
+        With `Overflow.RAISE` either the whole batch is enqueued or none of it.
+        """
+        if not items:
+            return
+        with self.not_full:
+            if (
+                self.overflow is Overflow.RAISE
+                and 0 < self.maxsize < self._qsize() + self.coalescing.count_new(items)
+            ):
+                raise Full
+
+            pending = 0
+            for item in items:
+                if self.coalescing.coalesce(item):
+                    if self.on_discard is not None:
+                        self.on_discard(item)
+                    continue
+                if 0 < self.maxsize <= self._qsize():
+                    if self.overflow is Overflow.DROP_NEWEST:
+                        self._drop(item)
+                        continue
+                    if self.overflow is Overflow.DROP_OLDEST:
+                        # Swap the oldest event for the new one, the task count stays the same.
+                        self._drop_oldest()
+                        self._put(item)
+                        continue
+
+                    # Let consumers at what is already enqueued, then wait for room.
+                    self._publish(pending)
+                    pending = 0
+                    while self._qsize() >= self.maxsize:
+                        self.not_full.wait()
+
+                self._put(item)
+                pending += 1
+            self._publish(pending)
+
+    def _drop_oldest(self) -> None:
+        if self.heap is not None:
+            oldest = self.heap.pop_least_urgent()
+            self.coalescing.forget(oldest)
+        else:
+            oldest = self._get()
+        if oldest is not None:
+            self._drop(oldest)
+
+    def count_dropped(self, event_name: str) -> None:
+        """Count an event which was dropped before it reached the queue."""
+        with self.mutex:
+            self.dropped[event_name] += 1
+
+    def dropped_snapshot(self) -> Dict[str, int]:
+        """A copy of `dropped`, safe to take from any thread."""
+        with self.mutex:
+            return dict(self.dropped)
+
+    def _drop(self, item: Envelope) -> None:
+        self.dropped[item.name] += 1
+        item.drop(Full())
+        if self.on_discard is not None:
+            self.on_discard(item)
+
+    def _publish(self, count: int) -> None:
+        if count:
+            self.unfinished_tasks += count
+            self.not_empty.notify(count)
+
+
+class AsyncEventQueue(asyncio.Queue[Envelope]):
+    """
+    An asyncio event queue, which handles a full queue according to `overflow`.
+
+    Dropped events are counted per event name in `dropped`. With `priorities`, events
+    are taken by priority, and events with a coalesce key are coalesced like in
+    `EventQueue`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        overflow: Overflow = Overflow.BLOCK,
+        priorities: bool = False,
+        aging: float | None = None,
+    ) -> None:
+        self.heap = PriorityHeap(aging) if priorities else None
+        super().__init__(maxsize)
+        self.overflow = overflow
+        self.dropped: Counter[str] = Counter()
+        self.coalescing = CoalescingIndex()
+
+    def _init(self, maxsize: int) -> None:
+        super()._init(maxsize)
+        self._fifo: Deque[Envelope] = deque()
+
+    def qsize(self) -> int:
+        return len(self.heap) if self.heap is not None else len(self._fifo)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def _put(self, item: Envelope) -> None:
+        self.coalescing.track(item)
+        if self.heap is not None:
+            self.heap.push(item)
+        else:
+            self._fifo.append(item)
+
+    def _get(self) -> Envelope:
+        if self.heap is not None:
+            envelope = self.heap.pop()
+            assert envelope is not None
+        else:
+            envelope = self._fifo.popleft()
+        self.coalescing.forget(envelope)
+        return envelope
+
+    async def put(self, item: Envelope) -> None:
+        if self.coalescing.coalesce(item):
+            return
+        if self.overflow is Overflow.BLOCK:
+            await super().put(item)
+        else:
+            self.put_nowait(item)
+
+    def put_nowait(self, item: Envelope) -> None:
+        if self.coalescing.coalesce(item):
+            return
+        if self.full():
+            if self.overflow is Overflow.DROP_NEWEST:
+                self._drop(item)
+                return
+            if self.overflow is Overflow.DROP_OLDEST:
+                # Swap the oldest event for the new one, the task count stays the same.
+                if self.heap is not None:
+                    oldest = self.heap.pop_least_urgent()
+                    self.coalescing.forget(oldest)
+                else:
+                    oldest = self._get()
+                assert oldest is not None
+                self._drop(oldest)
+                self._put(item)
+                return
+        super().put_nowait(item)
+
+    def dropped_snapshot(self) -> Dict[str, int]:
+        """
+        A copy of `dropped`, safe to take from any thread. Copying a dict runs no
+        Python code, so the loop can't resize it halfway through.
+        """
+        return dict(self.dropped)
+
+    def _drop(self, item: Envelope) -> None:
+        self.dropped[item.name] += 1
+        item.drop(asyncio.QueueFull())
+
+    async def put_many(self, items: Sequence[Envelope]) -> None:
+        """
+        Enqueue all items, waking up only consumers which are actually waiting.
+
+        Nothing is awaited unless the queue is bounded, blocking and runs full, so the
+        batch usually becomes visible at once. With `Overflow.RAISE` either the whole
+        batch is enqueued or none of it.
+        """
+        if (
+            self.overflow is Overflow.RAISE
+            and 0 < self.maxsize < self.qsize() + self.coalescing.count_new(items)
+        ):
+            raise asyncio.QueueFull
+
+        for item in items:
+            if self.overflow is Overflow.BLOCK and self.full():
+                await self.put(item)
+            else:
+                self.put_nowait(item)
@@ -0,0 +1,67 @@
+import asyncio
+from enum import Enum
+from typing import Any, Dict, List, Sequence
+
+from event_systems.base.handler import AsyncRunner
+
+
+class FanOut(Enum):
+    """How the async event systems run the handlers subscribed to a single event."""
+
+    SEQUENTIAL = "sequential"  # One after another, in subscription order.
+    CONCURRENT = "concurrent"  # All at once.
+    BOUNDED = "bounded"  # All at once, limited by a semaphore shared across the system.
+
+
+async def run_handlers(
+    runners: Sequence[AsyncRunner],
+    event_data: Dict[str, Any],
+    fan_out: FanOut,
+    semaphore: asyncio.Semaphore | None = None,
+) -> None:
+    """Run all handlers of one event and return once every one of them has completed."""
+    if fan_out is FanOut.SEQUENTIAL or (
+        fan_out is FanOut.CONCURRENT and len(runners) == 1
+    ):
+        for runner in runners:
+            await runner(event_data)
+    elif fan_out is FanOut.CONCURRENT:
+        await asyncio.gather(*(runner(event_data) for runner in runners))
+    else:
+        assert semaphore is not None, "Bounded fan-out requires a semaphore."
+
+        async def run_bounded(runner: AsyncRunner) -> None:
+            async with semaphore:
+                await runner(event_data)
+
+        await asyncio.gather(*(run_bounded(runner) for runner in runners))
+
+
+async def collect_results(
+    runners: Sequence[AsyncRunner],
+    event_data: Dict[str, Any],
+    fan_out: FanOut,
+    semaphore: asyncio.Semaphore | None = None,
+) -> List[Any]:
+    """
+    Run all handlers of one event like `run_handlers()`, and return what each of them
+    returned, or the exception it raised, in subscription order.
+    """
+    results: List[Any] = [None] * len(runners)
+
+    def capture(i: int, runner: AsyncRunner) -> AsyncRunner:
+        async def run(event_data: Dict[str, Any]) -> None:
+            try:
+                results[i] = await runner(event_data)
+            except Exception as e:
+                results[i] = e
+
+        return run
+
+    await run_handlers(
+        [capture(i, runner) for i, runner in enumerate(runners)],
+        event_data,
+        fan_out,
+        semaphore,
+    )
+    return results
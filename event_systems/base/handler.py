@@ -1,3 +1,89 @@
-from typing import Callable, Any, Coroutine
+import asyncio
+import functools
+import pickle
+from concurrent.futures import Executor
+from enum import Enum
+from typing import Awaitable, Callable, Any, Coroutine, Dict
 
 Handler = Callable[..., Any] | Coroutine[Any, Any, Any]
+
+# Runners are handlers which have been classified once at subscription time, so
+# dispatching an event doesn't need to introspect the handler again.
+AsyncRunner = Callable[[Dict[str, Any]], Awaitable[Any]]
+SyncRunner = Callable[[Dict[str, Any]], Any]
+
+
+class Execution(Enum):
+    """Where a sync handler is run. Coroutine handlers always run on an event loop."""
+
+    THREAD = "thread"  # In a worker thread.
+    INLINE = "inline"  # Directly on the dispatching loop, for short non-blocking handlers.
+    PROCESS = "process"  # In a worker process, for CPU-bound, picklable handlers.
+
+
+def compile_async_runner(
+    handler: Handler,
+    execution: Execution = Execution.THREAD,
+    executor: Executor | None = None,
+) -> AsyncRunner:
+    """
+    Return a runner which awaits coroutine handlers and runs sync ones as `execution` says.
+
+    Handlers run in threads or processes go to `executor`. Without one, threaded
+    handlers use the loop's default executor via `asyncio.to_thread`.
+    """
+    if execution is Execution.PROCESS:
+        assert executor is not None, "Process execution requires an executor."
+        process_runner = compile_process_runner(handler)
+        return lambda event_data: asyncio.get_running_loop().run_in_executor(
+            executor, process_runner, event_data
+        )
+    if not callable(handler):
+        raise TypeError("Handler is not callable.")
+    if asyncio.iscoroutinefunction(handler):
+        return handler
+    if execution is Execution.INLINE:
+
+        async def run_inline(event_data: Dict[str, Any]) -> Any:
+            return handler(event_data)
+
+        return run_inline
+    if executor is not None:
+        return lambda event_data: asyncio.get_running_loop().run_in_executor(
+            executor, handler, event_data
+        )
+    return functools.partial(asyncio.to_thread, handler)
+
+
+def compile_sync_runner(
+    handler: Handler,
+    run_coroutine: Callable[[Coroutine[Any, Any, Any]], Any],
+) -> SyncRunner:
+    """Return a runner which calls sync handlers and passes coroutines to `run_coroutine`."""
+    if not callable(handler):
+        raise TypeError("Handler is not callable.")
+    if asyncio.iscoroutinefunction(handler):
+        return lambda event_data: run_coroutine(handler(event_data))
+    return handler
+
+
+def compile_process_runner(handler: Handler) -> SyncRunner:
+    """
+    Return a picklable runner which runs the handler in a worker process.
+
+    Raises if the handler can't be pickled, so this surfaces on subscription instead
+    of on every dispatch. Coroutine handlers get a fresh event loop per event.
+    """
+    if not callable(handler):
+        raise TypeError("Handler is not callable.")
+    pickle.dumps(handler)
+    if asyncio.iscoroutinefunction(handler):
+        return functools.partial(_run_coroutine_in_process, handler)
+    return handler
+
+
+def _run_coroutine_in_process(
+    handler: Callable[[Dict[str, Any]], Coroutine[Any, Any, Any]],
+    event_data: Dict[str, Any],
+) -> Any:
+    return asyncio.run(handler(event_data))
@@ -0,0 +1,282 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Sequence, Set
+
+from event_systems.base.envelope import Envelope
+
+# Records are a header of payload length, CRC32 of the payload and sequence number,
+# followed by the pickled event.
+HEADER = struct.Struct(">IIQ")
+SEGMENT_SUFFIX = ".log"
+CHECKPOINT = "checkpoint"
+
+
+class Fsync(Enum):
+    """When the journal forces appended events to disk."""
+
+    ALWAYS = "always"  # Before posting returns, sharing one fsync among concurrent posts.
+    INTERVAL = "interval"  # Every `fsync_interval` seconds, from a background thread.
+    NEVER = "never"  # Left to the OS, so events survive a crash of the process only.
+
+
+class Journal:
+    """
+    A write-ahead journal of posted events, which outlives the process.
+
+    Events are appended to segment files of about `segment_size` bytes, named after
+    their first sequence number, before they are enqueued, and acknowledged once
+    their handlers have run. Compaction records the sequence number up to which all
+    events are acknowledged in a checkpoint, and deletes the segments before it. It
+    runs whenever a segment fills up, on `close()`, and every `checkpoint_interval`
+    seconds if events were acknowledged meanwhile, which bounds how many handled
+    events a crash can replay. On `open()`, the events after the
+    checkpoint are read back through `mmap`, so events which were pending when the
+    process died are posted again, at least once.
+
+    With `Fsync.ALWAYS`, posts that arrive while an fsync is running are committed
+    together by the next one, so concurrent posters share the cost. The fsyncs issued
+    are counted in `fsyncs`.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        fsync: Fsync = Fsync.INTERVAL,
+        fsync_interval: float = 0.01,
+        segment_size: int = 64 * 2**20,
+        checkpoint_interval: float = 1.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.segment_size = segment_size
+        self.checkpoint_interval = checkpoint_interval
+
+        # Guards appending, the order is always `_sync_lock` before `_lock`.
+        self._lock = threading.Lock()
+        # Serializes fsyncs, posts waiting for one are covered by the next.
+        self._sync_lock = threading.Lock()
+        self._file: BinaryIO | None = None
+        self._size = 0
+        # The last sequence number in the file, only advanced once the write returned.
+        self._written = 0
+        self._synced = 0
+        self.fsyncs = 0
+
+        self._ack_lock = threading.Lock()
+        self._acked: Set[int] = set()
+        self._watermark = 0
+        # Serializes compactions, which share the temporary checkpoint file.
+        self._compact_lock = threading.Lock()
+        self._checkpointed = 0
+        self._closed = threading.Event()
+
+    def open(self) -> List[Envelope]:
+        """Open the journal, and return the events which haven't been acknowledged."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        checkpoint = self.directory / CHECKPOINT
+        self._watermark = int(checkpoint.read_text()) if checkpoint.exists() else 0
+        self._checkpointed = self._watermark
+        self._acked.clear()
+
+        pending = [
+            envelope
+            for segment in self._segments()
+            for envelope in _read_segment(segment)
+            if envelope.sequence > self._watermark
+        ]
+        self._written = self._synced = max(
+            [self._watermark] + [envelope.sequence for envelope in pending]
+        )
+        # Appending starts a new segment, behind a torn record the last one may end with.
+        self._start_segment()
+        self._closed.clear()
+        if self.fsync is Fsync.INTERVAL:
+            self._syncer = threading.Thread(target=self._sync_periodically, daemon=True)
+            self._syncer.start()
+        self._checkpointer = threading.Thread(
+            target=self._checkpoint_periodically, daemon=True
+        )
+        self._checkpointer.start()
+        return pending
+
+    def close(self) -> None:
+        self._closed.set()
+        if self.fsync is Fsync.INTERVAL:
+            self._syncer.join()
+        self._checkpointer.join()
+        if self.fsync is not Fsync.NEVER:
+            self.sync()
+        with self._lock:
+            assert self._file is not None
+            self._file.close()
+            self._file = None
+        self.compact()
+
+    def append(self, envelope: Envelope) -> None:
+        """Journal the event, and set its sequence number."""
+        self.append_many([envelope])
+
+    def append_many(self, envelopes: Sequence[Envelope]) -> None:
+        records = [_encode(envelope) for envelope in envelopes]
+        with self._lock:
+            if self._size < self.segment_size:
+                self._write(envelopes, records)
+                records = []
+        rolled = False
+        if records:
+            with self._sync_lock, self._lock:
+                if rolled := self._size >= self.segment_size:
+                    if self.fsync is not Fsync.NEVER:
+                        self._sync()
+                    self._start_segment()
+                self._write(envelopes, records)
+        if self.fsync is Fsync.ALWAYS and envelopes:
+            self._sync_until(envelopes[-1].sequence)
+        if rolled:
+            self.compact()
+
+    def ack(self, sequence: int) -> None:
+        """Mark the event as handled, so compaction may drop it."""
+        with self._ack_lock:
+            if sequence != self._watermark + 1:
+                self._acked.add(sequence)
+                return
+            self._watermark = sequence
+            while self._watermark + 1 in self._acked:
+                self._watermark += 1
+                self._acked.remove(self._watermark)
+
+    def sync(self) -> None:
+        """Force everything appended so far to disk."""
+        self._sync_until(self._written)
+
+    def compact(self) -> None:
+        """Checkpoint the acknowledged events, and delete the segments they fill."""
+        with self._compact_lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        with self._ack_lock:
+            watermark = self._watermark
+        self._checkpointed = watermark
+        checkpoint = self.directory / CHECKPOINT
+        temporary = checkpoint.with_suffix(".tmp")
+        with open(temporary, "w") as f:
+            f.write(str(watermark))
+            if self.fsync is not Fsync.NEVER:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temporary, checkpoint)
+
+        with self._lock:
+            current = Path(self._file.name) if self._file is not None else None
+            segments = self._segments()
+            for segment, following in zip(segments, segments[1:] + [None]):
+                if segment == current:
+                    break
+                # A segment ends right before the next one starts, the last one at the
+                # last sequence number written.
+                last = _first_sequence(following) - 1 if following else self._written
+                if last > watermark:
+                    break
+                segment.unlink()
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def _start_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        path = self.directory / f"{self._written + 1:020d}{SEGMENT_SUFFIX}"
+        # Unbuffered, so every append reaches the OS and survives a crash of the process.
+        self._file = open(path, "ab", buffering=0)
+        self._size = 0
+
+    def _write(self, envelopes: Sequence[Envelope], records: List[bytes]) -> None:
+        assert self._file is not None, "Journal is not open."
+        chunks = []
+        sequence = self._written
+        for envelope, payload in zip(envelopes, records):
+            sequence += 1
+            envelope.sequence = sequence
+            chunks.append(HEADER.pack(len(payload), zlib.crc32(payload), sequence))
+            chunks.append(payload)
+        data = b"".join(chunks)
+        self._file.write(data)
+        self._size += len(data)
+        # Only now, so a concurrent fsync never counts records that aren't written yet.
+        self._written = sequence
+
+    def _sync_until(self, sequence: int) -> None:
+        with self._sync_lock:
+            if self._synced < sequence:
+                self._sync()
+
+    def _sync(self) -> None:
+        # Called with `_sync_lock` held, so the file can't be swapped meanwhile. Every
+        # record up to `_written` has reached the file, so the fsync covers it.
+        written = self._written
+        if self._file is not None and self._synced < written:
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+        self._synced = written
+
+    def _sync_periodically(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            self.sync()
+
+    def _checkpoint_periodically(self) -> None:
+        while not self._closed.wait(self.checkpoint_interval):
+            if self._watermark != self._checkpointed:
+                self.compact()
+
+
+def _encode(envelope: Envelope) -> bytes:
+    return pickle.dumps(
+        (
+            envelope.name,
+            envelope.data,
+            envelope.priority,
+            envelope.coalesce_key,
+            envelope.partition_key,
+        ),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+
+
+def _first_sequence(segment: Path) -> int:
+    return int(segment.name.removesuffix(SEGMENT_SUFFIX))
+
+
+def _read_segment(segment: Path) -> Iterator[Envelope]:
+    with open(segment, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset + HEADER.size <= len(data):
+                size, crc, sequence = HEADER.unpack_from(data, offset)
+                payload = data[offset + HEADER.size : offset + HEADER.size + size]
+                # A short or corrupt record is a torn append, nothing valid follows it.
+                if len(payload) < size or zlib.crc32(payload) != crc:
+                    return
+                name, event_data, priority, coalesce_key, partition_key = pickle.loads(
+                    payload
+                )
+                envelope = Envelope(
+                    name,
+                    event_data,
+                    priority=priority,
+                    coalesce_key=coalesce_key,
+                    partition_key=partition_key,
+                )
+                envelope.sequence = sequence
+                yield envelope
+                offset += HEADER.size + size
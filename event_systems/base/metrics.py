@@ -0,0 +1,241 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+from event_systems.base.handler import AsyncRunner, SyncRunner
+
+# Upper bounds in seconds, from 10 microseconds to 10 seconds.
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """A histogram of durations with fixed bucket bounds. Not thread-safe by itself."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # The last one is +Inf.
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class Metrics:
+    """
+    Thread-safe counters and histograms of an event system.
+
+    Counters are kept per event name. Queue depth and dropped events are owned by the
+    event queue, so they are passed in when taking a snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.posted: Counter[str] = Counter()
+        self.dispatched: Counter[str] = Counter()
+        self.failed: Counter[str] = Counter()
+        self.in_flight = 0
+        self.queue_wait = Histogram()
+        self.handler_runtime = Histogram()
+
+    def record_posted(self, event_name: str, count: int = 1) -> None:
+        with self._lock:
+            self.posted[event_name] += count
+
+    def record_dispatched(self, event_name: str, queue_wait: float) -> None:
+        with self._lock:
+            self.dispatched[event_name] += 1
+            self.queue_wait.observe(queue_wait)
+
+    def handler_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def handler_finished(self, event_name: str, runtime: float, failed: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.handler_runtime.observe(runtime)
+            if failed:
+                self.failed[event_name] += 1
+
+    def instrument(self, event_name: str, runner: SyncRunner) -> SyncRunner:
+        def run(event_data: Dict[str, Any]) -> Any:
+            self.handler_started()
+            start, failed = time.perf_counter(), True
+            try:
+                result = runner(event_data)
+                failed = False
+                return result
+            finally:
+                self.handler_finished(event_name, time.perf_counter() - start, failed)
+
+        return run
+
+    def instrument_async(self, event_name: str, runner: AsyncRunner) -> AsyncRunner:
+        async def run(event_data: Dict[str, Any]) -> Any:
+            self.handler_started()
+            start, failed = time.perf_counter(), True
+            try:
+                result = await runner(event_data)
+                failed = False
+                return result
+            finally:
+                self.handler_finished(event_name, time.perf_counter() - start, failed)
+
+        return run
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            topics = set(self.posted) | set(self.dispatched) | set(self.failed)
+            return {
+                "topics": {
+                    topic: {
+                        "posted": self.posted[topic],
+                        "dispatched": self.dispatched[topic],
+                        "failed": self.failed[topic],
+                    }
+                    for topic in topics
+                },
+                "in_flight_handlers": self.in_flight,
+                "queue_wait_seconds": self.queue_wait.snapshot(),
+                "handler_runtime_seconds": self.handler_runtime.snapshot(),
+            }
+
+
+def build_stats(
+    metrics: Metrics | None,
+    queue_depth: int,
+    dropped: Mapping[str, int],
+) -> Dict[str, Any]:
+    """
+    Snapshot of an event system's metrics.
+
+    Without `metrics` (i.e. metrics are disabled) only queue depth and dropped events
+    are reported, as the queue tracks those anyway.
+    """
+    stats = (metrics or _DISABLED).snapshot()
+    stats["enabled"] = metrics is not None
+    stats["queue_depth"] = queue_depth
+    for topic, count in dropped.items():
+        stats["topics"].setdefault(
+            topic, {"posted": 0, "dispatched": 0, "failed": 0}
+        )["dropped"] = count
+    for counters in stats["topics"].values():
+        counters.setdefault("dropped", 0)
+    return stats
+
+
+_DISABLED = Metrics()
+
+
+def to_prometheus(stats: Dict[str, Any], system: str) -> str:
+    """Render a `build_stats` snapshot in the Prometheus text exposition format."""
+    base = f'system="{_escape(system)}"'
+    lines: List[str] = []
+
+    for counter, help_text in (
+        ("posted", "Events posted."),
+        ("dispatched", "Events taken off the queue and handed to their handlers."),
+        ("failed", "Handler invocations which raised."),
+        ("dropped", "Events dropped by a full queue."),
+    ):
+        name = f"event_system_events_{counter}_total"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for topic, counters in sorted(stats["topics"].items()):
+            lines.append(f'{name}{{{base},topic="{_escape(topic)}"}} {counters[counter]}')
+
+    for gauge, key, help_text in (
+        ("event_system_queue_depth", "queue_depth", "Events waiting in the queue."),
+        (
+            "event_system_handlers_in_flight",
+            "in_flight_handlers",
+            "Handlers currently running.",
+        ),
+    ):
+        lines += [
+            f"# HELP {gauge} {help_text}",
+            f"# TYPE {gauge} gauge",
+            f"{gauge}{{{base}}} {stats[key]}",
+        ]
+
+    for histogram, key, help_text in (
+        (
+            "event_system_queue_wait_seconds",
+            "queue_wait_seconds",
+            "Time events spent in the queue.",
+        ),
+        (
+            "event_system_handler_runtime_seconds",
+            "handler_runtime_seconds",
+            "Time handlers took to run.",
+        ),
+    ):
+        snapshot = stats[key]
+        lines += [f"# HELP {histogram} {help_text}", f"# TYPE {histogram} histogram"]
+        for bound, count in snapshot["buckets"].items():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{histogram}_bucket{{{base},le="{le}"}} {count}')
+        lines.append(f"{histogram}_sum{{{base}}} {snapshot['sum']}")
+        lines.append(f"{histogram}_count{{{base}}} {snapshot['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(
+    render: Callable[[], str],
+    port: int,
+    host: str = "127.0.0.1",
+) -> ThreadingHTTPServer:
+    """
+    Serve Prometheus text over HTTP from a daemon thread.
+
+    Pass the `prometheus_text` method of an event system as `render`. Shut the returned
+    server down with `shutdown()`.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
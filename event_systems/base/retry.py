@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Deque, List
+
+from event_systems.base.handler import Execution
+
+from event_systems.common_expressions import RETRY_NEEDS_AN_ATTEMPT
+
+if TYPE_CHECKING:
+    from event_systems.base.subscription import Subscription
+
+# The topic an async consumer is dispatching, as its handlers' runners only get the data.
+dispatching: ContextVar[str] = ContextVar("dispatching")
+
+
+class RetryPolicy:
+    """
+    How often a subscription's handler is run when it raises: at most `max_attempts`
+    times in all, waiting `initial_delay` seconds after the first failure and twice
+    as long after every further one, up to `max_delay`. With `jitter`, every delay is
+    drawn between zero and that backoff, so handlers which fail together don't retry
+    in lockstep.
+    """
+
+    __slots__ = ("max_attempts", "initial_delay", "max_delay", "jitter")
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        initial_delay: float = 0.1,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError(RETRY_NEEDS_AN_ATTEMPT)
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempts: int) -> float:
+        """Seconds to wait before the next attempt, after `attempts` failed ones."""
+        backoff = min(self.max_delay, self.initial_delay * 2.0 ** min(attempts - 1, 64))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+class FailedDelivery:
+    """
+    An event whose handler raised, waiting on the timer heap for its next attempt,
+    or in the dead letter queue once it has none left.
+    """
+
+    __slots__ = (
+        "subscription",
+        "execution",
+        "runner",
+        "event_name",
+        "event_data",
+        "attempts",
+        "exception",
+        "failed_at",
+        "sequence",
+        "settled",
+    )
+
+    def __init__(
+        self,
+        subscription: "Subscription",
+        execution: Execution,
+        runner: Callable[[Any], Any],
+        event_name: str,
+        event_data: Any,
+        sequence: int = 0,
+    ) -> None:
+        self.subscription = subscription
+        self.execution = execution
+        # The handler's runner without the failure handling, run again on retries.
+        self.runner = runner
+        # The topic the event was posted to, which a wildcard subscription only matches.
+        self.event_name = event_name
+        self.event_data = event_data
+        self.attempts = 0
+        self.exception: Exception | None = None
+        # time.time() timestamp of the last failure.
+        self.failed_at = 0.0
+        # Journal sequence number of the event, acknowledged once the delivery settles.
+        self.sequence = sequence
+        # The handler's final outcome, for replies which wait for the retries.
+        self.settled: Future[Any] = Future()
+        self.settled.set_running_or_notify_cancel()
+
+    def fail(self, exception: Exception) -> float | None:
+        """Record a failed attempt, and return the delay before the next one, if any."""
+        self.attempts += 1
+        self.exception = exception
+        self.failed_at = time.time()
+        policy = self.subscription.retry
+        if policy is None or self.attempts >= policy.max_attempts:
+            return None
+        return policy.delay(self.attempts)
+
+    def settle(self, outcome: Any) -> None:
+        """Resolve `settled` with the result of a retry, or the exception it ended with."""
+        if not self.settled.done():
+            self.settled.set_result(outcome)
+
+
+class DeadLetterQueue:
+    """
+    The failed deliveries of an event system which ran out of attempts, for
+    inspection and replay. Appending never waits: beyond `maxlen`, the oldest dead
+    letters are discarded and counted per event name in `discarded`. Safe to use from
+    any thread.
+    """
+
+    def __init__(self, maxlen: int = 10_000) -> None:
+        self._lock = threading.Lock()
+        self._letters: Deque[FailedDelivery] = deque(maxlen=maxlen)
+        self.discarded: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._letters)
+
+    def append(self, delivery: FailedDelivery) -> None:
+        with self._lock:
+            if len(self._letters) == self._letters.maxlen:
+                self.discarded[self._letters[0].event_name] += 1
+            self._letters.append(delivery)
+
+    def peek(self) -> List[FailedDelivery]:
+        """The dead letters, oldest first, without removing them."""
+        with self._lock:
+            return list(self._letters)
+
+    def take(
+        self, predicate: Callable[[FailedDelivery], bool] | None = None
+    ) -> List[FailedDelivery]:
+        """Remove and return the dead letters matching `predicate`, or all of them."""
+        taken: List[FailedDelivery] = []
+        kept: List[FailedDelivery] = []
+        with self._lock:
+            for delivery in self._letters:
+                if predicate is None or predicate(delivery):
+                    taken.append(delivery)
+                else:
+                    kept.append(delivery)
+            self._letters.clear()
+            self._letters.extend(kept)
+        return taken
@@ -0,0 +1,354 @@
+import itertools
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import uuid
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Set, Tuple
+
+from event_systems.base.handler import Execution
+from event_systems.base.subscription import Subscription
+from event_systems.base.threaded_protocols import Threaded
+from event_systems.base.topic_trie import is_pattern
+
+from event_systems.common_expressions import BRIDGE_NEEDS_EXACT_TOPICS, FRAME_TOO_LARGE
+
+logger = logging.getLogger(__name__)
+
+# TCP host and port, or the path of a Unix domain socket.
+Address = Tuple[str, int] | str
+
+# Frames are a 4 byte big-endian length followed by that many bytes of JSON.
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 2**20
+
+
+def write_frame(sock: socket.socket, payload: bytes) -> None:
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(FRAME_TOO_LARGE.format(size=len(payload), limit=MAX_FRAME_SIZE))
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def read_frame(sock: socket.socket) -> bytes | None:
+    """Read one frame, or return None once the peer has closed the connection."""
+    if (header := _read_exactly(sock, HEADER.size)) is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(FRAME_TOO_LARGE.format(size=size, limit=MAX_FRAME_SIZE))
+    return _read_exactly(sock, size)
+
+
+def _read_exactly(sock: socket.socket, size: int) -> bytes | None:
+    buffer = bytearray()
+    while len(buffer) < size:
+        if not (chunk := sock.recv(size - len(buffer))):
+            return None
+        buffer += chunk
+    return bytes(buffer)
+
+
+def _connect(address: Address, timeout: float | None) -> socket.socket:
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    sock = socket.create_connection(address, timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+class BridgeSender:
+    """
+    Forwards the events of selected topics from a local event system to a
+    `BridgeReceiver`, usually on another host.
+
+    Events are buffered and sent in batches of up to `batch_size`, each one frame,
+    which the receiver acknowledges once it has posted the events. Unacknowledged
+    batches are sent again after reconnecting, with exponential backoff up to
+    `max_reconnect_delay`, and the receiver skips batches it has already posted, so
+    a dropped connection neither loses nor duplicates events.
+
+    The buffer holds at most `max_buffered` events. Events are forwarded on the local
+    dispatcher, to keep them in order, so once the buffer is full forwarding waits up
+    to `block_timeout` seconds for room, which holds up all local topics. After that,
+    events of the bridged topics are counted in `dropped`, without waiting, until the
+    buffer has room again, so an unreachable receiver stalls the local system only
+    once. With `block_timeout=None`, forwarding waits as long as it takes, and a slow
+    or unreachable receiver backs up into the local queue, whose `overflow` then
+    decides what posting does.
+
+    Only exact topics can be bridged, since handlers don't learn the topic a wildcard
+    matched. Events are serialized as they are forwarded: event data which isn't JSON
+    serializable is logged and counted in `dropped`, as are events forwarded after the
+    sending thread has stopped. Events the receiver acknowledged but couldn't post are
+    counted in `rejected`.
+    """
+
+    def __init__(
+        self,
+        es: Threaded,
+        address: Address,
+        topics: Iterable[str],
+        batch_size: int = 256,
+        max_buffered: int = 10_000,
+        timeout: float | None = 30.0,
+        max_reconnect_delay: float = 2.0,
+        block_timeout: float | None = 1.0,
+    ) -> None:
+        self._topics = list(topics)
+        for topic in self._topics:
+            if is_pattern(topic):
+                raise ValueError(BRIDGE_NEEDS_EXACT_TOPICS.format(topic=topic))
+
+        self._es = es
+        self._address = address
+        self._batch_size = batch_size
+        self._max_buffered = max_buffered
+        self._timeout = timeout
+        self._max_reconnect_delay = max_reconnect_delay
+        self._block_timeout = block_timeout
+
+        # Identifies this sender's batches, so the receiver can skip repeated ones.
+        self._id = uuid.uuid4().hex
+        self._sequence = itertools.count(1)
+        # Events serialized as JSON arrays of topic and data, ready to be framed.
+        self._buffer: Deque[str] = deque()
+        self._condition = threading.Condition()
+        self._closing = False
+        self._abandoned = False
+        self._sending = False
+        # Set once forwarding timed out on a full buffer, until there is room again.
+        self._overflowing = False
+        self._socket: socket.socket | None = None
+        self._subscriptions: List[Subscription] = []
+        self.connects = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        self._sending = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        for topic in self._topics:
+            self._subscriptions.append(
+                self._es.subscribe(topic, self._forwarder(topic), Execution.INLINE)
+            )
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """
+        Stop forwarding, and wait up to `timeout` seconds for buffered events to be
+        delivered. Events which couldn't be delivered by then are counted in `dropped`.
+        """
+        for subscription in self._subscriptions:
+            subscription.cancel()
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._closing = True
+            self._abandoned = not flushed
+            self._condition.notify_all()
+        self._thread.join()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every forwarded event has been acknowledged."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._buffer, timeout)
+
+    def _forwarder(self, topic: str) -> Callable[[Dict[str, Any]], None]:
+        def forward(event_data: Dict[str, Any]) -> None:
+            try:
+                event = json.dumps([topic, event_data], separators=(",", ":"))
+            except (TypeError, ValueError):
+                logger.exception("Dropping event '%s' which isn't JSON serializable.", topic)
+                with self._condition:
+                    self.dropped += 1
+                return
+            with self._condition:
+                if not self._condition.wait_for(
+                    self._has_room, 0.0 if self._overflowing else self._block_timeout
+                ):
+                    self._overflowing = True
+                    self.dropped += 1
+                    return
+                self._overflowing = False
+                if not self._sending:
+                    self.dropped += 1
+                    return
+                self._buffer.append(event)
+                self._condition.notify_all()
+
+        return forward
+
+    def _has_room(self) -> bool:
+        return len(self._buffer) < self._max_buffered or not self._sending or self._closing
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._buffer or self._closing)
+                    if self._abandoned or not self._buffer:
+                        break
+                    batch = list(itertools.islice(self._buffer, self._batch_size))
+                frame = '{"sender":"%s","seq":%d,"events":[%s]}' % (
+                    self._id,
+                    next(self._sequence),
+                    ",".join(batch),
+                )
+                if not self._deliver(frame.encode()):
+                    break
+                with self._condition:
+                    for _ in batch:
+                        self._buffer.popleft()
+                    self._condition.notify_all()
+        except Exception:
+            logger.exception("Bridge sender to %s stopped.", self._address)
+        finally:
+            with self._condition:
+                self._sending = False
+                self.dropped += len(self._buffer)
+                self._buffer.clear()
+                self._condition.notify_all()
+            if self._socket is not None:
+                self._socket.close()
+
+    def _deliver(self, frame: bytes) -> bool:
+        """Send a frame until it is acknowledged, or return False once abandoned."""
+        delay = 0.0
+        while True:
+            try:
+                if self._socket is None:
+                    self._socket = _connect(self._address, self._timeout)
+                    self.connects += 1
+                write_frame(self._socket, frame)
+                if (ack := read_frame(self._socket)) is None:
+                    raise ConnectionResetError
+                self.rejected += json.loads(ack).get("rejected", 0)
+                return True
+            except OSError:
+                if self._socket is not None:
+                    self._socket.close()
+                    self._socket = None
+            with self._condition:
+                if self._abandoned:
+                    return False
+                self._condition.wait(delay)
+            delay = min(max(delay * 2, 0.01), self._max_reconnect_delay)
+
+
+class BridgeReceiver:
+    """
+    Accepts connections from `BridgeSender`s and posts the events they forward to a
+    local event system.
+
+    Every batch is posted with a single `post_many()`, so while the local queue is full
+    and blocking, the receiver stops reading and the senders stall in turn. Events of
+    topics without local subscriptions, and events the local system refuses, say with
+    `queue.Full`, are counted in `dropped` and reported back in the acknowledgement
+    instead of being sent again. With port 0, the actual port is in `address` once
+    started.
+    """
+
+    def __init__(self, es: Threaded, address: Address) -> None:
+        self._es = es
+        self.address = address
+        self.received = 0
+        self.dropped: Counter[str] = Counter()
+        # The last batch posted per sender, so batches sent again are skipped.
+        self._last_sequence: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._closing = False
+        self._connections: Set[socket.socket] = set()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if isinstance(self.address, str):
+            self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(self.address)
+        self._listener.listen()
+        # Accepting polls, so stop() doesn't depend on closing a socket waking it up.
+        self._listener.settimeout(0.1)
+        if not isinstance(self.address, str):
+            self.address = self._listener.getsockname()[:2]
+        self._accepter = threading.Thread(target=self._accept, daemon=True)
+        self._accepter.start()
+
+    def stop(self) -> None:
+        self._closing = True
+        self._accepter.join()
+        self._listener.close()
+        if isinstance(self.address, str):
+            os.unlink(self.address)
+        with self._lock:
+            for connection in self._connections:
+                connection.shutdown(socket.SHUT_RDWR)
+        for thread in self._threads:
+            thread.join()
+
+    def _accept(self) -> None:
+        while not self._closing:
+            try:
+                connection, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            connection.settimeout(None)
+            if not isinstance(self.address, str):
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._connections.add(connection)
+            thread = threading.Thread(target=self._serve, args=(connection,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _serve(self, connection: socket.socket) -> None:
+        try:
+            while (frame := read_frame(connection)) is not None:
+                batch = json.loads(frame)
+                sender, sequence = batch["sender"], batch["seq"]
+                rejected = 0
+                if sequence > self._last_sequence.get(sender, 0):
+                    rejected = self._post(batch["events"])
+                    self._last_sequence[sender] = sequence
+                write_frame(connection, b'{"ack":%d,"rejected":%d}' % (sequence, rejected))
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._connections.discard(connection)
+            connection.close()
+
+    def _post(self, events: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Post a batch, and return how many of its events couldn't be posted."""
+        self.received += len(events)
+        batch = []
+        for event_name, event_data in events:
+            if self._es.has_subscriptions(event_name):
+                batch.append((event_name, event_data))
+            else:
+                self.dropped[event_name] += 1
+        rejected = len(events) - len(batch)
+        try:
+            self._es.post_many(batch)
+            return rejected
+        except Exception:
+            pass
+        # post_many() posts all of a batch or nothing, so find the events at fault.
+        for event_name, event_data in batch:
+            try:
+                self._es.post_many([(event_name, event_data)])
+            except Exception:
+                logger.exception("Couldn't post bridged event '%s'.", event_name)
+                self.dropped[event_name] += 1
+                rejected += 1
+        return rejected
@@ -0,0 +1,166 @@
+import itertools
+import threading
+from typing import Any, Dict, Generic, List, Tuple, TypeVar
+
+from event_systems.base.handler import AsyncRunner, Handler, SyncRunner
+from event_systems.base.retry import RetryPolicy
+from event_systems.base.topic_trie import TopicTrie, is_pattern
+
+R = TypeVar("R")
+
+
+class Subscription(Dict[str, Any]):
+    """
+    The result of `subscribe()`, which doubles as a handle to cancel the subscription.
+
+    It is the familiar `{"success": ..., "message": ...}` dict, so existing callers keep
+    working. Failed subscriptions are never active and cancelling them does nothing.
+    """
+
+    def __init__(
+        self, event_name: str, handler: Handler, retry: RetryPolicy | None = None
+    ) -> None:
+        super().__init__()
+        self.event_name = event_name
+        self.handler = handler
+        # How the handler is retried when it raises, it is dead-lettered right away without.
+        self.retry = retry
+        self.active = False
+        self._registry: "SubscriptionRegistry[Any] | None" = None
+        self._key = -1
+
+    def cancel(self) -> bool:
+        """
+        Stop delivering events to the handler, in O(1). Safe to call from any thread,
+        including from within a running handler. Events which have already been taken
+        off the queue are not delivered either, unless their handler is already running.
+        Returns False if the subscription wasn't active.
+        """
+        if self._registry is None:
+            return False
+        return self._registry.remove(self)
+
+
+class SubscriptionRegistry(Generic[R]):
+    """
+    The subscriptions of an event system, with the runner of each subscribed handler.
+
+    Every event name maps to an insertion ordered dict keyed by subscription, so
+    handlers keep their subscription order and removing one doesn't scan the others.
+
+    Event names may be patterns with `*` (exactly one segment) and `#` (zero or more
+    segments) wildcards, e.g. `orders.*` or `orders.#`. Patterns are indexed in a
+    topic trie, and the handlers of a posted topic are those subscribed to its exact
+    name and to every matching pattern, in subscription order.
+
+    Dispatchers read immutable per-topic snapshots of the runners without locking or
+    copying, so resolving a hot topic costs a dict lookup. Changing the
+    subscriptions of an exact name discards its snapshot, changing those of a
+    pattern discards all snapshots, and the next read rebuilds it once under the
+    lock.
+    """
+
+    # Bounds the snapshot cache when many distinct topics match patterns.
+    SNAPSHOT_LIMIT = 4096
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._keys = itertools.count()
+        self._topics: Dict[str, Dict[int, Tuple[Subscription, R]]] = {}
+        self._patterns = TopicTrie()
+        self._snapshots: Dict[str, Tuple[R, ...]] = {}
+
+    def __contains__(self, event_name: str) -> bool:
+        """Whether any handler is subscribed to an event name, directly or by pattern."""
+        return event_name in self._topics or bool(self.runners(event_name))
+
+    def add(self, subscription: Subscription, runner: R) -> None:
+        with self._lock:
+            subscription._key = next(self._keys)
+            subscription._registry = self
+            subscription.active = True
+            if (topic := self._topics.get(subscription.event_name)) is None:
+                topic = self._topics[subscription.event_name] = {}
+                if is_pattern(subscription.event_name):
+                    self._patterns.add(subscription.event_name)
+            topic[subscription._key] = (subscription, runner)
+            self._invalidate(subscription.event_name)
+
+    def remove(self, subscription: Subscription) -> bool:
+        with self._lock:
+            if not subscription.active:
+                return False
+            subscription.active = False
+            topic = self._topics[subscription.event_name]
+            del topic[subscription._key]
+            if not topic:
+                del self._topics[subscription.event_name]
+                if is_pattern(subscription.event_name):
+                    self._patterns.remove(subscription.event_name)
+            self._invalidate(subscription.event_name)
+            return True
+
+    def clear(self) -> None:
+        """Cancel all subscriptions."""
+        with self._lock:
+            for topic in self._topics.values():
+                for subscription, _ in topic.values():
+                    subscription.active = False
+            self._topics = {}
+            self._patterns = TopicTrie()
+            self._snapshots = {}
+
+    def runners(self, event_name: str) -> Tuple[R, ...]:
+        """The runners of a posted topic, in subscription order. Lock-free once built."""
+        if (snapshot := self._snapshots.get(event_name)) is not None:
+            return snapshot
+        with self._lock:
+            names = self._patterns.match(event_name) if self._patterns else set()
+            if event_name in self._topics:
+                names.add(event_name)
+            if not names:
+                return ()
+            if len(names) == 1:
+                entries = list(self._topics[names.pop()].items())
+            else:
+                entries = sorted(
+                    entry for name in names for entry in self._topics[name].items()
+                )
+            snapshot = tuple(runner for _, (_, runner) in entries)
+            if len(self._snapshots) >= self.SNAPSHOT_LIMIT:
+                self._snapshots = {}
+            self._snapshots[event_name] = snapshot
+            return snapshot
+
+    def _invalidate(self, event_name: str) -> None:
+        if is_pattern(event_name):
+            self._snapshots = {}
+        else:
+            self._snapshots.pop(event_name, None)
+
+    def handlers(self) -> Dict[str, List[Handler]]:
+        with self._lock:
+            return {
+                event_name: [subscription.handler for subscription, _ in topic.values()]
+                for event_name, topic in self._topics.items()
+            }
+
+
+def guard_async_runner(subscription: Subscription, runner: AsyncRunner) -> AsyncRunner:
+    """Return a runner which skips the handler once the subscription is cancelled."""
+
+    async def run_if_active(event_data: Dict[str, Any]) -> Any:
+        if subscription.active:
+            return await runner(event_data)
+
+    return run_if_active
+
+
+def guard_sync_runner(subscription: Subscription, runner: SyncRunner) -> SyncRunner:
+    """Return a runner which skips the handler once the subscription is cancelled."""
+
+    def run_if_active(event_data: Dict[str, Any]) -> Any:
+        if subscription.active:
+            return runner(event_data)
+
+    return run_if_active
@@ -1,21 +1,83 @@
-from typing import Any, Dict, List, Protocol
-from event_systems.base.handler import Handler
+from concurrent.futures import Future
+from typing import Any, Dict, Hashable, Iterable, List, Protocol, Tuple
+from event_systems.base.handler import Execution, Handler
+from event_systems.base.retry import DeadLetterQueue, RetryPolicy
+from event_systems.base.subscription import Subscription
+from event_systems.base.timers import Timer
 
 
-# TODO: Unsubscribe
 class Threaded(Protocol):
+    dead_letters: DeadLetterQueue
+
     def name(self) -> str | None: ...
 
     def start(self) -> None: ...
 
     def stop(self) -> None: ...
 
-    def subscribe(self, event_name: str, fn: Handler) -> Dict[str, Any]: ...
+    def subscribe(
+        self,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription: ...
+
+    def post(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> None: ...
+
+    def post_event(
+        self,
+        event: object,
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> None: ...
+
+    def post_and_collect(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        partition_key: Hashable | None = None,
+    ) -> Future[List[Any]]: ...
+
+    def post_after(
+        self,
+        delay: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> Timer: ...
 
-    def post(self, event_name: str, event_data: Dict[str, Any]) -> None: ...
+    def post_at(
+        self,
+        timestamp: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> Timer: ...
+
+    def post_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None: ...
 
     def get_subscriptions(self) -> Dict[str, List[Handler]]: ...
 
+    def get_dropped_events(self) -> Dict[str, int]: ...
+
+    def has_subscriptions(self, event_name: str) -> bool: ...
+
+    def replay_dead_letters(self, event_name: str | None = None) -> int: ...
+
     def process_all_events(self) -> None: ...
 
     def is_running(self) -> bool: ...
@@ -0,0 +1,104 @@
+import heapq
+import itertools
+import threading
+from typing import List, Tuple
+
+from event_systems.base.envelope import Envelope
+
+
+class Timer:
+    """Handle of an event scheduled with `post_after()` or `post_at()`."""
+
+    __slots__ = ("when", "envelope", "active", "_heap")
+
+    def __init__(self, when: float, envelope: Envelope, heap: "TimerHeap") -> None:
+        self.when = when
+        self.envelope = envelope
+        self.active = True
+        self._heap = heap
+
+    def cancel(self) -> bool:
+        """
+        Keep the event from being posted. Safe to call from any thread. Returns False
+        if the event has already been posted or cancelled.
+        """
+        return self._heap.cancel(self)
+
+
+class TimerHeap:
+    """
+    The pending timers of an event system, ordered by deadline.
+
+    Deadlines are on the clock of the driving event system, `time.monotonic()` for
+    the threaded one and the loop's time for the async ones. Scheduling and
+    popping due timers are O(log n). Cancelling is O(1): cancelled timers are
+    skipped once they come up, and the heap is compacted once most of it consists
+    of cancelled timers.
+    """
+
+    COMPACTION_THRESHOLD = 64
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[float, int, Timer]] = []
+        self._sequence = itertools.count()
+        self._cancelled = 0
+
+    def __len__(self) -> int:
+        return len(self._entries) - self._cancelled
+
+    def push(self, when: float, envelope: Envelope) -> Tuple[Timer, bool]:
+        """Schedule an event, and tell whether it is now the earliest one."""
+        timer = Timer(when, envelope, self)
+        with self._lock:
+            heapq.heappush(self._entries, (when, next(self._sequence), timer))
+            return timer, self._entries[0][2] is timer
+
+    def cancel(self, timer: Timer) -> bool:
+        with self._lock:
+            if not timer.active:
+                return False
+            timer.active = False
+            self._cancelled += 1
+            if (
+                self._cancelled > self.COMPACTION_THRESHOLD
+                and self._cancelled * 2 > len(self._entries)
+            ):
+                self._entries = [entry for entry in self._entries if entry[2].active]
+                heapq.heapify(self._entries)
+                self._cancelled = 0
+            return True
+
+    def next_deadline(self) -> float | None:
+        with self._lock:
+            self._skip_cancelled()
+            return self._entries[0][0] if self._entries else None
+
+    def pop_due(self, now: float) -> List[Timer]:
+        """Take the timers whose deadline has passed, in deadline order."""
+        due: List[Timer] = []
+        with self._lock:
+            self._skip_cancelled()
+            while self._entries and self._entries[0][0] <= now:
+                timer = heapq.heappop(self._entries)[2]
+                timer.active = False
+                due.append(timer)
+                self._skip_cancelled()
+        return due
+
+    def pop_all(self) -> List[Timer]:
+        """Take all pending timers, in deadline order."""
+        return self.pop_due(float("inf"))
+
+    def clear(self) -> None:
+        """Cancel all pending timers."""
+        with self._lock:
+            for _, _, timer in self._entries:
+                timer.active = False
+            self._entries = []
+            self._cancelled = 0
+
+    def _skip_cancelled(self) -> None:
+        while self._entries and not self._entries[0][2].active:
+            heapq.heappop(self._entries)
+            self._cancelled -= 1
@@ -0,0 +1,79 @@
+from typing import Dict, List, Set
+
+SEPARATOR = "."
+ONE_SEGMENT = "*"  # Matches exactly one segment, e.g. `orders.*` matches `orders.eu`.
+ANY_SEGMENTS = "#"  # Matches zero or more segments, e.g. `orders.#` matches `orders.eu.limit`.
+
+
+def is_pattern(event_name: str) -> bool:
+    """Whether an event name contains wildcard segments."""
+    return any(
+        segment in (ONE_SEGMENT, ANY_SEGMENTS)
+        for segment in event_name.split(SEPARATOR)
+    )
+
+
+class _Node:
+    __slots__ = ("children", "pattern")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.pattern: str | None = None
+
+
+class TopicTrie:
+    """
+    An index of wildcard patterns over dot separated topics.
+
+    Matching walks the trie segment by segment, so its cost depends on the depth of
+    the topic and the number of wildcard branches, not on the number of patterns.
+    Not thread-safe, callers synchronize.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+
+    def __bool__(self) -> bool:
+        return bool(self._root.children)
+
+    def add(self, pattern: str) -> None:
+        node = self._root
+        for segment in pattern.split(SEPARATOR):
+            node = node.children.setdefault(segment, _Node())
+        node.pattern = pattern
+
+    def remove(self, pattern: str) -> None:
+        path: List[_Node] = [self._root]
+        segments = pattern.split(SEPARATOR)
+        for segment in segments:
+            if (child := path[-1].children.get(segment)) is None:
+                return
+            path.append(child)
+        path[-1].pattern = None
+
+        # Prune the branch from the leaf upwards while its nodes lead nowhere.
+        for segment, node, parent in zip(
+            reversed(segments), reversed(path), reversed(path[:-1])
+        ):
+            if node.children or node.pattern is not None:
+                break
+            del parent.children[segment]
+
+    def match(self, topic: str) -> Set[str]:
+        """The patterns which match a topic."""
+        matches: Set[str] = set()
+        self._match(self._root, topic.split(SEPARATOR), 0, matches)
+        return matches
+
+    def _match(self, node: _Node, segments: List[str], i: int, matches: Set[str]) -> None:
+        if (any_segments := node.children.get(ANY_SEGMENTS)) is not None:
+            for j in range(i, len(segments) + 1):
+                self._match(any_segments, segments, j, matches)
+        if i == len(segments):
+            if node.pattern is not None:
+                matches.add(node.pattern)
+            return
+        if (child := node.children.get(segments[i])) is not None:
+            self._match(child, segments, i + 1, matches)
+        if (one_segment := node.children.get(ONE_SEGMENT)) is not None:
+            self._match(one_segment, segments, i + 1, matches)
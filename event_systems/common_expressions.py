@@ -3,6 +3,19 @@ from typing import Any, Dict
 
 NEEDS_INITIALIZATION = "'{class_name}' must be initialized before posting events."
 NO_SUBSCRIPTION_FOUND = "No subscription found with '{event}'."
+CONSUMERS_OUT_OF_RANGE = "At least one consumer is required."
+PRIORITY_NEEDS_PRIORITY_QUEUE = (
+    "Posting with a priority requires an event system created with priorities=True."
+)
+BOUNDED_FAN_OUT_NEEDS_LIMIT = (
+    "Bounded fan-out requires max_concurrent_handlers to be at least 1."
+)
+PROCESSES_OUT_OF_RANGE = "At least one worker process is required."
+WORKER_SETUP_FAILED = "Setting up worker process {worker} failed: {error}"
+WORKER_EXITED = "Worker process {worker} exited unexpectedly with exit code {code}."
+BRIDGE_NEEDS_EXACT_TOPICS = "Bridged topics must be exact topic names, not '{topic}'."
+FRAME_TOO_LARGE = "Frame of {size} bytes exceeds the limit of {limit} bytes."
+RETRY_NEEDS_AN_ATTEMPT = "A retry policy requires max_attempts to be at least 1."
 
 
 def subscription_success(event_name: str) -> Dict[str, Any]:
@@ -1,11 +1,39 @@
 import asyncio
-from typing import Callable, Dict, List, Any, Tuple, cast
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, List, Any, Set, Tuple, Hashable
 
 from event_systems.base.async_protocols import Async
-from event_systems.base.handler import Handler
+from event_systems.base.envelope import Envelope, Reply, event_topic
+from event_systems.base.event_queue import AsyncEventQueue, Overflow
+from event_systems.base.fan_out import FanOut, collect_results, run_handlers
+from event_systems.base.handler import (
+    AsyncRunner,
+    Execution,
+    Handler,
+    compile_async_runner,
+)
+from event_systems.base.metrics import Metrics, build_stats, to_prometheus
+from event_systems.base.retry import (
+    DeadLetterQueue,
+    FailedDelivery,
+    RetryPolicy,
+    dispatching,
+)
+from event_systems.base.subscription import (
+    Subscription,
+    SubscriptionRegistry,
+    guard_async_runner,
+)
+from event_systems.base.timers import Timer, TimerHeap
 
 from event_systems.common_expressions import (
+    BOUNDED_FAN_OUT_NEEDS_LIMIT,
+    CONSUMERS_OUT_OF_RANGE,
     NO_SUBSCRIPTION_FOUND,
+    PRIORITY_NEEDS_PRIORITY_QUEUE,
     subscription_failure,
     subscription_success,
 )
@@ -18,14 +46,102 @@ class AsyncEventSystem(Async):
     ATTENTION: Custom loop mechanism is experimental and not really working.
     This class provides an event system using asyncio for asynchronous event handling.
     It allows subscribing to events, posting events, and managing the event loop.
+
+    The handlers of one event are run according to `fan_out`: sequentially, fully
+    concurrently, or concurrently with at most `max_concurrent_handlers` handlers
+    running at once.
+
+    `consumers` sets the number of tasks draining the event queue, so a slow event
+    doesn't hold back the events behind it. With more than one consumer, events are
+    only guaranteed to be dispatched in posting order per topic if
+    `preserve_topic_order` is set, in which case events of the same topic never
+    overlap. A consumer taking an event whose topic another consumer is busy with
+    hands it over to that consumer's backlog and moves on, so a slow topic occupies
+    a single consumer.
+
+    With a `max_queue_size` the queue is bounded and `overflow` decides whether
+    posting to a full queue awaits, drops the new or the oldest event, or raises
+    `asyncio.QueueFull`.
+
+    Sync handlers run in the loop's default executor, or in a dedicated pool of
+    `sync_workers` threads if given. Handlers subscribed with `Execution.INLINE` are
+    called directly on the loop instead, which avoids the thread hop for handlers that
+    never block. Handlers subscribed with `Execution.PROCESS` run in a process pool of
+    `process_workers` processes, for CPU-bound work.
+
+    With `priorities`, events are dispatched by the priority they were posted with,
+    lower values first and in posting order within a priority. `priority_aging`
+    raises the priority of waiting events by one level per that many seconds, so
+    low priority events can't starve.
+
+    Events posted with a `coalesce_key` replace the data of a still pending event with
+    the same name and key, which keeps its queue position. For state updates where
+    only the latest value counts, handlers then skip the stale ones.
+
+    Besides dicts posted under an event name, typed event objects, ideally with
+    `__slots__` such as `dataclass(slots=True)` instances, can be posted with
+    `post_event()` and reach the handlers subscribed to their class.
+
+    Other threads post with `post_threadsafe()` and `post_many_threadsafe()`, which
+    collect events in an inbox that the loop takes over with one wakeup per batch.
+
+    `post_and_collect()` posts an event and returns what its handlers returned, or the
+    exceptions they raised, in subscription order.
+
+    `post_after()` and `post_at()` schedule events on a timer heap, driven by a single
+    loop callback armed for the earliest deadline. On `stop()` pending timers are
+    posted right away if `flush_timers` is set, and discarded otherwise.
+
+    Handlers which raise are run again according to the `RetryPolicy` of their
+    subscription, in tasks of their own started from the timer heap, so retries
+    never hold up the consumers. Once out of attempts, or right away without a policy,
+    failed events go to `dead_letters`, which keeps the latest `max_dead_letters`, and
+    `replay_dead_letters()` runs their handlers again.
+
+    With `metrics` enabled, the system counts posted, dispatched and failed events per
+    event name and records queue wait and handler runtime histograms, see `stats()` and
+    `prometheus_text()`.
     """
 
     def __init__(
         self,
         asyncio_loop: asyncio.AbstractEventLoop | None = None,
         name: str | None = None,
+        fan_out: FanOut = FanOut.SEQUENTIAL,
+        max_concurrent_handlers: int | None = None,
+        consumers: int = 1,
+        preserve_topic_order: bool = False,
+        max_queue_size: int = 0,
+        overflow: Overflow = Overflow.BLOCK,
+        sync_workers: int | None = None,
+        process_workers: int | None = None,
+        metrics: bool = False,
+        priorities: bool = False,
+        priority_aging: float | None = None,
+        flush_timers: bool = False,
+        max_dead_letters: int = 10_000,
     ) -> None:
+        if consumers < 1:
+            raise ValueError(CONSUMERS_OUT_OF_RANGE)
+        if fan_out is FanOut.BOUNDED and (
+            max_concurrent_handlers is None or max_concurrent_handlers < 1
+        ):
+            raise ValueError(BOUNDED_FAN_OUT_NEEDS_LIMIT)
+
         self._name = name
+        self._fan_out = fan_out
+        self._max_concurrent_handlers = max_concurrent_handlers
+        self._consumers = consumers
+        self._preserve_topic_order = preserve_topic_order
+        self._max_queue_size = max_queue_size
+        self._overflow = overflow
+        self._sync_workers = sync_workers
+        self._process_workers = process_workers
+        self._metrics_enabled = metrics
+        self._priorities = priorities
+        self._priority_aging = priority_aging
+        self._flush_timers = flush_timers
+        self.dead_letters = DeadLetterQueue(max_dead_letters)
         self._setup_initial_state(asyncio_loop)
 
     def _setup_initial_state(
@@ -37,8 +153,48 @@ class AsyncEventSystem(Async):
         self._asyncio_loop = (
             asyncio_loop if asyncio_loop is not None else asyncio.get_event_loop()
         )
-        self._subscriptions: Dict[str, List[Handler]] = {}
-        self._event_queue: asyncio.Queue[Tuple[str, Dict[str, Any]]] = asyncio.Queue()
+        # Handlers classified into runners at subscription time, per event name.
+        self._subscriptions: SubscriptionRegistry[AsyncRunner] = SubscriptionRegistry()
+        self._event_queue = AsyncEventQueue(
+            self._max_queue_size, self._overflow, self._priorities, self._priority_aging
+        )
+        self._semaphore = (
+            asyncio.Semaphore(self._max_concurrent_handlers)
+            if self._max_concurrent_handlers
+            else None
+        )
+        # Events of topics a consumer is busy with, which that consumer dispatches next.
+        self._topic_backlogs: Dict[str, Deque[Envelope]] = {}
+        self._sync_executor = (
+            ThreadPoolExecutor(
+                max_workers=self._sync_workers,
+                thread_name_prefix=f"{self._name or 'async_event_system'}_sync",
+            )
+            if self._sync_workers
+            else None
+        )
+        # Created on the first subscription with Execution.PROCESS.
+        self._process_executor: ProcessPoolExecutor | None = None
+        self._metrics = Metrics() if self._metrics_enabled else None
+
+        self._timers = TimerHeap()
+        self._timer_handle: asyncio.TimerHandle | None = None
+        self._timer_tasks: Set[asyncio.Task[None]] = set()
+
+        # Failed handlers waiting for, or running, their next attempt.
+        self._retries_pending = 0
+        self._retries_idle = asyncio.Event()
+        self._retries_idle.set()
+        # Set on stop(), from when on failures are dead-lettered without retrying.
+        self._stopping = False
+
+        # Events posted from other threads, waiting for the loop to enqueue them.
+        self._inbox: Deque[Envelope] = deque()
+        self._inbox_lock = threading.Lock()
+        self._inbox_scheduled = False
+        # Taken over from the inbox, waiting for room in a blocking, bounded queue.
+        self._backlog: Deque[Envelope] = deque()
+        self._backlog_task: asyncio.Task[None] | None = None
 
     async def name(self) -> str | None:
         return self._name
@@ -52,50 +208,377 @@ class AsyncEventSystem(Async):
         self._task = self._asyncio_loop.create_task(self._run_event_loop())
 
     async def stop(self) -> None:
-        self._is_running = False
+        self._stopping = True
+        self._arm_timers(None)
+        timers = self._timers.pop_all()
+        if self._flush_timers:
+            await self._post_due(timers)
+        else:
+            for timer in timers:
+                if (delivery := timer.envelope.retry) is not None:
+                    self.dead_letters.append(delivery)
+                    delivery.settle(delivery.exception)
+                    self._retry_finished()
+        if self._timer_tasks:
+            await asyncio.gather(*self._timer_tasks)
+
+        await self._drain_inbox()
+
+        # Join before clearing the flag, so a consumer which hasn't started yet still runs.
         if hasattr(self, "_event_queue"):
             await self._event_queue.join()
+        self._is_running = False
 
         if hasattr(self, "_task"):
             self._task.cancel()
             try:
-                # Run wait_for in the context of the custom loop but don't await the result
-                self._asyncio_loop.run_until_complete(
-                    asyncio.wait_for(self._task, timeout=1.0)
-                )
+                if self._asyncio_loop is asyncio.get_running_loop():
+                    await asyncio.wait_for(self._task, timeout=1.0)
+                else:
+                    # Run wait_for in the context of the custom loop but don't await the result
+                    self._asyncio_loop.run_until_complete(
+                        asyncio.wait_for(self._task, timeout=1.0)
+                    )
             except asyncio.CancelledError:
                 pass  # Task was successfully cancelled
             except asyncio.TimeoutError:
                 pass
 
         # Clean up resources
+        if self._sync_executor is not None:
+            self._sync_executor.shutdown(wait=True)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=True)
         if hasattr(self, "_event_queue"):
             del self._event_queue
         if hasattr(self, "_task"):
             del self._task
 
         # Reset state
+        self._subscriptions.clear()
         self._setup_initial_state(self._asyncio_loop)
 
-    async def subscribe(self, event_name: str, fn: Handler) -> Dict[str, Any]:
+    async def subscribe(
+        self,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription:
+        if isinstance(event_name, type):
+            event_name = event_topic(event_name)
+        subscription = Subscription(event_name, fn, retry)
         async with self._lock:
             try:
-                if event_name not in self._subscriptions:
-                    self._subscriptions[event_name] = []
-                self._subscriptions[event_name].append(fn)
+                runner = compile_async_runner(fn, execution, self._executor_for(execution))
+                if self._metrics is not None:
+                    runner = self._metrics.instrument_async(event_name, runner)
+                runner = self._catch_failures(subscription, execution, runner)
+                self._subscriptions.add(
+                    subscription, guard_async_runner(subscription, runner)
+                )
+
+                subscription.update(subscription_success(event_name))
+            except Exception as e:
+                subscription.update(subscription_failure(event_name, e))
+        return subscription
+
+    async def post(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None:
+        await self._post(
+            Envelope(event_name, event_data, priority=priority, coalesce_key=coalesce_key)
+        )
+
+    async def post_event(
+        self,
+        event: object,
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None:
+        """Post a typed event object to the handlers subscribed to its class."""
+        await self._post(
+            Envelope(
+                event_topic(type(event)),
+                event,
+                priority=priority,
+                coalesce_key=coalesce_key,
+            )
+        )
+
+    async def post_and_collect(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        timeout: float | None = None,
+    ) -> List[Any]:
+        """
+        Post the event and wait until its handlers have run, with their retries. Returns
+        their return values, or the exceptions they ended with, in subscription order.
+        Raises `TimeoutError` after
+        `timeout` seconds, and `asyncio.QueueFull` if a bounded queue drops the event.
+        """
+        reply: asyncio.Future[List[Any]] = self._asyncio_loop.create_future()
+        await self._post(Envelope(event_name, event_data, priority=priority, reply=reply))
+        try:
+            return await asyncio.wait_for(reply, timeout)
+        except asyncio.TimeoutError:
+            # Before Python 3.11 asyncio has a TimeoutError of its own.
+            raise TimeoutError from None
+
+    async def post_after(
+        self,
+        delay: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer:
+        """Post the event once `delay` seconds have passed."""
+        return self._schedule(
+            self._asyncio_loop.time() + delay,
+            Envelope(event_name, event_data, priority=priority, coalesce_key=coalesce_key),
+        )
+
+    async def post_at(
+        self,
+        timestamp: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer:
+        """Post the event at a `time.time()` timestamp."""
+        return await self.post_after(
+            timestamp - time.time(),
+            event_name,
+            event_data,
+            priority=priority,
+            coalesce_key=coalesce_key,
+        )
+
+    def _schedule(self, when: float, envelope: Envelope) -> Timer:
+        if envelope.name not in self._subscriptions:
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=envelope.name))
+        if envelope.priority and not self._priorities:
+            raise ValueError(PRIORITY_NEEDS_PRIORITY_QUEUE)
+        return self._push_timer(when, envelope)
+
+    def _push_timer(self, when: float, envelope: Envelope) -> Timer:
+        timer, earliest = self._timers.push(when, envelope)
+        if earliest:
+            self._arm_timers(when)
+        return timer
+
+    def _arm_timers(self, when: float | None) -> None:
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
+        self._timer_handle = (
+            None if when is None else self._asyncio_loop.call_at(when, self._fire_timers)
+        )
+
+    def _fire_timers(self) -> None:
+        self._timer_handle = None
+        if due := self._timers.pop_due(self._asyncio_loop.time()):
+            task = self._asyncio_loop.create_task(self._post_due(due))
+            self._timer_tasks.add(task)
+            task.add_done_callback(self._timer_tasks.discard)
+        self._arm_timers(self._timers.next_deadline())
+
+    async def _post_due(self, timers: List[Timer]) -> None:
+        for timer in timers:
+            if (delivery := timer.envelope.retry) is not None:
+                task = self._asyncio_loop.create_task(self._retry(delivery))
+                self._timer_tasks.add(task)
+                task.add_done_callback(self._timer_tasks.discard)
+                continue
+            # Subscriptions may have been cancelled, or the queue may be full, meanwhile.
+            try:
+                await self._post(timer.envelope)
+            except (ValueError, asyncio.QueueFull):
+                self._event_queue.dropped[timer.envelope.name] += 1
 
-                return subscription_success(event_name)
+    def _catch_failures(
+        self, subscription: Subscription, execution: Execution, runner: AsyncRunner
+    ) -> AsyncRunner:
+        """
+        Return a runner which hands failures over to retrying, and returns the failed
+        delivery instead of raising, so the exception never reaches the consumers.
+        """
+
+        async def run(event_data: Dict[str, Any]) -> Any:
+            try:
+                return await runner(event_data)
             except Exception as e:
-                return subscription_failure(event_name, e)
+                delivery = FailedDelivery(
+                    subscription, execution, runner, dispatching.get(), event_data
+                )
+                self._failed(delivery, e)
+                return delivery
+
+        return run
+
+    def _failed(self, delivery: FailedDelivery, exception: Exception) -> None:
+        delay = delivery.fail(exception)
+        if delay is None or self._stopping:
+            self.dead_letters.append(delivery)
+            delivery.settle(exception)
+        else:
+            self._schedule_retry(delivery, delay)
+
+    def _schedule_retry(self, delivery: FailedDelivery, delay: float) -> None:
+        envelope = Envelope(delivery.event_name, delivery.event_data)
+        envelope.retry = delivery
+        self._retries_pending += 1
+        self._retries_idle.clear()
+        self._push_timer(self._asyncio_loop.time() + delay, envelope)
+
+    async def _retry(self, delivery: FailedDelivery) -> None:
+        try:
+            if not delivery.subscription.active:
+                delivery.settle(delivery.exception)
+            else:
+                try:
+                    delivery.settle(await delivery.runner(delivery.event_data))
+                except Exception as e:
+                    self._failed(delivery, e)
+        finally:
+            self._retry_finished()
+
+    def _retry_finished(self) -> None:
+        self._retries_pending -= 1
+        if not self._retries_pending:
+            self._retries_idle.set()
+
+    async def replay_dead_letters(self, event_name: str | None = None) -> int:
+        """
+        Run the handlers of the dead letters again, with all their attempts, or only
+        those of events posted to `event_name`. Dead letters of cancelled
+        subscriptions stay. Returns how many were replayed.
+        """
+        letters = self.dead_letters.take(
+            lambda delivery: delivery.subscription.active
+            and (event_name is None or delivery.event_name == event_name)
+        )
+        for delivery in letters:
+            delivery.attempts = 0
+            self._schedule_retry(delivery, 0.0)
+        return len(letters)
+
+    async def _post(self, envelope: Envelope) -> None:
+        if envelope.name not in self._subscriptions:
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=envelope.name))
+        if envelope.priority and not self._priorities:
+            raise ValueError(PRIORITY_NEEDS_PRIORITY_QUEUE)
+
+        if self._metrics is not None:
+            envelope.posted_at = time.perf_counter()
+            self._metrics.record_posted(envelope.name)
+        await self._event_queue.put(envelope)
+
+    def post_threadsafe(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None:
+        """
+        Post the event from any thread, without awaiting. The event is enqueued once the
+        loop takes over the inbox, in posting order with other thread-safe posts.
+        """
+        self._post_threadsafe(
+            [Envelope(event_name, event_data, priority=priority, coalesce_key=coalesce_key)]
+        )
+
+    def post_many_threadsafe(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Post all events from any thread, see `post_threadsafe()`."""
+        self._post_threadsafe(
+            [Envelope(event_name, event_data) for event_name, event_data in events]
+        )
+
+    def _post_threadsafe(self, batch: List[Envelope]) -> None:
+        for envelope in batch:
+            if envelope.name not in self._subscriptions:
+                raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=envelope.name))
+            if envelope.priority and not self._priorities:
+                raise ValueError(PRIORITY_NEEDS_PRIORITY_QUEUE)
+        if self._metrics is not None:
+            posted_at = time.perf_counter()
+            for envelope in batch:
+                envelope.posted_at = posted_at
+                self._metrics.record_posted(envelope.name)
+
+        with self._inbox_lock:
+            self._inbox.extend(batch)
+            # Only the first post since the loop last took over the inbox wakes it up.
+            if self._inbox_scheduled:
+                return
+            self._inbox_scheduled = True
+        self._asyncio_loop.call_soon_threadsafe(self._take_inbox)
 
-    async def post(self, event_name: str, event_data: Dict[str, Any]) -> None:
-        if event_name not in self._subscriptions:
-            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+    def _take_inbox(self) -> None:
+        with self._inbox_lock:
+            self._backlog.extend(self._inbox)
+            self._inbox.clear()
+            self._inbox_scheduled = False
+        if self._backlog_task is not None:
+            return  # Still waiting for room, and events must not overtake the backlog.
 
-        await self._event_queue.put((event_name, event_data))
+        # Enqueue without a task, unless a blocking, bounded queue runs full.
+        while self._backlog:
+            if self._overflow is Overflow.BLOCK and self._event_queue.full():
+                self._backlog_task = self._asyncio_loop.create_task(self._put_backlog())
+                return
+            envelope = self._backlog.popleft()
+            try:
+                self._event_queue.put_nowait(envelope)
+            except asyncio.QueueFull:
+                # With Overflow.RAISE there is no caller left to raise to.
+                self._event_queue.dropped[envelope.name] += 1
+
+    async def _put_backlog(self) -> None:
+        while self._backlog:
+            await self._event_queue.put(self._backlog.popleft())
+        self._backlog_task = None
+
+    async def _drain_inbox(self) -> None:
+        self._take_inbox()
+        if self._backlog_task is not None:
+            await self._backlog_task
+
+    async def post_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        batch = [Envelope(event_name, event_data) for event_name, event_data in events]
+        for event_name in {envelope.name for envelope in batch}:
+            if event_name not in self._subscriptions:
+                raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+        if self._metrics is not None:
+            posted_at = time.perf_counter()
+            for envelope in batch:
+                envelope.posted_at = posted_at
+                self._metrics.record_posted(envelope.name)
+        await self._event_queue.put_many(batch)
 
     async def get_subscriptions(self) -> Dict[str, List[Handler]]:
-        return self._subscriptions
+        return self._subscriptions.handlers()
+
+    async def get_dropped_events(self) -> Dict[str, int]:
+        return dict(self._event_queue.dropped)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the system's metrics. Safe to call from any thread."""
+        return build_stats(
+            self._metrics, self._event_queue.qsize(), self._event_queue.dropped_snapshot()
+        )
+
+    def prometheus_text(self) -> str:
+        """The `stats()` snapshot in Prometheus text format. Safe to call from any thread."""
+        return to_prometheus(self.stats(), self._name or "async_event_system")
 
     async def is_running(self) -> bool:
         return self._is_running
@@ -113,25 +596,79 @@ class AsyncEventSystem(Async):
             )
 
         # Since we're already in the correct loop context, we can simply await
+        await self._drain_inbox()
         await self._event_queue.join()
+        # Failed handlers have succeeded or are dead-lettered once retrying is idle.
+        await self._retries_idle.wait()
 
-    async def _run_handler(self, handler: Handler, event_data: Dict[str, Any]) -> None:
-        if asyncio.iscoroutinefunction(handler):
-            # If it's an async function, await it
-            await handler(event_data)
-        else:
-            # If it's a sync function, run it in a thread
-            await asyncio.to_thread(cast(Callable[[Any], Any], handler), event_data)
+    def _executor_for(self, execution: Execution) -> Executor | None:
+        if execution is not Execution.PROCESS:
+            return self._sync_executor
+        if self._process_executor is None:
+            self._process_executor = ProcessPoolExecutor(max_workers=self._process_workers)
+        return self._process_executor
+
+    async def _dispatch(self, envelope: Envelope) -> None:
+        runners = self._subscriptions.runners(envelope.name)
+        dispatching.set(envelope.name)
+        if envelope.reply is not None:
+            results = await collect_results(
+                runners, envelope.data, self._fan_out, self._semaphore
+            )
+            self._reply_when_settled(envelope.reply, results)
+        elif runners:
+            await run_handlers(runners, envelope.data, self._fan_out, self._semaphore)
+
+    def _reply_when_settled(self, reply: Reply, results: List[Any]) -> None:
+        """
+        Resolve the reply with the final outcomes once every failed delivery settled,
+        without holding up the consumer while retries back off.
+        """
+        if pending := [
+            asyncio.wrap_future(r.settled)
+            for r in results
+            if isinstance(r, FailedDelivery) and not r.settled.done()
+        ]:
+            asyncio.gather(*pending).add_done_callback(
+                lambda _: self._reply_when_settled(reply, results)
+            )
+        # The caller may have timed out meanwhile.
+        elif not reply.done():
+            reply.set_result(
+                [r.settled.result() if isinstance(r, FailedDelivery) else r for r in results]
+            )
 
     async def _process_events(self) -> None:
         while hasattr(self, "_event_queue"):
-            event_type, event_data = await self._event_queue.get()
-            if event_type in self._subscriptions:
-                for handler in self._subscriptions[event_type]:
-                    await self._run_handler(handler, event_data)
+            envelope = await self._event_queue.get()
+            if self._metrics is not None:
+                self._metrics.record_dispatched(
+                    envelope.name, time.perf_counter() - envelope.posted_at
+                )
+            if self._preserve_topic_order and self._consumers > 1:
+                await self._dispatch_in_topic_order(envelope)
+            else:
+                await self._dispatch(envelope)
+                self._event_queue.task_done()
+
+    async def _dispatch_in_topic_order(self, envelope: Envelope) -> None:
+        """
+        Dispatch the event and its topic's backlog, unless another consumer is busy
+        with the topic, which then dispatches the event after the ones before it.
+        """
+        if (backlog := self._topic_backlogs.get(envelope.name)) is not None:
+            backlog.append(envelope)
+            return
+        backlog = self._topic_backlogs[envelope.name] = deque([envelope])
+        while backlog:
+            await self._dispatch(backlog[0])
+            backlog.popleft()
             self._event_queue.task_done()
+        del self._topic_backlogs[envelope.name]
 
     async def _run_event_loop(self) -> None:
         while self._is_running:
-            await self._process_events()
+            await asyncio.gather(
+                *(self._process_events() for _ in range(self._consumers))
+            )
             await asyncio.sleep(0.1)  # Prevent busy waiting
@@ -0,0 +1,487 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from collections import Counter
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue as ProcessQueue
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Set,
+    Tuple,
+)
+
+from event_systems.base.envelope import event_topic
+from event_systems.base.handler import Execution, Handler
+from event_systems.base.retry import DeadLetterQueue, RetryPolicy
+from event_systems.base.subscription import Subscription
+from event_systems.base.topic_trie import TopicTrie, is_pattern
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+from event_systems.common_expressions import (
+    NO_SUBSCRIPTION_FOUND,
+    PROCESSES_OUT_OF_RANGE,
+    WORKER_EXITED,
+    WORKER_SETUP_FAILED,
+)
+
+# An event on its way between processes: name, data and partition key.
+Transfer = Tuple[str, Any, Hashable | None]
+
+# Messages between the parent and the worker processes.
+EVENTS = "events"  # A batch of transfers, in either direction.
+READY = "ready"  # A worker has run its setup, with the topics it subscribed to.
+FLUSH = "flush"  # Asks a worker to handle everything it has received, then to ACK.
+ACK = "ack"  # A worker has handled everything before the FLUSH, and sent its posts.
+STOP = "stop"  # Asks a worker, or the parent's receiver, to exit.
+
+# How often the parent checks whether workers it waits for are still alive.
+LIVENESS_INTERVAL = 0.1
+# How long stopping waits for workers after a failure, before terminating them.
+STOP_TIMEOUT = 5.0
+
+
+class BatchSender:
+    """
+    Sends transfers to a multiprocessing queue from a thread of its own.
+
+    Posting only appends to a buffer. The sender thread takes over whatever has piled
+    up while it was busy, up to `batch_size` transfers, and puts it on the queue as
+    one message, so the cost of pickling and of the pipe is shared by the batch.
+    """
+
+    def __init__(self, queue: "ProcessQueue[Any]", batch_size: int) -> None:
+        self._queue = queue
+        self._batch_size = batch_size
+        self._buffer: List[Transfer] = []
+        self._in_flight = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, transfer: Transfer) -> None:
+        with self._condition:
+            self._buffer.append(transfer)
+            if len(self._buffer) == 1:
+                self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Wait until everything sent so far has been put on the queue."""
+        with self._condition:
+            while self._buffer or self._in_flight:
+                self._condition.wait()
+
+    def close(self) -> None:
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._buffer and not self._closed:
+                    self._condition.wait()
+                if not self._buffer:
+                    return
+                batch = self._buffer[: self._batch_size]
+                del self._buffer[: self._batch_size]
+                self._in_flight = True
+            self._queue.put((EVENTS, batch))
+            with self._condition:
+                self._in_flight = False
+                self._condition.notify_all()
+
+
+class WorkerEventSystem:
+    """
+    The event system a worker process hands to the `setup` function.
+
+    Handlers subscribed here run in the worker, on a `ThreadedEventSystem` of its own.
+    Events posted here go to the parent, which routes them like its own posts.
+
+    A `retry` policy applies within the worker which ran the failed handler, see
+    `MultiprocessEventSystem`.
+    """
+
+    def __init__(self, worker: int, outbox: "ProcessQueue[Any]", batch_size: int) -> None:
+        self.worker = worker
+        self._local = ThreadedEventSystem(name=f"worker_{worker}")
+        self._sender = BatchSender(outbox, batch_size)
+        self._topics: Set[str] = set()
+
+    def subscribe(
+        self,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription:
+        if isinstance(event_name, type):
+            event_name = event_topic(event_name)
+        subscription = self._local.subscribe(event_name, fn, execution, retry)
+        if subscription["success"]:
+            self._topics.add(event_name)
+        return subscription
+
+    def post(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        partition_key: Hashable | None = None,
+    ) -> None:
+        self._sender.send((event_name, event_data, partition_key))
+
+    def post_event(self, event: object, partition_key: Hashable | None = None) -> None:
+        self._sender.send((event_topic(type(event)), event, partition_key))
+
+
+def _run_worker(
+    worker: int,
+    setup: Callable[[WorkerEventSystem], None],
+    inbox: "ProcessQueue[Any]",
+    outbox: "ProcessQueue[Any]",
+    batch_size: int,
+) -> None:
+    es = WorkerEventSystem(worker, outbox, batch_size)
+    try:
+        setup(es)
+    except Exception as e:
+        outbox.put((READY, worker, set(), repr(e)))
+        return
+    es._local.start()
+    # Events posted by the setup go out first, so the parent routes them in order.
+    es._sender.flush()
+    outbox.put((READY, worker, es._topics, None))
+
+    while True:
+        message = inbox.get()
+        if message[0] == EVENTS:
+            for event_name, event_data, partition_key in message[1]:
+                es._local.post(event_name, event_data, partition_key=partition_key)
+            continue
+
+        error = None
+        try:
+            es._local.process_all_events()
+        except Exception as e:
+            error = repr(e)
+        # Posts made by the handlers go out before the ACK, on the same queue.
+        es._sender.flush()
+        if message[0] == STOP:
+            es._local.stop()
+            es._sender.close()
+            return
+        outbox.put((ACK, worker, message[1], error))
+
+
+class MultiprocessEventSystem:
+    """
+    An event system spanning a parent and `processes` worker processes.
+
+    Every worker runs `setup`, a picklable function which subscribes handlers on the
+    `WorkerEventSystem` it is given, so all workers subscribe to the same topics. An
+    event posted to such a topic goes to one of the workers, the one its
+    `partition_key` maps to, or the next one in turn, which spreads CPU-bound handlers
+    across cores. Handlers subscribed on the parent itself run on a
+    `ThreadedEventSystem` in the parent and receive every event of their topics, also
+    those posted by workers.
+
+    Events cross process boundaries in batches over multiprocessing queues, see
+    `BatchSender`, so event data must be picklable. `process_all_events()` waits until
+    no process has anything left to handle, including events handlers post meanwhile.
+
+    Retry policies and dead letters are per process: handlers subscribed on the parent
+    use the parent's `dead_letters`, while failures in a worker are retried and
+    dead-lettered within that worker, out of the parent's reach.
+    """
+
+    def __init__(
+        self,
+        setup: Callable[[WorkerEventSystem], None],
+        processes: int | None = None,
+        name: str | None = None,
+        batch_size: int = 1024,
+        mp_context: BaseContext | None = None,
+    ) -> None:
+        processes = processes if processes is not None else os.cpu_count() or 1
+        if processes < 1:
+            raise ValueError(PROCESSES_OUT_OF_RANGE)
+
+        self._setup = setup
+        self._processes = processes
+        self._name = name
+        self._batch_size = batch_size
+        self._context: Any = mp_context or multiprocessing.get_context()
+        # Kept across restarts, as every ThreadedEventSystem registers its name.
+        self._local = ThreadedEventSystem(name=name)
+        self._setup_initial_state()
+
+    def _setup_initial_state(self) -> None:
+        self._is_running = False
+        self._workers: List[BaseProcess] = []
+        self._inboxes: List["ProcessQueue[Any]"] = []
+        self._senders: List[BatchSender] = []
+        self._outbox: "ProcessQueue[Any]" = self._context.Queue()
+
+        # Topics and patterns the workers subscribed to, and the resolved topics.
+        self._worker_topics: Set[str] = set()
+        self._worker_patterns = TopicTrie()
+        self._routes: Dict[str, bool] = {}
+        self._next_worker = itertools.count()
+
+        # Events routed so far, which tells `process_all_events()` when all is quiet.
+        self._routed = 0
+        self._routed_lock = threading.Lock()
+        self._unrouted: Counter[str] = Counter()
+
+        self._acks: Counter[int] = Counter()
+        self._errors: List[str] = []
+        self._ack_condition = threading.Condition()
+        self._tokens = itertools.count()
+
+    def name(self) -> str | None:
+        return self._name
+
+    def start(self) -> None:
+        assert not self._is_running, "Event system is already running."
+
+        # Workers are started before any thread of this system, in case they fork.
+        for worker in range(self._processes):
+            inbox: "ProcessQueue[Any]" = self._context.Queue()
+            process = self._context.Process(
+                target=_run_worker,
+                args=(worker, self._setup, inbox, self._outbox, self._batch_size),
+                daemon=True,
+            )
+            process.start()
+            self._workers.append(process)
+            self._inboxes.append(inbox)
+
+        errors = []
+        # Events which workers post from their setup may arrive before all are ready.
+        early: List[Any] = []
+        # Workers which are ready, or failed to get there.
+        settled: Set[int] = set()
+        # Workers found dead once, whose READY may still be in the pipe.
+        exited: Set[int] = set()
+        while len(settled) < len(self._workers):
+            try:
+                message = self._outbox.get(timeout=LIVENESS_INTERVAL)
+            except queue.Empty:
+                for worker, process in enumerate(self._workers):
+                    if worker in settled or process.is_alive():
+                        continue
+                    if worker in exited:
+                        errors.append(
+                            WORKER_EXITED.format(worker=worker, code=process.exitcode)
+                        )
+                        settled.add(worker)
+                    exited.add(worker)
+                continue
+            if message[0] != READY:
+                early.append(message)
+                continue
+            _, worker, topics, error = message
+            settled.add(worker)
+            if error is not None:
+                errors.append(WORKER_SETUP_FAILED.format(worker=worker, error=error))
+            for topic in topics:
+                if is_pattern(topic):
+                    self._worker_patterns.add(topic)
+                else:
+                    self._worker_topics.add(topic)
+        if errors:
+            for process in self._workers:
+                process.kill()
+                process.join()
+            self._setup_initial_state()
+            raise RuntimeError("\n".join(errors))
+
+        self._senders = [BatchSender(inbox, self._batch_size) for inbox in self._inboxes]
+        self._local.start()
+        # Routed before any later event, which may already wait on the outbox.
+        for message in early:
+            self._route_transfers(message[1])
+        self._is_running = True
+        self._receiver = threading.Thread(target=self._receive, daemon=True)
+        self._receiver.start()
+
+    def stop(self) -> None:
+        if not self._is_running:
+            return
+        drained = False
+        try:
+            self.process_all_events()
+            drained = True
+        finally:
+            self._shut_down(drained)
+
+    def _shut_down(self, drained: bool) -> None:
+        self._is_running = False
+        for sender, inbox in zip(self._senders, self._inboxes):
+            sender.close()
+            inbox.put((STOP, None))
+        for process in self._workers:
+            # Workers which didn't drain may be dead, or stuck in a handler.
+            process.join(None if drained else STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._outbox.put((STOP,))
+        self._receiver.join()
+
+        self._local.stop()
+        self._setup_initial_state()
+
+    @property
+    def dead_letters(self) -> DeadLetterQueue:
+        """The dead letters of handlers subscribed in the parent process."""
+        return self._local.dead_letters
+
+    def subscribe(
+        self,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription:
+        """Subscribe a handler in the parent process."""
+        return self._local.subscribe(event_name, fn, execution, retry)
+
+    def post(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        partition_key: Hashable | None = None,
+    ) -> None:
+        assert self._is_running, "Event system is not running."
+        if not self._route(event_name, event_data, partition_key):
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+
+    def post_event(self, event: object, partition_key: Hashable | None = None) -> None:
+        """Post a typed event object to the handlers subscribed to its class."""
+        assert self._is_running, "Event system is not running."
+        event_name = event_topic(type(event))
+        if not self._route(event_name, event, partition_key):
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+
+    def post_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        batch = list(events)
+        for event_name in {event_name for event_name, _ in batch}:
+            if not self._is_routable(event_name):
+                raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+        for event_name, event_data in batch:
+            self.post(event_name, event_data)
+
+    def get_subscriptions(self) -> Dict[str, List[Handler]]:
+        """The handlers subscribed in the parent process."""
+        return self._local.get_subscriptions()
+
+    def get_dropped_events(self) -> Dict[str, int]:
+        """Dropped events, including those workers posted to topics nobody subscribes to."""
+        return dict(Counter(self._local.get_dropped_events()) + self._unrouted)
+
+    def is_running(self) -> bool:
+        return self._is_running
+
+    def process_all_events(self) -> None:
+        """
+        Wait until all processes have handled every event, including the events their
+        handlers post meanwhile.
+
+        Every round waits for the parent's handlers, then for every worker to handle
+        what it has received and to send back its posts. Once a round routes no new
+        event, nothing is in flight anywhere.
+        """
+        while True:
+            routed = self._routed
+            self._local.process_all_events()
+            self._flush_workers()
+            self._local.process_all_events()
+            if self._routed == routed:
+                return
+
+    def _is_routable(self, event_name: str) -> bool:
+        return self._local.has_subscriptions(event_name) or self._to_workers(event_name)
+
+    def _to_workers(self, event_name: str) -> bool:
+        if (route := self._routes.get(event_name)) is None:
+            route = self._routes[event_name] = event_name in self._worker_topics or bool(
+                self._worker_patterns.match(event_name)
+            )
+        return route
+
+    def _route(
+        self, event_name: str, event_data: Any, partition_key: Hashable | None
+    ) -> bool:
+        to_local = self._local.has_subscriptions(event_name)
+        to_workers = self._to_workers(event_name)
+        if not (to_local or to_workers):
+            return False
+
+        with self._routed_lock:
+            self._routed += 1
+        if to_local:
+            self._local.post(event_name, event_data, partition_key=partition_key)
+        if to_workers:
+            worker = (
+                next(self._next_worker)
+                if partition_key is None
+                else hash(partition_key)
+            ) % len(self._senders)
+            self._senders[worker].send((event_name, event_data, partition_key))
+        return True
+
+    def _flush_workers(self) -> None:
+        token = next(self._tokens)
+        for sender in self._senders:
+            sender.flush()
+        for inbox in self._inboxes:
+            inbox.put((FLUSH, token))
+        with self._ack_condition:
+            while self._acks[token] < len(self._workers):
+                # A worker which died won't acknowledge, so don't wait for it forever.
+                if not self._ack_condition.wait(LIVENESS_INTERVAL):
+                    self._raise_if_a_worker_exited(token)
+            del self._acks[token]
+            errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError("\n".join(errors))
+
+    def _raise_if_a_worker_exited(self, token: int) -> None:
+        for worker, process in enumerate(self._workers):
+            if not process.is_alive():
+                del self._acks[token]
+                raise RuntimeError(
+                    WORKER_EXITED.format(worker=worker, code=process.exitcode)
+                )
+
+    def _receive(self) -> None:
+        while True:
+            message = self._outbox.get()
+            if message[0] == STOP:
+                return
+            if message[0] == ACK:
+                _, worker, token, error = message
+                with self._ack_condition:
+                    self._acks[token] += 1
+                    if error is not None:
+                        self._errors.append(f"Worker {worker}: {error}")
+                    self._ack_condition.notify_all()
+                continue
+            self._route_transfers(message[1])
+
+    def _route_transfers(self, transfers: List[Transfer]) -> None:
+        for event_name, event_data, partition_key in transfers:
+            if not self._route(event_name, event_data, partition_key):
+                self._unrouted[event_name] += 1
@@ -1,24 +1,143 @@
 import asyncio
+import queue
 import threading
-from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
-from typing import Dict, List, Any, Set, Tuple
-from queue import Queue
+import time
+from collections import deque
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    Future,
+    wait,
+    FIRST_COMPLETED,
+)
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Set,
+    Tuple,
+)
 
+from event_systems.base.envelope import Envelope, Reply, event_topic
+from event_systems.base.event_queue import EventQueue, Overflow
 from event_systems.base.threaded_protocols import Threaded
-from event_systems.base.handler import Handler
+from event_systems.base.handler import (
+    Execution,
+    Handler,
+    SyncRunner,
+    compile_process_runner,
+    compile_sync_runner,
+)
+from event_systems.base.journal import Journal
+from event_systems.base.metrics import Metrics, build_stats, to_prometheus
+from event_systems.base.retry import DeadLetterQueue, FailedDelivery, RetryPolicy
+from event_systems.base.subscription import (
+    Subscription,
+    SubscriptionRegistry,
+    guard_sync_runner,
+)
+from event_systems.base.timers import Timer, TimerHeap
 
 from event_systems.common_expressions import (
     NO_SUBSCRIPTION_FOUND,
+    PRIORITY_NEEDS_PRIORITY_QUEUE,
     subscription_failure,
     subscription_success,
 )
 
 
 class ThreadedEventSystem(Threaded):
+    """
+    A thread based, instanced event system.
+
+    A dispatcher thread takes posted events off the queue and runs their handlers in a
+    thread pool. Every worker thread keeps one event loop for coroutine handlers, which
+    lives until `stop()`, so handlers can reuse loop-bound resources across events.
+
+    Handlers subscribed with `Execution.PROCESS` run in a process pool of
+    `process_workers` processes instead, which sidesteps the GIL for CPU-bound work.
+    Handlers subscribed with `Execution.INLINE` run on the dispatcher thread itself.
+
+    With a `max_queue_size` the queue is bounded and `overflow` decides whether posting
+    to a full queue blocks, drops the new or the oldest event, or raises `queue.Full`.
+
+    With `priorities`, events are dispatched by the priority they were posted with,
+    lower values first and in posting order within a priority. `priority_aging`
+    raises the priority of waiting events by one level per that many seconds, so
+    low priority events can't starve.
+
+    Events posted with a `coalesce_key` replace the data of a still pending event with
+    the same name and key, which keeps its queue position. For state updates where
+    only the latest value counts, handlers then skip the stale ones.
+
+    Events posted with a `partition_key` are handled in posting order per key, with
+    the handlers of one event running one after another, while different keys are
+    handled in parallel, like partitions of a log. `workers` overrides the size of
+    the thread pool, which is otherwise derived from the subscriptions on `start()`.
+
+    Besides dicts posted under an event name, typed event objects, ideally with
+    `__slots__` such as `dataclass(slots=True)` instances, can be posted with
+    `post_event()` and reach the handlers subscribed to their class.
+
+    `post_and_collect()` posts an event and returns a future of what its handlers
+    returned, or the exceptions they raised, in subscription order.
+
+    `post_after()` and `post_at()` schedule events on a timer heap, which a single
+    timer thread, started on first use, posts when they are due. On `stop()` pending
+    timers are posted right away if `flush_timers` is set, and discarded otherwise.
+
+    Handlers which raise are run again according to the `RetryPolicy` of their
+    subscription. Retries wait on the timer heap and run in the thread pool, so they
+    never hold up the dispatcher, but those of partitioned events leave the
+    partition's order. Once out of attempts, or right away without a policy, failed
+    events go to `dead_letters`, which keeps the latest `max_dead_letters`, and
+    `replay_dead_letters()` runs their handlers again.
+
+    With a `journal`, posted events are written ahead to disk and acknowledged once
+    their handlers have run, and `start()` posts the events a previous run left
+    unacknowledged again, see `Journal`. Subscribe before starting, events without
+    subscriptions are acknowledged and counted as dropped. Only this system takes a
+    journal, since its posts may block on file I/O, where the async systems' posts
+    would stall their event loop.
+
+    With `metrics` enabled, the system counts posted, dispatched and failed events per
+    event name and records queue wait and handler runtime histograms, see `stats()` and
+    `prometheus_text()`.
+    """
+
     instances: List[str] = []
 
-    def __init__(self, name: str | None = None) -> None:
+    def __init__(
+        self,
+        name: str | None = None,
+        max_queue_size: int = 0,
+        overflow: Overflow = Overflow.BLOCK,
+        process_workers: int | None = None,
+        metrics: bool = False,
+        priorities: bool = False,
+        priority_aging: float | None = None,
+        workers: int | None = None,
+        flush_timers: bool = False,
+        journal: Journal | None = None,
+        max_dead_letters: int = 10_000,
+    ) -> None:
         self._name = name
+        self._max_queue_size = max_queue_size
+        self._overflow = overflow
+        self._process_workers = process_workers
+        self._metrics_enabled = metrics
+        self._priorities = priorities
+        self._priority_aging = priority_aging
+        self._workers = workers
+        self._flush_timers = flush_timers
+        self._journal = journal
+        self.dead_letters = DeadLetterQueue(max_dead_letters)
         self._id = self._auto_name()
         ThreadedEventSystem.instances.append(self._id)
 
@@ -30,84 +149,482 @@ class ThreadedEventSystem(Threaded):
     def _setup_initial_state(self) -> None:
         self._is_running = False
         self._lock = threading.Lock()
-        self._subscriptions: Dict[str, List[Handler]] = {}
-        self._event_queue: Queue[Tuple[str, Dict[str, Any]]] = Queue()
+        # Handlers classified into runners at subscription time, per event name.
+        self._subscriptions: SubscriptionRegistry[
+            Tuple[Subscription, Execution, SyncRunner]
+        ] = SubscriptionRegistry()
+        # Created on the first subscription with Execution.PROCESS.
+        self._process_executor: ProcessPoolExecutor | None = None
+        self._metrics = Metrics() if self._metrics_enabled else None
+        # A None entry is the shutdown sentinel which wakes up the blocked dispatcher.
+        self._event_queue = EventQueue(
+            self._max_queue_size, self._overflow, self._priorities, self._priority_aging
+        )
+        if self._journal is not None:
+            self._event_queue.on_discard = self._acknowledge
+        # Journaled events which are being handled or retried, with the number of
+        # releases each one is waiting for before it is acknowledged.
+        self._held_lock = threading.Lock()
+        self._held: Dict[int, int] = {}
+
+        # Long-lived event loops of the worker threads, created on first use.
+        self._worker_state = threading.local()
+        self._worker_loops: List[asyncio.AbstractEventLoop] = []
 
         self._futures_not_done: Set[Future[Any]] = set()
         self._futures_done: Set[Future[Any]] = set()
 
+        # Backlogs of the partition keys which are being drained by a worker.
+        self._partition_lock = threading.Lock()
+        self._partitions: Dict[Hashable, Deque[Envelope]] = {}
+
+        self._timers = TimerHeap()
+        # Guards scheduling, so the timer thread never misses an earlier deadline.
+        self._timer_condition = threading.Condition()
+        self._timer_thread: threading.Thread | None = None
+
+        # Failed handlers waiting for, or running, their next attempt.
+        self._retry_condition = threading.Condition()
+        self._retries_pending = 0
+        # Set on stop(), from when on failures are dead-lettered without retrying.
+        self._stopping = False
+
     def name(self) -> str | None:
         return self._name
 
     # NOTE: The way we calculate worker count suggests, that starting the event system should be done after subscriptions have beend registered.
     def start(self) -> None:
         assert not self._is_running, "Event system is already running."
-        self._is_running = True
+        # Read back before accepting posts, which would append to the journal.
+        pending = self._journal.open() if self._journal is not None else []
 
-        worker_count = self._calculate_worker_count()
+        worker_count = self._workers or self._calculate_worker_count()
         self._executor = ThreadPoolExecutor(
             max_workers=worker_count,
             thread_name_prefix=f"{self._id}_execution",
         )
 
         n = f"{self._id}"
-        t = threading.Thread(
+        self._dispatcher = threading.Thread(
             name=n,
             target=self._execution_loop,
             args=[worker_count],
         )
-        t.start()
+        self._dispatcher.start()
+
+        if self._journal is not None:
+            self._replay(self._journal, pending)
+        self._is_running = True
+
+    def _replay(self, journal: Journal, pending: List[Envelope]) -> None:
+        batch = []
+        posted_at = time.perf_counter()
+        for envelope in pending:
+            if envelope.name in self._subscriptions:
+                envelope.posted_at = posted_at
+                batch.append(envelope)
+            else:
+                self._event_queue.count_dropped(envelope.name)
+                journal.ack(envelope.sequence)
+        self._event_queue.put_many(batch)
 
     def stop(self) -> None:
+        self._stopping = True
+        self._stop_timer_thread()
+        for timer in self._timers.pop_all():
+            if self._flush_timers:
+                self._fire(timer)
+            elif (delivery := timer.envelope.retry) is not None:
+                self.dead_letters.append(delivery)
+                delivery.settle(delivery.exception)
+                self._retry_finished(delivery)
+
         self._is_running = False
         self._event_queue.join()
+
+        # Wake up the dispatcher, which blocks on the queue, and let it exit.
+        if hasattr(self, "_dispatcher"):
+            self._event_queue.put(None)
+            self._dispatcher.join()
+            del self._dispatcher
+
         self._executor.shutdown(wait=True)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=True)
+        if self._journal is not None:
+            self._journal.close()
+        self._close_worker_loops()
+        self._subscriptions.clear()
         self._setup_initial_state()
 
-    def subscribe(self, event_name: str, fn: Handler) -> Dict[str, Any]:
+    def subscribe(
+        self,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription:
+        if isinstance(event_name, type):
+            event_name = event_topic(event_name)
+        subscription = Subscription(event_name, fn, retry)
         with self._lock:
             try:
-                if event_name not in self._subscriptions:
-                    self._subscriptions[event_name] = []
-                self._subscriptions[event_name].append(fn)
-
-                return subscription_success(event_name)
+                if execution is Execution.PROCESS:
+                    # Process runners must stay picklable, so the dispatcher checks
+                    # whether the subscription is still active before submitting.
+                    runner = compile_process_runner(fn)
+                    if self._process_executor is None:
+                        self._process_executor = ProcessPoolExecutor(
+                            max_workers=self._process_workers
+                        )
+                else:
+                    runner = compile_sync_runner(fn, self._run_coroutine)
+                    if self._metrics is not None:
+                        runner = self._metrics.instrument(event_name, runner)
+                    runner = guard_sync_runner(subscription, runner)
+                self._subscriptions.add(subscription, (subscription, execution, runner))
+
+                subscription.update(subscription_success(event_name))
             except Exception as e:
-                return subscription_failure(event_name, e)
+                subscription.update(subscription_failure(event_name, e))
+        return subscription
+
+    def post(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> None:
+        self._post(
+            Envelope(
+                event_name,
+                event_data,
+                priority=priority,
+                coalesce_key=coalesce_key,
+                partition_key=partition_key,
+            )
+        )
+
+    def post_event(
+        self,
+        event: object,
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> None:
+        """Post a typed event object to the handlers subscribed to its class."""
+        self._post(
+            Envelope(
+                event_topic(type(event)),
+                event,
+                priority=priority,
+                coalesce_key=coalesce_key,
+                partition_key=partition_key,
+            )
+        )
 
-    def post(self, event_name: str, event_data: Dict[str, Any]) -> None:
+    def post_and_collect(
+        self,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        partition_key: Hashable | None = None,
+    ) -> Future[List[Any]]:
+        """
+        Post the event and return a future of its handlers' return values, or the
+        exceptions they raised, in subscription order, once their retries are over.
+        Wait for it with
+        `future.result(timeout)`. The future fails with `queue.Full` if a bounded queue
+        drops the event.
+        """
+        reply: Future[List[Any]] = Future()
+        # A running future can't be cancelled, so the dispatcher can always resolve it.
+        reply.set_running_or_notify_cancel()
+        self._post(
+            Envelope(
+                event_name,
+                event_data,
+                priority=priority,
+                partition_key=partition_key,
+                reply=reply,
+            )
+        )
+        return reply
+
+    def post_after(
+        self,
+        delay: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> Timer:
+        """Post the event once `delay` seconds have passed."""
+        return self._schedule(
+            time.monotonic() + delay,
+            Envelope(
+                event_name,
+                event_data,
+                priority=priority,
+                coalesce_key=coalesce_key,
+                partition_key=partition_key,
+            ),
+        )
+
+    def post_at(
+        self,
+        timestamp: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+        partition_key: Hashable | None = None,
+    ) -> Timer:
+        """Post the event at a `time.time()` timestamp."""
+        return self.post_after(
+            timestamp - time.time(),
+            event_name,
+            event_data,
+            priority=priority,
+            coalesce_key=coalesce_key,
+            partition_key=partition_key,
+        )
+
+    def _schedule(self, when: float, envelope: Envelope) -> Timer:
         assert self._is_running, "Event system is not running."
-        if event_name not in self._subscriptions:
-            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
-        self._event_queue.put((event_name, event_data))
+        if envelope.name not in self._subscriptions:
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=envelope.name))
+        if envelope.priority and not self._priorities:
+            raise ValueError(PRIORITY_NEEDS_PRIORITY_QUEUE)
+        return self._push_timer(when, envelope)
+
+    def _push_timer(self, when: float, envelope: Envelope) -> Timer:
+        with self._timer_condition:
+            timer, earliest = self._timers.push(when, envelope)
+            if self._timer_thread is None:
+                self._timer_thread = threading.Thread(
+                    name=f"{self._id}_timers", target=self._run_timers
+                )
+                self._timer_thread.start()
+            elif earliest:
+                self._timer_condition.notify()
+        return timer
+
+    def _run_timers(self) -> None:
+        while True:
+            with self._timer_condition:
+                while self._timer_thread is not None:
+                    deadline = self._timers.next_deadline()
+                    now = time.monotonic()
+                    if deadline is not None and deadline <= now:
+                        break
+                    self._timer_condition.wait(
+                        None if deadline is None else deadline - now
+                    )
+                else:
+                    return
+                due = self._timers.pop_due(now)
+            # Posting may block on a bounded queue, so it happens outside the lock.
+            for timer in due:
+                self._fire(timer)
+
+    def _fire(self, timer: Timer) -> None:
+        if (delivery := timer.envelope.retry) is not None:
+            self._executor.submit(self._retry, delivery)
+            return
+        # Subscriptions may have been cancelled, or the queue may be full, meanwhile.
+        try:
+            self._post(timer.envelope)
+        except (ValueError, queue.Full):
+            self._event_queue.count_dropped(timer.envelope.name)
+
+    def _deliver(
+        self,
+        subscription: Subscription,
+        execution: Execution,
+        runner: SyncRunner,
+        envelope: Envelope,
+    ) -> Any:
+        """
+        Run a handler, hand a failure over to retrying, and return the failed delivery
+        instead of raising.
+        """
+        try:
+            return runner(envelope.data)
+        except Exception as e:
+            delivery = FailedDelivery(
+                subscription,
+                execution,
+                runner,
+                envelope.name,
+                envelope.data,
+                envelope.sequence,
+            )
+            self._failed(delivery, e)
+            return delivery
+
+    def _failed(self, delivery: FailedDelivery, exception: Exception) -> None:
+        delay = delivery.fail(exception)
+        if delay is None or self._stopping:
+            self.dead_letters.append(delivery)
+            delivery.settle(exception)
+        else:
+            # The journal keeps the event until the retry settles.
+            self._hold(delivery.sequence)
+            self._schedule_retry(delivery, delay)
+
+    def _schedule_retry(self, delivery: FailedDelivery, delay: float) -> None:
+        envelope = Envelope(delivery.event_name, delivery.event_data)
+        envelope.retry = delivery
+        with self._retry_condition:
+            self._retries_pending += 1
+        self._push_timer(time.monotonic() + delay, envelope)
+
+    def _retry(self, delivery: FailedDelivery) -> None:
+        try:
+            if not delivery.subscription.active:
+                delivery.settle(delivery.exception)
+                return
+            if delivery.execution is Execution.PROCESS:
+                self._run_in_process(delivery).result()
+                return
+            try:
+                delivery.settle(delivery.runner(delivery.event_data))
+            except Exception as e:
+                self._failed(delivery, e)
+        finally:
+            self._retry_finished(delivery)
+
+    def _retry_finished(self, delivery: FailedDelivery) -> None:
+        self._release(delivery.sequence)
+        with self._retry_condition:
+            self._retries_pending -= 1
+            self._retry_condition.notify_all()
+
+    def replay_dead_letters(self, event_name: str | None = None) -> int:
+        """
+        Run the handlers of the dead letters again, with all their attempts, or only
+        those of events posted to `event_name`. Dead letters of cancelled
+        subscriptions stay. Returns how many were replayed.
+        """
+        assert self._is_running, "Event system is not running."
+        letters = self.dead_letters.take(
+            lambda delivery: delivery.subscription.active
+            and (event_name is None or delivery.event_name == event_name)
+        )
+        for delivery in letters:
+            delivery.attempts = 0
+            # Dead letters are acknowledged in the journal already.
+            delivery.sequence = 0
+            self._schedule_retry(delivery, 0.0)
+        return len(letters)
+
+    def _stop_timer_thread(self) -> None:
+        with self._timer_condition:
+            thread, self._timer_thread = self._timer_thread, None
+            self._timer_condition.notify()
+        if thread is not None:
+            thread.join()
+
+    def _post(self, envelope: Envelope) -> None:
+        assert self._is_running, "Event system is not running."
+        if envelope.name not in self._subscriptions:
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=envelope.name))
+        if envelope.priority and not self._priorities:
+            raise ValueError(PRIORITY_NEEDS_PRIORITY_QUEUE)
+        if self._metrics is not None:
+            envelope.posted_at = time.perf_counter()
+            self._metrics.record_posted(envelope.name)
+        if self._journal is None:
+            self._event_queue.put(envelope)
+            return
+        self._journal.append(envelope)
+        try:
+            self._event_queue.put(envelope)
+        except queue.Full:
+            self._acknowledge(envelope)
+            raise
+
+    def post_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        assert self._is_running, "Event system is not running."
+        batch = [Envelope(event_name, event_data) for event_name, event_data in events]
+        for event_name in {envelope.name for envelope in batch}:
+            if event_name not in self._subscriptions:
+                raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+        if self._metrics is not None:
+            posted_at = time.perf_counter()
+            for envelope in batch:
+                envelope.posted_at = posted_at
+                self._metrics.record_posted(envelope.name)
+        if self._journal is None:
+            self._event_queue.put_many(batch)
+            return
+        self._journal.append_many(batch)
+        try:
+            self._event_queue.put_many(batch)
+        except queue.Full:
+            for envelope in batch:
+                self._acknowledge(envelope)
+            raise
 
     def get_subscriptions(self) -> Dict[str, List[Handler]]:
-        return self._subscriptions
+        return self._subscriptions.handlers()
+
+    def get_dropped_events(self) -> Dict[str, int]:
+        return self._event_queue.dropped_snapshot()
+
+    def has_subscriptions(self, event_name: str) -> bool:
+        """Whether posting the event reaches any handler, through patterns as well."""
+        return event_name in self._subscriptions
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the system's metrics. Safe to call from any thread."""
+        return build_stats(
+            self._metrics, self._event_queue.qsize(), self._event_queue.dropped_snapshot()
+        )
+
+    def prometheus_text(self) -> str:
+        """The `stats()` snapshot in Prometheus text format. Safe to call from any thread."""
+        return to_prometheus(self.stats(), self._name or self._id)
 
     def is_running(self) -> bool:
         return self._is_running
 
     def _calculate_worker_count(self) -> int:
-        total_handlers = sum(len(handlers) for handlers in self._subscriptions.values())
+        subscriptions = self._subscriptions.handlers()
+        total_handlers = sum(len(handlers) for handlers in subscriptions.values())
         avg_handlers_per_event = max(
-            1, total_handlers // len(self._subscriptions) if self._subscriptions else 1
+            1, total_handlers // len(subscriptions) if subscriptions else 1
         )
 
-        return max(1, len(self._subscriptions) * avg_handlers_per_event)
+        return max(1, len(subscriptions) * avg_handlers_per_event)
 
-    def _run_handler(self, handler: Handler, event_data: Dict[str, Any]) -> None:
-        if not callable(handler):
-            raise TypeError("Handler is not callable.")
-        if asyncio.iscoroutinefunction(handler):
+    def _run_coroutine(self, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        loop: asyncio.AbstractEventLoop | None = getattr(self._worker_state, "loop", None)
+        if loop is None:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(handler(event_data))
-            finally:
-                loop.close()
-        else:
-            # For synchronous functions, call them directly in the worker thread
-            handler(event_data)
+            self._worker_state.loop = loop
+            with self._lock:
+                self._worker_loops.append(loop)
+        return loop.run_until_complete(coroutine)
+
+    def _close_worker_loops(self) -> None:
+        # Only called once the workers have exited, so none of the loops is running.
+        for loop in self._worker_loops:
+            if pending := asyncio.all_tasks(loop):
+                for task in pending:
+                    task.cancel()
+                loop.run_until_complete(
+                    asyncio.gather(*pending, return_exceptions=True)
+                )
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+        self._worker_loops.clear()
 
     def process_all_events(self) -> None:
         # Wait for all events in the queue to be processed
@@ -116,6 +633,10 @@ class ThreadedEventSystem(Threaded):
         # Wait for any currently running handlers to complete
         self._wait_for_all_futures_to_complete()
 
+        # Wait until failed handlers have succeeded or are dead-lettered
+        with self._retry_condition:
+            self._retry_condition.wait_for(lambda: not self._retries_pending)
+
     def _wait_for_all_futures_to_complete(self) -> None:
         while self._futures_not_done or self._futures_done:
             # Process futures that are not done
@@ -123,32 +644,49 @@ class ThreadedEventSystem(Threaded):
                 done, self._futures_not_done = wait(
                     self._futures_not_done, return_when=FIRST_COMPLETED
                 )
-                for future in done:
-                    try:
-                        future.result()
-                    except Exception as e:
-                        # Log the exception or handle it appropriately
-                        print(f"Exception in future: {e}")
-                    finally:
-                        self._futures_done.add(future)
+                self._futures_done.update(done)
 
             # Clean up done futures
             self._cleanup_completed_futures()
 
     def _execution_loop(self, max_concurrent: int) -> None:
         with self._executor as executor:
-            while self._is_running:
-                if self._event_queue.empty():
-                    continue
+            while True:
+                # Blocks until an event (or the shutdown sentinel) arrives, so idle systems don't spin.
                 event_publication = self._event_queue.get()
+                if event_publication is None:
+                    self._event_queue.task_done()
+                    break
 
                 # Not done futures grows with every submission
-                event_type, event_data = event_publication
-                if event_type in self._subscriptions:
-                    for handler in self._subscriptions[event_type]:
-                        self._futures_not_done.add(
-                            executor.submit(self._run_handler, handler, event_data)
-                        )
+                event_type = event_publication.name
+                if self._metrics is not None:
+                    self._metrics.record_dispatched(
+                        event_type, time.perf_counter() - event_publication.posted_at
+                    )
+                if event_publication.partition_key is not None:
+                    if drain := self._partition(event_publication):
+                        self._futures_not_done.add(executor.submit(drain))
+                    self._event_queue.task_done()
+                    continue
+                self._hold(event_publication.sequence)
+                futures = [
+                    self._submit(executor, subscription, execution, runner, event_publication)
+                    for subscription, execution, runner in self._subscriptions.runners(
+                        event_type
+                    )
+                    if subscription.active
+                ]
+                if event_publication.reply is None:
+                    self._futures_not_done.update(futures)
+                else:
+                    self._futures_not_done.add(
+                        self._collect(event_publication.reply, futures)
+                    )
+                if event_publication.sequence:
+                    self._when_all_done(
+                        futures, partial(self._release, event_publication.sequence)
+                    )
 
                 self._event_queue.task_done()
                 # Once it is bigger than max concurrent, separate all done futures out of it
@@ -161,16 +699,199 @@ class ThreadedEventSystem(Threaded):
                     self._futures_done.update(done)
                     self._cleanup_completed_futures()
 
-    def _cleanup_completed_futures(self) -> None:
-        completed_futures_to_remove: Set[Future[Any]] = set()
+    def _collect(self, reply: Reply, futures: List[Future[Any]]) -> Future[None]:
+        """
+        Resolve the reply once all handler futures are done and their retries are
+        over, and return a future which is tracked in their place, so failures go to
+        the reply instead of surfacing in `process_all_events()`. That future doesn't
+        wait for the retries, which `process_all_events()` waits for anyway.
+        """
+        collected: Future[None] = Future()
+        collected.set_running_or_notify_cancel()
+
+        def resolve() -> None:
+            results = [future.exception() or future.result() for future in futures]
+            collected.set_result(None)
+            self._reply_when_settled(reply, results)
+
+        self._when_all_done(futures, resolve)
+        return collected
+
+    def _reply_when_settled(self, reply: Reply, results: List[Any]) -> None:
+        """Resolve the reply with the final outcomes once every failed delivery settled."""
+        self._when_all_done(
+            [r.settled for r in results if isinstance(r, FailedDelivery)],
+            lambda: reply.set_result(
+                [r.settled.result() if isinstance(r, FailedDelivery) else r for r in results]
+            ),
+        )
 
-        for future in self._futures_done:
-            if future.done():
-                future.result()
-                completed_futures_to_remove.add(future)
+    def _when_all_done(self, futures: List[Future[Any]], callback: Callable[[], None]) -> None:
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def count_down(_: Future[Any] | None = None) -> None:
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+            callback()
+
+        if not futures:
+            count_down()
+        for future in futures:
+            future.add_done_callback(count_down)
+
+    def _acknowledge(self, envelope: Envelope) -> None:
+        if self._journal is not None and envelope.sequence:
+            self._journal.ack(envelope.sequence)
+
+    def _hold(self, sequence: int) -> None:
+        """Keep a journaled event from being acknowledged until it is released again."""
+        if self._journal is not None and sequence:
+            with self._held_lock:
+                self._held[sequence] = self._held.get(sequence, 0) + 1
+
+    def _release(self, sequence: int) -> None:
+        if self._journal is None or not sequence:
+            return
+        with self._held_lock:
+            if held := self._held[sequence] - 1:
+                self._held[sequence] = held
+                return
+            del self._held[sequence]
+        self._journal.ack(sequence)
+
+    def _partition(self, envelope: Envelope) -> Callable[[], None] | None:
+        """
+        Queue the event up behind its partition, and return a task which drains the
+        partition if none is running yet.
+        """
+        with self._partition_lock:
+            if (backlog := self._partitions.get(envelope.partition_key)) is not None:
+                backlog.append(envelope)
+                return None
+            self._partitions[envelope.partition_key] = deque([envelope])
+        return lambda: self._drain_partition(envelope.partition_key)
+
+    def _drain_partition(self, partition_key: Hashable) -> None:
+        while True:
+            with self._partition_lock:
+                backlog = self._partitions[partition_key]
+                if not backlog:
+                    del self._partitions[partition_key]
+                    break
+                envelope = backlog[0]
+
+            self._hold(envelope.sequence)
+            results: List[Any] = []
+            for subscription, execution, runner in self._subscriptions.runners(
+                envelope.name
+            ):
+                if subscription.active:
+                    results.append(
+                        self._run_in_partition(subscription, execution, runner, envelope)
+                    )
+            if envelope.reply is not None:
+                self._reply_when_settled(envelope.reply, results)
+            self._release(envelope.sequence)
+
+            with self._partition_lock:
+                backlog.popleft()
+
+    def _run_in_partition(
+        self,
+        subscription: Subscription,
+        execution: Execution,
+        runner: SyncRunner,
+        envelope: Envelope,
+    ) -> Any:
+        if execution is Execution.PROCESS:
+            return self._run_in_process(
+                FailedDelivery(
+                    subscription,
+                    execution,
+                    runner,
+                    envelope.name,
+                    envelope.data,
+                    envelope.sequence,
+                )
+            ).result()
+        return self._deliver(subscription, execution, runner, envelope)
+
+    def _run_in_process(self, delivery: FailedDelivery) -> Future[Any]:
+        """
+        Submit a process handler, and return a future of its return value, or of its
+        failed delivery once the exception is handed over to retrying.
+        """
+        assert self._process_executor is not None
+        future = self._process_executor.submit(delivery.runner, delivery.event_data)
+        if self._metrics is not None:
+            # Process runners must stay picklable, so they are measured from here.
+            self._measure_process_handler(self._metrics, delivery.event_name, future)
+        result: Future[Any] = Future()
+        result.set_running_or_notify_cancel()
+
+        def resolve(done: Future[Any]) -> None:
+            if done.cancelled():
+                delivery.settle(None)
+                result.set_result(None)
+            elif (exception := done.exception()) is not None:
+                assert isinstance(exception, Exception)
+                self._failed(delivery, exception)
+                result.set_result(delivery)
+            else:
+                delivery.settle(done.result())
+                result.set_result(done.result())
+
+        future.add_done_callback(resolve)
+        return result
+
+    def _submit(
+        self,
+        executor: ThreadPoolExecutor,
+        subscription: Subscription,
+        execution: Execution,
+        runner: SyncRunner,
+        envelope: Envelope,
+    ) -> Future[Any]:
+        if execution is Execution.PROCESS:
+            return self._run_in_process(
+                FailedDelivery(
+                    subscription,
+                    execution,
+                    runner,
+                    envelope.name,
+                    envelope.data,
+                    envelope.sequence,
+                )
+            )
+        if execution is Execution.INLINE:
+            # Wrapped in a future, so results are collected like those of pooled handlers.
+            future: Future[Any] = Future()
+            future.set_result(self._deliver(subscription, execution, runner, envelope))
+            return future
+        return executor.submit(self._deliver, subscription, execution, runner, envelope)
+
+    def _measure_process_handler(
+        self, metrics: Metrics, event_type: str, future: Future[Any]
+    ) -> None:
+        metrics.handler_started()
+        start = time.perf_counter()
+        future.add_done_callback(
+            lambda f: metrics.handler_finished(
+                event_type,
+                time.perf_counter() - start,
+                f.cancelled() or f.exception() is not None,
+            )
+        )
 
-        # Remove completed futures from self._futures_done
-        self._futures_done -= completed_futures_to_remove
+    def _cleanup_completed_futures(self) -> None:
+        completed_futures = {future for future in self._futures_done if future.done()}
+        self._futures_done -= completed_futures
+        for future in completed_futures:
+            # Handler failures are returned, so only a bug in dispatching raises here.
+            future.result()
 
     def _auto_name(self) -> str:
         if len(ThreadedEventSystem.instances) == 0:
@@ -1,13 +1,38 @@
 import asyncio
 import contextlib
-from typing import Callable, Optional, Dict, List, Any, Tuple, cast
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, Optional, Dict, List, Any, Set, Tuple, Hashable
 
 from event_systems.base.async_protocols import AsyncSingleton
-from event_systems.base.handler import Handler
+from event_systems.base.envelope import Envelope, Reply, event_topic
+from event_systems.base.event_queue import AsyncEventQueue, Overflow
+from event_systems.base.fan_out import FanOut, collect_results, run_handlers
+from event_systems.base.handler import (
+    AsyncRunner,
+    Execution,
+    Handler,
+    compile_async_runner,
+)
+from event_systems.base.metrics import Metrics, build_stats, to_prometheus
+from event_systems.base.retry import (
+    DeadLetterQueue,
+    FailedDelivery,
+    RetryPolicy,
+    dispatching,
+)
+from event_systems.base.subscription import (
+    Subscription,
+    SubscriptionRegistry,
+    guard_async_runner,
+)
+from event_systems.base.timers import Timer, TimerHeap
 
 from event_systems.common_expressions import (
+    BOUNDED_FAN_OUT_NEEDS_LIMIT,
     NEEDS_INITIALIZATION,
     NO_SUBSCRIPTION_FOUND,
+    PRIORITY_NEEDS_PRIORITY_QUEUE,
     subscription_success,
     subscription_failure,
 )
@@ -18,11 +43,36 @@ class AsyncSingletonEventSystem(AsyncSingleton):
     _lock = asyncio.Lock()
 
     _is_running: bool
-    _subscriptions: Dict[str, List[Handler]]
-    _event_queue: asyncio.Queue[Tuple[str, Dict[str, Any]]]
+    # Handlers classified into runners at subscription time, per event name.
+    _subscriptions: SubscriptionRegistry[AsyncRunner]
+    _event_queue: AsyncEventQueue
 
     _name: str | None = None
 
+    _fan_out: FanOut = FanOut.SEQUENTIAL
+    _semaphore: asyncio.Semaphore | None = None
+    _max_queue_size: int = 0
+    _overflow: Overflow = Overflow.BLOCK
+    _sync_workers: int | None = None
+    _sync_executor: ThreadPoolExecutor | None = None
+    _process_workers: int | None = None
+    _process_executor: ProcessPoolExecutor | None = None
+    _metrics_enabled: bool = False
+    _metrics: Metrics | None = None
+    _priorities: bool = False
+    _priority_aging: float | None = None
+    _flush_timers: bool = False
+    _timers: TimerHeap
+    _timer_handle: asyncio.TimerHandle | None = None
+    _timer_tasks: Set[asyncio.Task[None]] = set()
+    _max_dead_letters: int = 10_000
+    dead_letters: DeadLetterQueue = DeadLetterQueue()
+    # Failed handlers waiting for, or running, their next attempt.
+    _retries_pending: int = 0
+    _retries_idle: asyncio.Event
+    # Set on stop(), from when on failures are dead-lettered without retrying.
+    _stopping: bool = False
+
     @property
     def name(self) -> str | None:
         return self._name
@@ -31,6 +81,60 @@ class AsyncSingletonEventSystem(AsyncSingleton):
     def name(self, value: Optional[str]) -> str | None:
         self._name = value
 
+    @classmethod
+    async def configure(
+        cls,
+        fan_out: FanOut = FanOut.SEQUENTIAL,
+        max_concurrent_handlers: int | None = None,
+        max_queue_size: int = 0,
+        overflow: Overflow = Overflow.BLOCK,
+        sync_workers: int | None = None,
+        process_workers: int | None = None,
+        metrics: bool = False,
+        priorities: bool = False,
+        priority_aging: float | None = None,
+        flush_timers: bool = False,
+        max_dead_letters: int = 10_000,
+    ) -> None:
+        """
+        Configure the event system. The configuration survives `stop()`.
+
+        `fan_out` and `max_concurrent_handlers` set how the handlers of one event are
+        run. With a `max_queue_size` the queue is bounded and `overflow` decides what
+        posting to a full queue does. `sync_workers` sets the size of a dedicated
+        thread pool for sync handlers instead of the loop's default executor, and
+        `process_workers` the size of the process pool for handlers subscribed with
+        `Execution.PROCESS`. `metrics` enables the counters and histograms reported by
+        `stats()` and `prometheus_text()`. `priorities` dispatches events by the
+        priority they were posted with, and `priority_aging` raises the priority of
+        waiting events by one level per that many seconds. `flush_timers` posts events
+        scheduled with `post_after()` or `post_at()` on `stop()` instead of discarding
+        them. `max_dead_letters` bounds `dead_letters`, which holds the events whose
+        handlers failed on every attempt their subscription's `RetryPolicy` allows.
+        Queue, executor, metrics and dead letter settings take effect when the system
+        is initialized next, i.e. on the first `start()` or `subscribe()` after `stop()`.
+        """
+        if fan_out is FanOut.BOUNDED and (
+            max_concurrent_handlers is None or max_concurrent_handlers < 1
+        ):
+            raise ValueError(BOUNDED_FAN_OUT_NEEDS_LIMIT)
+
+        cls._fan_out = fan_out
+        cls._max_queue_size = max_queue_size
+        cls._overflow = overflow
+        cls._sync_workers = sync_workers
+        cls._process_workers = process_workers
+        cls._metrics_enabled = metrics
+        cls._priorities = priorities
+        cls._priority_aging = priority_aging
+        cls._flush_timers = flush_timers
+        cls._max_dead_letters = max_dead_letters
+        cls._semaphore = (
+            asyncio.Semaphore(max_concurrent_handlers)
+            if max_concurrent_handlers
+            else None
+        )
+
     @classmethod
     async def start(cls) -> None:
         cls._is_running = True
@@ -41,6 +145,21 @@ class AsyncSingletonEventSystem(AsyncSingleton):
 
     @classmethod
     async def stop(cls) -> None:
+        cls._stopping = True
+        if hasattr(cls, "_timers"):
+            cls._arm_timers(None)
+            timers = cls._timers.pop_all()
+            if cls._flush_timers and cls._instance is not None:
+                await cls._post_due(timers)
+            else:
+                for timer in timers:
+                    if (delivery := timer.envelope.retry) is not None:
+                        cls.dead_letters.append(delivery)
+                        delivery.settle(delivery.exception)
+                        cls._retry_finished()
+            if cls._timer_tasks:
+                await asyncio.gather(*cls._timer_tasks)
+
         # Wait for all items in the queue to be processed, then remove
         if hasattr(cls, "_event_queue"):
             await cls._event_queue.join()
@@ -53,37 +172,310 @@ class AsyncSingletonEventSystem(AsyncSingleton):
                 await cls._task
             del cls._task
 
+        if cls._sync_executor is not None:
+            cls._sync_executor.shutdown(wait=True)
+            cls._sync_executor = None
+        if cls._process_executor is not None:
+            cls._process_executor.shutdown(wait=True)
+            cls._process_executor = None
+
         # Reset state
         cls._instance = None
-        cls._subscriptions = {}
+        if hasattr(cls, "_subscriptions"):
+            cls._subscriptions.clear()
+        cls._subscriptions = SubscriptionRegistry()
         cls._is_running = False
 
     @classmethod
-    async def subscribe(cls, event_name: str, fn: Handler) -> Dict[str, Any]:
+    async def subscribe(
+        cls,
+        event_name: str | type,
+        fn: Handler,
+        execution: Execution = Execution.THREAD,
+        retry: RetryPolicy | None = None,
+    ) -> Subscription:
+        if isinstance(event_name, type):
+            event_name = event_topic(event_name)
         if not cls._instance:
             await cls._initialize()
 
+        subscription = Subscription(event_name, fn, retry)
         async with cls._lock:
             try:
-                if event_name not in cls._subscriptions:
-                    cls._subscriptions[event_name] = []
-                cls._subscriptions[event_name].append(fn)
-                return subscription_success(event_name)
+                runner = compile_async_runner(fn, execution, cls._executor_for(execution))
+                if cls._metrics is not None:
+                    runner = cls._metrics.instrument_async(event_name, runner)
+                runner = cls._catch_failures(subscription, execution, runner)
+                cls._subscriptions.add(
+                    subscription, guard_async_runner(subscription, runner)
+                )
+                subscription.update(subscription_success(event_name))
             except Exception as e:
-                return subscription_failure(event_name, e)
+                subscription.update(subscription_failure(event_name, e))
+        return subscription
+
+    @classmethod
+    async def post(
+        cls,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None:
+        await cls._post(
+            Envelope(event_name, event_data, priority=priority, coalesce_key=coalesce_key)
+        )
+
+    @classmethod
+    async def post_event(
+        cls,
+        event: object,
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> None:
+        """Post a typed event object to the handlers subscribed to its class."""
+        await cls._post(
+            Envelope(
+                event_topic(type(event)),
+                event,
+                priority=priority,
+                coalesce_key=coalesce_key,
+            )
+        )
+
+    @classmethod
+    async def post_and_collect(
+        cls,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        timeout: float | None = None,
+    ) -> List[Any]:
+        """
+        Post the event and wait until its handlers have run, with their retries. Returns
+        their return values, or the exceptions they ended with, in subscription order.
+        Raises `TimeoutError` after
+        `timeout` seconds, and `asyncio.QueueFull` if a bounded queue drops the event.
+        """
+        reply: asyncio.Future[List[Any]] = asyncio.get_running_loop().create_future()
+        await cls._post(Envelope(event_name, event_data, priority=priority, reply=reply))
+        try:
+            return await asyncio.wait_for(reply, timeout)
+        except asyncio.TimeoutError:
+            # Before Python 3.11 asyncio has a TimeoutError of its own.
+            raise TimeoutError from None
+
+    @classmethod
+    async def post_after(
+        cls,
+        delay: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer:
+        """Post the event once `delay` seconds have passed."""
+        return cls._schedule(
+            asyncio.get_running_loop().time() + delay,
+            Envelope(event_name, event_data, priority=priority, coalesce_key=coalesce_key),
+        )
+
+    @classmethod
+    async def post_at(
+        cls,
+        timestamp: float,
+        event_name: str,
+        event_data: Dict[str, Any],
+        priority: int = 0,
+        coalesce_key: Hashable | None = None,
+    ) -> Timer:
+        """Post the event at a `time.time()` timestamp."""
+        return await cls.post_after(
+            timestamp - time.time(),
+            event_name,
+            event_data,
+            priority=priority,
+            coalesce_key=coalesce_key,
+        )
 
     @classmethod
-    async def post(cls, event_name: str, event_data: Dict[str, Any]) -> None:
+    def _schedule(cls, when: float, envelope: Envelope) -> Timer:
         if cls._instance is None:
             raise RuntimeError(NEEDS_INITIALIZATION.format(class_name=cls.__name__))
-        if event_name not in cls._subscriptions:
-            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+        if envelope.name not in cls._subscriptions:
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=envelope.name))
+        if envelope.priority and not cls._priorities:
+            raise ValueError(PRIORITY_NEEDS_PRIORITY_QUEUE)
+        return cls._push_timer(when, envelope)
+
+    @classmethod
+    def _push_timer(cls, when: float, envelope: Envelope) -> Timer:
+        timer, earliest = cls._timers.push(when, envelope)
+        if earliest:
+            cls._arm_timers(when)
+        return timer
+
+    @classmethod
+    def _arm_timers(cls, when: float | None) -> None:
+        if cls._timer_handle is not None:
+            cls._timer_handle.cancel()
+        cls._timer_handle = (
+            None
+            if when is None
+            else asyncio.get_running_loop().call_at(when, cls._fire_timers)
+        )
+
+    @classmethod
+    def _fire_timers(cls) -> None:
+        cls._timer_handle = None
+        loop = asyncio.get_running_loop()
+        if due := cls._timers.pop_due(loop.time()):
+            task = loop.create_task(cls._post_due(due))
+            cls._timer_tasks.add(task)
+            task.add_done_callback(cls._timer_tasks.discard)
+        cls._arm_timers(cls._timers.next_deadline())
+
+    @classmethod
+    async def _post_due(cls, timers: List[Timer]) -> None:
+        for timer in timers:
+            if (delivery := timer.envelope.retry) is not None:
+                task = asyncio.get_running_loop().create_task(cls._retry(delivery))
+                cls._timer_tasks.add(task)
+                task.add_done_callback(cls._timer_tasks.discard)
+                continue
+            # Subscriptions may have been cancelled, or the queue may be full, meanwhile.
+            try:
+                await cls._post(timer.envelope)
+            except (ValueError, asyncio.QueueFull):
+                cls._event_queue.dropped[timer.envelope.name] += 1
+
+    @classmethod
+    def _catch_failures(
+        cls, subscription: Subscription, execution: Execution, runner: AsyncRunner
+    ) -> AsyncRunner:
+        """
+        Return a runner which hands failures over to retrying, and returns the failed
+        delivery instead of raising, so the exception never reaches the dispatch task.
+        """
+
+        async def run(event_data: Dict[str, Any]) -> Any:
+            try:
+                return await runner(event_data)
+            except Exception as e:
+                delivery = FailedDelivery(
+                    subscription, execution, runner, dispatching.get(), event_data
+                )
+                cls._failed(delivery, e)
+                return delivery
 
-        await cls._event_queue.put((event_name, event_data))
+        return run
+
+    @classmethod
+    def _failed(cls, delivery: FailedDelivery, exception: Exception) -> None:
+        delay = delivery.fail(exception)
+        if delay is None or cls._stopping:
+            cls.dead_letters.append(delivery)
+            delivery.settle(exception)
+        else:
+            cls._schedule_retry(delivery, delay)
+
+    @classmethod
+    def _schedule_retry(cls, delivery: FailedDelivery, delay: float) -> None:
+        envelope = Envelope(delivery.event_name, delivery.event_data)
+        envelope.retry = delivery
+        cls._retries_pending += 1
+        cls._retries_idle.clear()
+        cls._push_timer(asyncio.get_running_loop().time() + delay, envelope)
+
+    @classmethod
+    async def _retry(cls, delivery: FailedDelivery) -> None:
+        try:
+            if not delivery.subscription.active:
+                delivery.settle(delivery.exception)
+            else:
+                try:
+                    delivery.settle(await delivery.runner(delivery.event_data))
+                except Exception as e:
+                    cls._failed(delivery, e)
+        finally:
+            cls._retry_finished()
+
+    @classmethod
+    def _retry_finished(cls) -> None:
+        cls._retries_pending -= 1
+        if not cls._retries_pending:
+            cls._retries_idle.set()
+
+    @classmethod
+    async def replay_dead_letters(cls, event_name: str | None = None) -> int:
+        """
+        Run the handlers of the dead letters again, with all their attempts, or only
+        those of events posted to `event_name`. Dead letters of cancelled
+        subscriptions stay. Returns how many were replayed.
+        """
+        if cls._instance is None:
+            raise RuntimeError(NEEDS_INITIALIZATION.format(class_name=cls.__name__))
+        letters = cls.dead_letters.take(
+            lambda delivery: delivery.subscription.active
+            and (event_name is None or delivery.event_name == event_name)
+        )
+        for delivery in letters:
+            delivery.attempts = 0
+            cls._schedule_retry(delivery, 0.0)
+        return len(letters)
+
+    @classmethod
+    async def _post(cls, envelope: Envelope) -> None:
+        if cls._instance is None:
+            raise RuntimeError(NEEDS_INITIALIZATION.format(class_name=cls.__name__))
+        if envelope.name not in cls._subscriptions:
+            raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=envelope.name))
+        if envelope.priority and not cls._priorities:
+            raise ValueError(PRIORITY_NEEDS_PRIORITY_QUEUE)
+
+        if cls._metrics is not None:
+            envelope.posted_at = time.perf_counter()
+            cls._metrics.record_posted(envelope.name)
+        await cls._event_queue.put(envelope)
+
+    @classmethod
+    async def post_many(cls, events: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        if cls._instance is None:
+            raise RuntimeError(NEEDS_INITIALIZATION.format(class_name=cls.__name__))
+        batch = [Envelope(event_name, event_data) for event_name, event_data in events]
+        for event_name in {envelope.name for envelope in batch}:
+            if event_name not in cls._subscriptions:
+                raise ValueError(NO_SUBSCRIPTION_FOUND.format(event=event_name))
+        if cls._metrics is not None:
+            posted_at = time.perf_counter()
+            for envelope in batch:
+                envelope.posted_at = posted_at
+                cls._metrics.record_posted(envelope.name)
+        await cls._event_queue.put_many(batch)
 
     @classmethod
     async def get_subscriptions(cls) -> Dict[str, List[Handler]]:
-        return cls._subscriptions
+        return cls._subscriptions.handlers()
+
+    @classmethod
+    async def get_dropped_events(cls) -> Dict[str, int]:
+        if not hasattr(cls, "_event_queue"):
+            return {}
+        return dict(cls._event_queue.dropped)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Snapshot of the system's metrics. Safe to call from any thread."""
+        if not hasattr(cls, "_event_queue"):
+            return build_stats(cls._metrics, 0, {})
+        return build_stats(
+            cls._metrics, cls._event_queue.qsize(), cls._event_queue.dropped_snapshot()
+        )
+
+    @classmethod
+    def prometheus_text(cls) -> str:
+        """The `stats()` snapshot in Prometheus text format. Safe to call from any thread."""
+        return to_prometheus(cls.stats(), cls._name or cls.__name__)
 
     @classmethod
     async def is_running(cls) -> bool:
@@ -94,35 +486,79 @@ class AsyncSingletonEventSystem(AsyncSingleton):
         if not hasattr(cls, "_event_queue"):
             return
         await cls._event_queue.join()
+        # Failed handlers have succeeded or are dead-lettered once retrying is idle.
+        await cls._retries_idle.wait()
 
     @classmethod
     async def _initialize(cls) -> None:
         if not cls._instance:
             cls._instance = cls()
-            cls._subscriptions = {}
-            cls._event_queue = asyncio.Queue()
+            cls._subscriptions = SubscriptionRegistry()
+            cls._event_queue = AsyncEventQueue(
+                cls._max_queue_size, cls._overflow, cls._priorities, cls._priority_aging
+            )
+            cls._metrics = Metrics() if cls._metrics_enabled else None
+            cls._timers = TimerHeap()
+            cls.dead_letters = DeadLetterQueue(cls._max_dead_letters)
+            cls._retries_pending = 0
+            cls._retries_idle = asyncio.Event()
+            cls._retries_idle.set()
+            cls._stopping = False
+            if cls._sync_workers:
+                cls._sync_executor = ThreadPoolExecutor(
+                    max_workers=cls._sync_workers,
+                    thread_name_prefix=f"{cls.__name__}_sync",
+                )
 
     @classmethod
     async def get_instance(cls) -> Optional["AsyncSingletonEventSystem"]:
         return cls._instance
 
     @classmethod
-    async def _run_handler(cls, handler: Handler, event_data: Dict[str, Any]) -> None:
-        if asyncio.iscoroutinefunction(handler):
-            # If it's an async function, await it
-            await handler(event_data)
-        else:
-            # If it's a sync function, run it in a thread
-            await asyncio.to_thread(cast(Callable[[Any], Any], handler), event_data)
+    def _executor_for(cls, execution: Execution) -> Executor | None:
+        if execution is not Execution.PROCESS:
+            return cls._sync_executor
+        if cls._process_executor is None:
+            cls._process_executor = ProcessPoolExecutor(max_workers=cls._process_workers)
+        return cls._process_executor
+
+    @classmethod
+    def _reply_when_settled(cls, reply: Reply, results: List[Any]) -> None:
+        """
+        Resolve the reply with the final outcomes once every failed delivery settled,
+        without holding up the consumer while retries back off.
+        """
+        if pending := [
+            asyncio.wrap_future(r.settled)
+            for r in results
+            if isinstance(r, FailedDelivery) and not r.settled.done()
+        ]:
+            asyncio.gather(*pending).add_done_callback(
+                lambda _: cls._reply_when_settled(reply, results)
+            )
+        # The caller may have timed out meanwhile.
+        elif not reply.done():
+            reply.set_result(
+                [r.settled.result() if isinstance(r, FailedDelivery) else r for r in results]
+            )
 
     @classmethod
     async def _process_events(cls) -> None:
         while hasattr(cls, "_event_queue"):
-            event_type, event_data = await cls._event_queue.get()
-            if event_type in cls._subscriptions:
-                for handler in cls._subscriptions[event_type]:
-                    # if handler: TODO: Check if this is ok
-                    await cls._run_handler(handler, event_data)
+            envelope = await cls._event_queue.get()
+            if cls._metrics is not None:
+                cls._metrics.record_dispatched(
+                    envelope.name, time.perf_counter() - envelope.posted_at
+                )
+            runners = cls._subscriptions.runners(envelope.name)
+            dispatching.set(envelope.name)
+            if envelope.reply is not None:
+                results = await collect_results(
+                    runners, envelope.data, cls._fan_out, cls._semaphore
+                )
+                cls._reply_when_settled(envelope.reply, results)
+            elif runners:
+                await run_handlers(runners, envelope.data, cls._fan_out, cls._semaphore)
             cls._event_queue.task_done()
 
     @classmethod
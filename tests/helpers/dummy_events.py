@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class PriceTick:
+    symbol: str
+    price: float
+
+
+@dataclass(slots=True)
+class OrderPlaced:
+    order_id: int
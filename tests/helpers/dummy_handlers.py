@@ -1,5 +1,8 @@
+import asyncio
+import os
 import re
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, List
 
 
 def dummy_handler(data: Dict[str, Any]) -> None:
@@ -28,3 +31,62 @@ def call_counting_dummy_handler(data: Dict[str, Any]) -> None:
         # Replace the number in the string with the incremented number
         incremented_string = re.sub(r"\d+", str(incremented_number), count_statement)
         print(incremented_string)
+
+
+def pid_writing_handler(data: Dict[str, Any]) -> None:
+    Path(data["path"]).write_text(str(os.getpid()))
+
+
+async def async_pid_writing_handler(data: Dict[str, Any]) -> None:
+    Path(data["path"]).write_text(str(os.getpid()))
+
+
+def failing_handler(data: Dict[str, Any]) -> None:
+    raise RuntimeError(data.get("dummy_data"))
+
+
+class ConcurrencyTracker:
+    """Provides an async handler which records how many of its invocations overlap."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls: List[Any] = []
+
+    async def handler(self, data: Dict[str, Any]) -> None:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.calls.append(data.get("dummy_data"))
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+
+
+def squaring_worker_setup(es: Any) -> None:
+    """Worker setup for MultiprocessEventSystem, which answers "square" with "squared"."""
+
+    def square(data: Dict[str, Any]) -> None:
+        es.post(
+            "squared",
+            {"n": data["n"], "square": data["n"] ** 2, "pid": os.getpid()},
+        )
+
+    es.subscribe("square", square)
+
+
+def announcing_worker_setup(es: Any) -> None:
+    """Worker setup which posts "announced" 0 to 499 itself, and 500 on "announce_more"."""
+    for n in range(500):
+        es.post("announced", {"n": n}, partition_key="announcements")
+    es.subscribe(
+        "announce_more",
+        lambda data: es.post("announced", {"n": 500}, partition_key="announcements"),
+    )
+
+
+def failing_worker_setup(es: Any) -> None:
+    raise RuntimeError("setup failed")
+
+
+def exiting_worker_setup(es: Any) -> None:
+    os._exit(3)
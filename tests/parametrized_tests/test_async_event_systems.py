@@ -1,15 +1,25 @@
-from typing import Any, Dict, Type
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Type
 import pytest
 from event_systems.base.async_protocols import Async, AsyncSingleton
+from event_systems.base.handler import Execution, Handler
+from event_systems.base.retry import RetryPolicy
 from event_systems.instanced.async_event_system import AsyncEventSystem
 from event_systems.singleton.async_event_system import AsyncSingletonEventSystem
 from tests.helpers.dummy_handlers import (
+    async_pid_writing_handler,
+    pid_writing_handler,
     async_dummy_handler,
     call_counting_dummy_handler,
     dummy_handler,
     dummy_handler_two,
+    failing_handler,
 )
 
+from tests.helpers.dummy_events import OrderPlaced, PriceTick
 from tests.helpers.typed_fixture import get_async_event_system_fixture
 
 # NOTE: The parametrized implementations dictionary would actually translate to a string
@@ -234,3 +244,581 @@ async def test_stop_and_start_results_in_clean_state(
     assert len(await es.get_subscriptions()) == 0
     assert await es.is_running() == True
     assert hasattr(es, "_task")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_post_many_calls_handlers_for_all_events_in_order(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    await es.subscribe("first_event", dummy_handler)
+    await es.subscribe("second_event", dummy_handler_two)
+
+    # when
+    await es.post_many(
+        [
+            ("first_event", {"dummy_data": "1"}),
+            ("second_event", {"dummy_data": "2"}),
+            ("first_event", {"dummy_data": "3"}),
+        ]
+    )
+    await es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert out == "1\n2\n3\n"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_post_many_with_unsubscribed_event_raises_error_and_posts_nothing(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    await es.subscribe("some_event", dummy_handler)
+
+    # when
+    with pytest.raises(ValueError):
+        await es.post_many(
+            [
+                ("some_event", {"dummy_data": "some data"}),
+                ("other_event", {"dummy_data": "other data"}),
+            ]
+        )
+    await es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert out == ""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_subscribe_with_non_callable_handler_fails(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    # when
+    result = await es.subscribe("some_event", "not a handler")  # type: ignore
+
+    # then
+    assert result["success"] is False
+    assert len(await es.get_subscriptions()) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+@pytest.mark.parametrize("handler", [pid_writing_handler, async_pid_writing_handler])
+async def test_process_execution_runs_handler_in_another_process(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    handler: Handler,
+    tmp_path: Path,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    await es.subscribe("some_event", handler, Execution.PROCESS)
+
+    # when
+    path = tmp_path / "pid"
+    await es.post("some_event", {"path": str(path)})
+    await es.process_all_events()
+
+    # then
+    assert int(path.read_text()) != os.getpid()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_process_execution_with_unpicklable_handler_fails(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    # when
+    result = await es.subscribe("some_event", lambda data: None, Execution.PROCESS)
+
+    # then
+    assert result["success"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_cancelled_subscription_receives_no_events(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    subscription = await es.subscribe("some_event", dummy_handler)
+    await es.subscribe("some_event", dummy_handler_two)
+
+    # when
+    cancelled = subscription.cancel()
+    await es.post("some_event", {"dummy_data": "handled once"})
+    await es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert cancelled is True
+    assert subscription.active is False
+    assert subscription.cancel() is False
+    assert out == "handled once\n"
+    assert (await es.get_subscriptions())["some_event"] == [dummy_handler_two]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_cancelling_last_subscription_removes_event(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    subscription = await es.subscribe("some_event", dummy_handler)
+
+    # when
+    subscription.cancel()
+
+    # then
+    assert len(await es.get_subscriptions()) == 0
+    with pytest.raises(ValueError):
+        await es.post("some_event", {"dummy_data": "some data"})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_subscription_cancelled_by_running_handler_misses_dequeued_event(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    subscriptions = []
+
+    async def cancelling_handler(data: Dict[str, Any]) -> None:
+        subscriptions[0].cancel()
+
+    await es.subscribe("some_event", cancelling_handler)
+    subscriptions.append(await es.subscribe("some_event", async_dummy_handler))
+
+    # when
+    await es.post("some_event", {"dummy_data": "not handled"})
+    await es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert out == ""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_failed_subscription_cannot_be_cancelled(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    # when
+    subscription = await es.subscribe("some_event", "not a handler")  # type: ignore
+
+    # then
+    assert subscription.active is False
+    assert subscription.cancel() is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_wildcard_subscriptions_receive_matching_topics_in_subscription_order(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    calls = []
+
+    def recorder(label: str) -> Handler:
+        async def record(data: Dict[str, Any]) -> None:
+            calls.append((label, data["dummy_data"]))
+
+        return record
+
+    await es.subscribe("orders.#", recorder("any"))
+    await es.subscribe("orders.eu.limit", recorder("exact"))
+    await es.subscribe("orders.*.limit", recorder("one"))
+
+    # when
+    await es.post("orders.eu.limit", {"dummy_data": 1})
+    await es.post("orders.us", {"dummy_data": 2})
+    await es.process_all_events()
+
+    # then
+    assert calls == [("any", 1), ("exact", 1), ("one", 1), ("any", 2)]
+    with pytest.raises(ValueError):
+        await es.post("trades.eu", {"dummy_data": 3})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_wildcard_subscription_changes_apply_to_resolved_topics(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    await es.subscribe("orders.eu", async_dummy_handler)
+    await es.post("orders.eu", {"dummy_data": "exact"})
+    await es.process_all_events()
+
+    # when
+    subscription = await es.subscribe("orders.*", async_dummy_handler)
+    await es.post("orders.eu", {"dummy_data": "twice"})
+    await es.process_all_events()
+    subscription.cancel()
+    await es.post("orders.eu", {"dummy_data": "once"})
+    await es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert out == "exact\ntwice\ntwice\nonce\n"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_post_with_priority_requires_priority_queue(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    await es.subscribe("some_event", dummy_handler)
+
+    # when & then
+    with pytest.raises(ValueError):
+        await es.post("some_event", {"dummy_data": "some data"}, priority=1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_coalesced_events_deliver_latest_data_per_key(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    calls = []
+
+    async def record(data: Dict[str, Any]) -> None:
+        calls.append((data["symbol"], data["price"]))
+
+    await es.subscribe("price", record)
+
+    # when
+    for price in range(100):
+        for symbol in ("BTC", "ETH"):
+            await es.post(
+                "price", {"symbol": symbol, "price": price}, coalesce_key=symbol
+            )
+    await es.process_all_events()
+
+    # then
+    assert calls == [("BTC", 99), ("ETH", 99)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_typed_events_are_routed_by_class(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    ticks: List[PriceTick] = []
+    everything: List[Any] = []
+
+    async def on_tick(event: PriceTick) -> None:
+        ticks.append(event)
+
+    async def on_any(event: Any) -> None:
+        everything.append(event)
+
+    await es.subscribe(PriceTick, on_tick)
+    await es.subscribe("tests.helpers.dummy_events.#", on_any)
+
+    # when
+    await es.post_event(PriceTick("BTC", 1.0))
+    await es.post_event(OrderPlaced(7))
+    await es.process_all_events()
+
+    # then
+    assert ticks == [PriceTick("BTC", 1.0)]
+    assert everything == [PriceTick("BTC", 1.0), OrderPlaced(7)]
+    with pytest.raises(ValueError):
+        await es.post_event(object())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_delayed_events_are_posted_in_deadline_order_unless_cancelled(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    calls = []
+
+    async def record(data: Dict[str, Any]) -> None:
+        calls.append(data["n"])
+
+    await es.subscribe("some_event", record)
+
+    # when
+    await es.post_after(0.06, "some_event", {"n": 3})
+    cancelled = await es.post_after(0.02, "some_event", {"n": 0})
+    await es.post_after(0.01, "some_event", {"n": 1})
+    await es.post_at(time.time() + 0.03, "some_event", {"n": 2})
+    assert cancelled.cancel()
+    await asyncio.sleep(0.02)
+    await es.process_all_events()
+    early = list(calls)
+    await asyncio.sleep(0.1)
+    await es.process_all_events()
+
+    # then
+    assert early == [1]
+    assert calls == [1, 2, 3]
+    assert not cancelled.cancel()
+    with pytest.raises(ValueError):
+        await es.post_after(0.01, "unknown_event", {})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_post_and_collect_returns_handler_results_in_subscription_order(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    async def double(data: Dict[str, Any]) -> int:
+        return data["n"] * 2
+
+    async def fail(data: Dict[str, Any]) -> None:
+        raise RuntimeError("boom")
+
+    await es.subscribe("some_event", double)
+    await es.subscribe("some_event", fail)
+    await es.subscribe("some_event", lambda data: data["n"] + 1)
+
+    # when
+    results = await es.post_and_collect("some_event", {"n": 20})
+
+    # then
+    assert results[0] == 40
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == 21
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_post_and_collect_waits_for_retries_of_its_handlers(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    attempts: List[int] = []
+
+    async def flaky(data: Dict[str, Any]) -> int:
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("flaky")
+        return data["n"] * 2
+
+    policy = RetryPolicy(max_attempts=2, initial_delay=0.001)
+    await es.subscribe("some_event", flaky, retry=policy)
+    await es.subscribe("some_event", failing_handler, retry=policy)
+
+    # when
+    results = await es.post_and_collect(
+        "some_event", {"n": 20, "dummy_data": "boom"}, timeout=5
+    )
+
+    # then the retry's result, and the exception of the last attempt
+    assert results[0] == 40
+    assert isinstance(results[1], RuntimeError)
+    assert es.dead_letters.peek()[0].attempts == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_post_and_collect_times_out(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    async def slow(data: Dict[str, Any]) -> None:
+        await asyncio.sleep(0.2)
+
+    await es.subscribe("some_event", slow)
+
+    # when & then
+    with pytest.raises(TimeoutError):
+        await es.post_and_collect("some_event", {}, timeout=0.01)
+    await es.process_all_events()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_failing_handler_is_retried_without_stopping_dispatch(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    attempts: List[int] = []
+    handled: List[int] = []
+
+    async def flaky(data: Dict[str, Any]) -> None:
+        attempts.append(data["n"])
+        if attempts.count(data["n"]) < 3:
+            raise RuntimeError("flaky")
+
+    policy = RetryPolicy(max_attempts=3, initial_delay=0.001, jitter=False)
+    await es.subscribe("flaky_event", flaky, retry=policy)
+    await es.subscribe("other_event", lambda data: handled.append(data["n"]))
+
+    # when
+    await es.post("flaky_event", {"n": 1})
+    await es.post("other_event", {"n": 2})
+    await es.process_all_events()
+
+    # then
+    assert attempts == [1, 1, 1]
+    assert handled == [2]
+    assert len(es.dead_letters) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_exhausted_events_are_dead_lettered_and_replayed(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    broken = True
+    handled: List[int] = []
+
+    def handle(data: Dict[str, Any]) -> None:
+        if broken:
+            raise RuntimeError("broken")
+        handled.append(data["n"])
+
+    await es.subscribe(
+        "some_event", handle, retry=RetryPolicy(max_attempts=2, initial_delay=0.001)
+    )
+
+    # when
+    await es.post_many([("some_event", {"n": n}) for n in range(3)])
+    await es.process_all_events()
+
+    # then
+    letters = es.dead_letters.peek()
+    assert sorted(letter.event_data["n"] for letter in letters) == [0, 1, 2]
+    assert all(letter.attempts == 2 for letter in letters)
+    assert all(isinstance(letter.exception, RuntimeError) for letter in letters)
+
+    # when
+    broken = False
+    replayed = await es.replay_dead_letters()
+    await es.process_all_events()
+
+    # then
+    assert replayed == 3
+    assert sorted(handled) == [0, 1, 2]
+    assert len(es.dead_letters) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+async def test_dead_letters_of_wildcard_handlers_keep_the_posted_topic(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_async_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    await es.subscribe("orders.*", failing_handler)
+
+    # when
+    await es.post("orders.created", {"dummy_data": "boom"})
+    await es.post("orders.cancelled", {"dummy_data": "boom"})
+    await es.process_all_events()
+
+    # then
+    assert sorted(letter.event_name for letter in es.dead_letters.peek()) == [
+        "orders.cancelled",
+        "orders.created",
+    ]
+    assert await es.replay_dead_letters("orders.created") == 1
@@ -1,14 +1,23 @@
-from typing import Any, Dict, Type
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Type
 import pytest
 from event_systems.base.threaded_protocols import Threaded
+from event_systems.base.handler import Execution, Handler
+from event_systems.base.retry import RetryPolicy
 from event_systems.instanced.threaded_event_system import ThreadedEventSystem
 from tests.helpers.dummy_handlers import (
+    async_pid_writing_handler,
+    pid_writing_handler,
     async_dummy_handler,
     dummy_handler,
     call_counting_dummy_handler,
     dummy_handler_two,
+    failing_handler,
 )
 
+from tests.helpers.dummy_events import OrderPlaced, PriceTick
 from tests.helpers.typed_fixture import get_threaded_event_system_fixture
 
 # NOTE: The parametrized implementations dictionary would actually translate to a string
@@ -244,3 +253,432 @@ def test_stop_and_start_results_in_clean_state(
     # then
     assert len(es.get_subscriptions()) == 0
     assert es.is_running() == True
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_post_many_calls_handlers_for_all_events(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    es.subscribe("first_event", dummy_handler)
+    es.subscribe("second_event", dummy_handler_two)
+
+    # when
+    es.post_many(
+        [
+            ("first_event", {"dummy_data": "1"}),
+            ("second_event", {"dummy_data": "2"}),
+            ("first_event", {"dummy_data": "3"}),
+        ]
+    )
+    es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert sorted(out.splitlines()) == ["1", "2", "3"]
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_post_many_with_unsubscribed_event_raises_error_and_posts_nothing(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    es.subscribe("some_event", dummy_handler)
+
+    # when
+    with pytest.raises(ValueError):
+        es.post_many(
+            [
+                ("some_event", {"dummy_data": "some data"}),
+                ("other_event", {"dummy_data": "other data"}),
+            ]
+        )
+    es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert out == ""
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_subscribe_with_non_callable_handler_fails(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    # when
+    result = es.subscribe("some_event", "not a handler")  # type: ignore
+
+    # then
+    assert result["success"] is False
+    assert len(es.get_subscriptions()) == 0
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+@pytest.mark.parametrize("handler", [pid_writing_handler, async_pid_writing_handler])
+def test_process_execution_runs_handler_in_another_process(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    handler: Handler,
+    tmp_path: Path,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    es.subscribe("some_event", handler, Execution.PROCESS)
+
+    # when
+    path = tmp_path / "pid"
+    es.post("some_event", {"path": str(path)})
+    es.process_all_events()
+
+    # then
+    assert int(path.read_text()) != os.getpid()
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_process_execution_with_unpicklable_handler_fails(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    # when
+    result = es.subscribe("some_event", lambda data: None, Execution.PROCESS)
+
+    # then
+    assert result["success"] is False
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_cancelled_subscription_receives_no_events(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    subscription = es.subscribe("some_event", dummy_handler)
+    es.subscribe("some_event", dummy_handler_two)
+
+    # when
+    cancelled = subscription.cancel()
+    es.post("some_event", {"dummy_data": "handled once"})
+    es.process_all_events()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert cancelled is True
+    assert subscription.cancel() is False
+    assert out == "handled once\n"
+    assert es.get_subscriptions()["some_event"] == [dummy_handler_two]
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_cancelling_last_subscription_removes_event(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    subscription = es.subscribe("some_event", dummy_handler)
+
+    # when
+    subscription.cancel()
+
+    # then
+    assert len(es.get_subscriptions()) == 0
+    with pytest.raises(ValueError):
+        es.post("some_event", {"dummy_data": "some data"})
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_handler_cancelling_own_subscription_misses_dequeued_events(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    calls = []
+    subscriptions = []
+
+    def cancelling_handler(data: Dict[str, Any]) -> None:
+        calls.append(data["dummy_data"])
+        subscriptions[0].cancel()
+
+    subscriptions.append(es.subscribe("some_event", cancelling_handler))
+
+    # when
+    es.post_many([("some_event", {"dummy_data": i}) for i in range(5)])
+    es.process_all_events()
+
+    # then
+    assert calls == [0]
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_wildcard_subscriptions_receive_matching_topics(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    calls = []
+    es.subscribe("orders.#", lambda data: calls.append(("any", data["dummy_data"])))
+    es.subscribe("orders.*.limit", lambda data: calls.append(("one", data["dummy_data"])))
+
+    # when
+    es.post("orders.eu.limit", {"dummy_data": 1})
+    es.process_all_events()
+    es.post("orders.us", {"dummy_data": 2})
+    es.process_all_events()
+
+    # then
+    assert sorted(calls) == [("any", 1), ("any", 2), ("one", 1)]
+    with pytest.raises(ValueError):
+        es.post("trades.eu", {"dummy_data": 3})
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_typed_events_are_routed_by_class(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    ticks: List[PriceTick] = []
+    es.subscribe(PriceTick, ticks.append)
+
+    # when
+    es.post_event(PriceTick("BTC", 1.0))
+    es.process_all_events()
+
+    # then
+    assert ticks == [PriceTick("BTC", 1.0)]
+    with pytest.raises(ValueError):
+        es.post_event(OrderPlaced(7))
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_delayed_events_are_posted_in_deadline_order_unless_cancelled(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    calls = []
+    es.subscribe("some_event", lambda data: calls.append(data["n"]))
+
+    # when (one partition key, so handlers run in posting order)
+    es.post_after(0.06, "some_event", {"n": 3}, partition_key="k")
+    cancelled = es.post_after(0.02, "some_event", {"n": 0}, partition_key="k")
+    es.post_after(0.01, "some_event", {"n": 1}, partition_key="k")
+    es.post_at(time.time() + 0.03, "some_event", {"n": 2}, partition_key="k")
+    assert cancelled.cancel()
+    time.sleep(0.15)
+    es.process_all_events()
+
+    # then
+    assert calls == [1, 2, 3]
+    assert not cancelled.cancel()
+    with pytest.raises(ValueError):
+        es.post_after(0.01, "unknown_event", {})
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+@pytest.mark.parametrize("partition_key", [None, "some_key"])
+def test_post_and_collect_returns_handler_results_in_subscription_order(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    partition_key: str | None,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+
+    def fail(data: Dict[str, Any]) -> None:
+        raise RuntimeError("boom")
+
+    es.subscribe("some_event", lambda data: data["n"] * 2)
+    es.subscribe("some_event", fail)
+    es.subscribe("some_event", lambda data: data["n"] + 1)
+
+    # when
+    future = es.post_and_collect("some_event", {"n": 20}, partition_key=partition_key)
+    results = future.result(timeout=5)
+    es.process_all_events()
+
+    # then failures go to the caller only
+    assert results[0] == 40
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == 21
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+@pytest.mark.parametrize("partition_key", [None, "some_key"])
+def test_post_and_collect_waits_for_retries_of_its_handlers(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    partition_key: str | None,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    attempts: List[int] = []
+
+    def flaky(data: Dict[str, Any]) -> int:
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("flaky")
+        return data["n"] * 2
+
+    policy = RetryPolicy(max_attempts=2, initial_delay=0.001)
+    es.subscribe("some_event", flaky, retry=policy)
+    es.subscribe("some_event", failing_handler, retry=policy)
+
+    # when
+    future = es.post_and_collect(
+        "some_event", {"n": 20, "dummy_data": "boom"}, partition_key=partition_key
+    )
+    results = future.result(timeout=5)
+    es.process_all_events()
+
+    # then the retry's result, and the exception of the last attempt
+    assert results[0] == 40
+    assert isinstance(results[1], RuntimeError)
+    assert es.dead_letters.peek()[0].attempts == 2
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+@pytest.mark.parametrize("execution", [Execution.THREAD, Execution.INLINE])
+def test_failing_handler_is_retried_without_stopping_dispatch(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    execution: Execution,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    attempts: List[int] = []
+    handled: List[int] = []
+
+    def flaky(data: Dict[str, Any]) -> None:
+        attempts.append(data["n"])
+        if attempts.count(data["n"]) < 3:
+            raise RuntimeError("flaky")
+
+    policy = RetryPolicy(max_attempts=3, initial_delay=0.001, jitter=False)
+    es.subscribe("flaky_event", flaky, execution, retry=policy)
+    es.subscribe("other_event", lambda data: handled.append(data["n"]))
+
+    # when
+    es.post("flaky_event", {"n": 1})
+    es.post("other_event", {"n": 2})
+    es.process_all_events()
+
+    # then
+    assert attempts == [1, 1, 1]
+    assert handled == [2]
+    assert len(es.dead_letters) == 0
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+@pytest.mark.parametrize("partition_key", [None, "some_key"])
+def test_exhausted_events_are_dead_lettered_and_replayed(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+    partition_key: str | None,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    broken = True
+    handled: List[int] = []
+
+    def handle(data: Dict[str, Any]) -> None:
+        if broken:
+            raise RuntimeError("broken")
+        handled.append(data["n"])
+
+    es.subscribe(
+        "some_event", handle, retry=RetryPolicy(max_attempts=2, initial_delay=0.001)
+    )
+
+    # when
+    for n in range(3):
+        es.post("some_event", {"n": n}, partition_key=partition_key)
+    es.process_all_events()
+
+    # then
+    letters = es.dead_letters.peek()
+    assert sorted(letter.event_data["n"] for letter in letters) == [0, 1, 2]
+    assert all(letter.attempts == 2 for letter in letters)
+    assert all(isinstance(letter.exception, RuntimeError) for letter in letters)
+
+    # when
+    broken = False
+    replayed = es.replay_dead_letters()
+    es.process_all_events()
+
+    # then
+    assert replayed == 3
+    assert sorted(handled) == [0, 1, 2]
+    assert len(es.dead_letters) == 0
+
+
+@pytest.mark.parametrize("fixture_name", list(implementations.keys()))
+def test_dead_letters_of_wildcard_handlers_keep_the_posted_topic(
+    request: pytest.FixtureRequest,
+    fixture_name: str,
+) -> None:
+    # given
+    es = get_threaded_event_system_fixture(
+        request, fixture_name, implementations[fixture_name]
+    )
+    es.subscribe("orders.*", failing_handler)
+
+    # when
+    es.post("orders.created", {"dummy_data": "boom"})
+    es.post("orders.cancelled", {"dummy_data": "boom"})
+    es.process_all_events()
+
+    # then
+    assert sorted(letter.event_name for letter in es.dead_letters.peek()) == [
+        "orders.cancelled",
+        "orders.created",
+    ]
+    assert es.replay_dead_letters("orders.created") == 1
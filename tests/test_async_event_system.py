@@ -1,10 +1,15 @@
 import asyncio
-from typing import Any, Coroutine
+import threading
+import time
+from typing import Any, Coroutine, Dict, List, Tuple
 import pytest
 
 
+from event_systems.base.event_queue import Overflow
+from event_systems.base.fan_out import FanOut
+from event_systems.base.handler import Execution
 from event_systems.instanced.async_event_system import AsyncEventSystem
-from tests.helpers.dummy_handlers import dummy_handler
+from tests.helpers.dummy_handlers import ConcurrencyTracker, dummy_handler
 
 
 def run_in_loop(
@@ -101,3 +106,340 @@ async def test_get_loop_returns_correct_loop() -> None:
             task.cancel()
         custom_loop.run_until_complete(custom_loop.shutdown_asyncgens())
         custom_loop.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fan_out, limit, expected_max_active",
+    [
+        (FanOut.SEQUENTIAL, None, 1),
+        (FanOut.CONCURRENT, None, 3),
+        (FanOut.BOUNDED, 2, 2),
+    ],
+)
+async def test_fan_out_controls_handler_concurrency_per_event(
+    fan_out: FanOut,
+    limit: int | None,
+    expected_max_active: int,
+) -> None:
+    # given
+    es = AsyncEventSystem(fan_out=fan_out, max_concurrent_handlers=limit)
+    tracker = ConcurrencyTracker()
+    for _ in range(3):
+        await es.subscribe("some_event", tracker.handler)
+    await es.start()
+
+    # when
+    await es.post("some_event", {"dummy_data": 0})
+    await es.process_all_events()
+    await es.stop()
+
+    # then
+    assert len(tracker.calls) == 3
+    assert tracker.max_active == expected_max_active
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fan_out_keeps_posting_order_of_events() -> None:
+    # given
+    es = AsyncEventSystem(fan_out=FanOut.CONCURRENT)
+    tracker = ConcurrencyTracker()
+    await es.subscribe("some_event", tracker.handler)
+    await es.subscribe("some_event", tracker.handler)
+    await es.start()
+
+    # when
+    for i in range(3):
+        await es.post("some_event", {"dummy_data": i})
+    await es.process_all_events()
+    await es.stop()
+
+    # then
+    assert tracker.calls == [0, 0, 1, 1, 2, 2]
+
+
+def test_bounded_fan_out_without_limit_raises_error() -> None:
+    with pytest.raises(ValueError):
+        AsyncEventSystem(fan_out=FanOut.BOUNDED)
+
+
+@pytest.mark.asyncio
+async def test_multiple_consumers_let_fast_events_overtake_slow_ones() -> None:
+    # given
+    es = AsyncEventSystem(consumers=2)
+    finished: List[str] = []
+
+    async def slow_handler(data: Dict[str, Any]) -> None:
+        await asyncio.sleep(0.1)
+        finished.append("slow")
+
+    async def fast_handler(data: Dict[str, Any]) -> None:
+        finished.append("fast")
+
+    await es.subscribe("slow_event", slow_handler)
+    await es.subscribe("fast_event", fast_handler)
+    await es.start()
+
+    # when
+    await es.post("slow_event", {})
+    await es.post("fast_event", {})
+    await es.process_all_events()
+    await es.stop()
+
+    # then
+    assert finished == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_multiple_consumers_preserve_topic_order_if_requested() -> None:
+    # given
+    es = AsyncEventSystem(consumers=4, preserve_topic_order=True)
+    received: Dict[str, List[int]] = {"a": [], "b": []}
+
+    async def handler(data: Dict[str, Any]) -> None:
+        # Earlier events sleep longer, so they would finish last without ordering.
+        await asyncio.sleep(0.01 * (5 - data["index"]))
+        received[data["topic"]].append(data["index"])
+
+    await es.subscribe("a", handler)
+    await es.subscribe("b", handler)
+    await es.start()
+
+    # when
+    for index in range(5):
+        for topic in ("a", "b"):
+            await es.post(topic, {"topic": topic, "index": index})
+    await es.process_all_events()
+    await es.stop()
+
+    # then
+    assert received == {"a": [0, 1, 2, 3, 4], "b": [0, 1, 2, 3, 4]}
+
+
+@pytest.mark.asyncio
+async def test_slow_topic_does_not_hold_back_other_topics_with_topic_order() -> None:
+    # given
+    es = AsyncEventSystem(consumers=4, preserve_topic_order=True)
+    dispatched_at: Dict[str, float] = {}
+
+    async def slow_handler(data: Dict[str, Any]) -> None:
+        await asyncio.sleep(0.05)
+
+    async def fast_handler(data: Dict[str, Any]) -> None:
+        dispatched_at["b"] = time.perf_counter()
+
+    await es.subscribe("a", slow_handler)
+    await es.subscribe("b", fast_handler)
+    await es.start()
+
+    # when
+    start = time.perf_counter()
+    for _ in range(12):
+        await es.post("a", {})
+    await es.post("b", {})
+    await es.process_all_events()
+    await es.stop()
+
+    # then "b" doesn't wait for the backlog of "a", which takes 0.6s
+    assert dispatched_at["b"] - start < 0.2
+
+
+def test_less_than_one_consumer_raises_error() -> None:
+    with pytest.raises(ValueError):
+        AsyncEventSystem(consumers=0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overflow, expected_handled",
+    [
+        (Overflow.DROP_NEWEST, [1, 2, 3]),
+        (Overflow.DROP_OLDEST, [1, 3, 4]),
+    ],
+)
+async def test_bounded_queue_drops_events_according_to_overflow(
+    overflow: Overflow,
+    expected_handled: List[int],
+) -> None:
+    # given
+    es = AsyncEventSystem(max_queue_size=2, overflow=overflow)
+    started, release = asyncio.Event(), asyncio.Event()
+    handled: List[int] = []
+
+    async def blocking_handler(data: Dict[str, Any]) -> None:
+        started.set()
+        await release.wait()
+        handled.append(data["index"])
+
+    await es.subscribe("some_event", blocking_handler)
+    await es.start()
+
+    # when the first event blocks the only consumer, the queue fills up
+    await es.post("some_event", {"index": 1})
+    await started.wait()
+    for index in (2, 3, 4):
+        await es.post("some_event", {"index": index})
+    release.set()
+    await es.process_all_events()
+
+    # then
+    assert await es.get_dropped_events() == {"some_event": 1}
+    assert handled == expected_handled
+    await es.stop()
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_with_raise_overflow_raises_when_full() -> None:
+    # given
+    es = AsyncEventSystem(max_queue_size=1, overflow=Overflow.RAISE)
+    await es.subscribe("some_event", dummy_handler)
+
+    # when the queue is not being consumed
+    await es.post("some_event", {})
+
+    # then
+    with pytest.raises(asyncio.QueueFull):
+        await es.post("some_event", {})
+    with pytest.raises(asyncio.QueueFull):
+        await es.post_many([("some_event", {})])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sync_workers, execution, expected_thread_prefix",
+    [
+        (None, Execution.THREAD, "asyncio_"),
+        (2, Execution.THREAD, "sync_es_sync"),
+        (2, Execution.INLINE, "MainThread"),
+    ],
+)
+async def test_sync_handlers_run_where_configured(
+    sync_workers: int | None,
+    execution: Execution,
+    expected_thread_prefix: str,
+) -> None:
+    # given
+    es = AsyncEventSystem(name="sync_es", sync_workers=sync_workers)
+    thread_names: List[str] = []
+
+    def thread_recording_handler(data: Dict[str, Any]) -> None:
+        thread_names.append(threading.current_thread().name)
+
+    await es.subscribe("some_event", thread_recording_handler, execution)
+    await es.start()
+
+    # when
+    await es.post("some_event", {})
+    await es.process_all_events()
+    await es.stop()
+
+    # then
+    assert len(thread_names) == 1
+    assert thread_names[0].startswith(expected_thread_prefix)
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_posted_and_dispatched_events() -> None:
+    # given
+    es = AsyncEventSystem(metrics=True)
+    await es.subscribe("some_event", dummy_handler)
+    await es.start()
+
+    # when
+    await es.post("some_event", {"dummy_data": 1})
+    await es.post_many(
+        [("some_event", {"dummy_data": 2}), ("some_event", {"dummy_data": 3})]
+    )
+    await es.process_all_events()
+    stats = es.stats()
+    await es.stop()
+
+    # then
+    assert stats["topics"]["some_event"] == {
+        "posted": 3,
+        "dispatched": 3,
+        "failed": 0,
+        "dropped": 0,
+    }
+    assert stats["queue_wait_seconds"]["count"] == 3
+    assert stats["handler_runtime_seconds"]["count"] == 3
+    assert stats["in_flight_handlers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_priorities_dispatch_urgent_events_first() -> None:
+    # given
+    es = AsyncEventSystem(priorities=True)
+    calls: List[str] = []
+
+    async def record(data: Dict[str, Any]) -> None:
+        calls.append(data["dummy_data"])
+
+    await es.subscribe("some_event", record)
+    await es.start()
+
+    # when
+    await es.post("some_event", {"dummy_data": "telemetry 1"}, priority=5)
+    await es.post("some_event", {"dummy_data": "shutdown"}, priority=0)
+    await es.post("some_event", {"dummy_data": "telemetry 2"}, priority=5)
+    await es.process_all_events()
+    await es.stop()
+
+    # then
+    assert calls == ["shutdown", "telemetry 1", "telemetry 2"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flush_timers", [True, False])
+async def test_stop_flushes_or_discards_pending_timers(flush_timers: bool) -> None:
+    # given
+    es = AsyncEventSystem(flush_timers=flush_timers)
+    calls: List[str] = []
+
+    async def record(data: Dict[str, Any]) -> None:
+        calls.append(data["dummy_data"])
+
+    await es.subscribe("some_event", record)
+    await es.start()
+    timer = await es.post_after(60, "some_event", {"dummy_data": "later"})
+
+    # when
+    await es.stop()
+
+    # then
+    assert calls == (["later"] if flush_timers else [])
+    assert not timer.active
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_queue_size", [0, 8])
+async def test_post_threadsafe_from_threads_keeps_order_per_thread(
+    max_queue_size: int,
+) -> None:
+    # given
+    es = AsyncEventSystem(max_queue_size=max_queue_size)
+    calls: List[Tuple[int, int]] = []
+
+    async def record(data: Dict[str, Any]) -> None:
+        calls.append((data["thread"], data["n"]))
+
+    await es.subscribe("some_event", record)
+    await es.start()
+
+    def produce(thread: int) -> None:
+        for n in range(0, 500, 2):
+            es.post_threadsafe("some_event", {"thread": thread, "n": n})
+            es.post_many_threadsafe([("some_event", {"thread": thread, "n": n + 1})])
+
+    # when
+    threads = [threading.Thread(target=produce, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+    await es.process_all_events()
+    await es.stop()
+
+    # then
+    assert len(calls) == 2000
+    for i in range(4):
+        assert [n for thread, n in calls if thread == i] == list(range(500))
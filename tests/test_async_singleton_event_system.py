@@ -1,7 +1,11 @@
+import threading
+from typing import Any, Dict, List
 import pytest
+from event_systems.base.event_queue import Overflow
+from event_systems.base.fan_out import FanOut
 from event_systems.singleton.async_event_system import AsyncSingletonEventSystem
 
-from tests.helpers.dummy_handlers import dummy_handler
+from tests.helpers.dummy_handlers import ConcurrencyTracker, dummy_handler
 
 
 @pytest.mark.asyncio
@@ -42,3 +46,155 @@ async def test_post_raises_exception_if_not_initialized(
     # when & then
     with pytest.raises(RuntimeError):
         await es.post("some_event", {"dummy_data": "some data"})
+
+
+@pytest.mark.asyncio
+async def test_configured_concurrent_fan_out_runs_handlers_concurrently(
+    async_singleton_event_system: AsyncSingletonEventSystem,
+) -> None:
+    # given
+    es = async_singleton_event_system
+    await es.configure(fan_out=FanOut.CONCURRENT)
+    tracker = ConcurrencyTracker()
+    for _ in range(3):
+        await es.subscribe("some_event", tracker.handler)
+
+    try:
+        # when
+        await es.post("some_event", {"dummy_data": 0})
+        await es.process_all_events()
+
+        # then
+        assert tracker.max_active == 3
+    finally:
+        await es.configure()
+
+
+@pytest.mark.asyncio
+async def test_configured_bounded_queue_drops_newest_events(
+    uninitialized_async_singleton_event_system: AsyncSingletonEventSystem,
+) -> None:
+    # given
+    es = uninitialized_async_singleton_event_system
+    await es.configure(max_queue_size=1, overflow=Overflow.DROP_NEWEST)
+
+    try:
+        # when the queue is not being consumed
+        await es.subscribe("some_event", dummy_handler)
+        await es.post("some_event", {"dummy_data": "kept"})
+        await es.post("some_event", {"dummy_data": "dropped"})
+
+        await es.start()
+        await es.process_all_events()
+
+        # then
+        assert await es.get_dropped_events() == {"some_event": 1}
+    finally:
+        await es.configure()
+
+
+@pytest.mark.asyncio
+async def test_configured_sync_workers_run_sync_handlers(
+    uninitialized_async_singleton_event_system: AsyncSingletonEventSystem,
+) -> None:
+    # given
+    es = uninitialized_async_singleton_event_system
+    await es.configure(sync_workers=1)
+    thread_names: List[str] = []
+
+    def thread_recording_handler(data: Dict[str, Any]) -> None:
+        thread_names.append(threading.current_thread().name)
+
+    try:
+        await es.subscribe("some_event", thread_recording_handler)
+        await es.start()
+
+        # when
+        await es.post("some_event", {})
+        await es.process_all_events()
+
+        # then
+        assert thread_names == ["AsyncSingletonEventSystem_sync_0"]
+    finally:
+        await es.configure()
+
+
+@pytest.mark.asyncio
+async def test_configured_metrics_count_posted_and_dispatched_events(
+    uninitialized_async_singleton_event_system: AsyncSingletonEventSystem,
+) -> None:
+    # given
+    es = uninitialized_async_singleton_event_system
+    await es.configure(metrics=True)
+
+    try:
+        await es.start()
+        await es.subscribe("some_event", dummy_handler)
+
+        # when
+        await es.post("some_event", {"dummy_data": 1})
+        await es.process_all_events()
+
+        # then
+        stats = es.stats()
+        assert stats["topics"]["some_event"]["posted"] == 1
+        assert stats["topics"]["some_event"]["dispatched"] == 1
+        assert stats["handler_runtime_seconds"]["count"] == 1
+    finally:
+        await es.configure()
+
+
+@pytest.mark.asyncio
+async def test_configured_priorities_dispatch_urgent_events_first(
+    uninitialized_async_singleton_event_system: AsyncSingletonEventSystem,
+) -> None:
+    # given
+    es = uninitialized_async_singleton_event_system
+    await es.configure(priorities=True)
+    calls: List[str] = []
+
+    async def record(data: Dict[str, Any]) -> None:
+        calls.append(data["dummy_data"])
+
+    try:
+        await es.start()
+        await es.subscribe("some_event", record)
+
+        # when
+        await es.post("some_event", {"dummy_data": "telemetry"}, priority=5)
+        await es.post("some_event", {"dummy_data": "shutdown"}, priority=0)
+        await es.process_all_events()
+
+        # then
+        assert calls == ["shutdown", "telemetry"]
+    finally:
+        await es.configure()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flush_timers", [True, False])
+async def test_configured_stop_flushes_or_discards_pending_timers(
+    uninitialized_async_singleton_event_system: AsyncSingletonEventSystem,
+    flush_timers: bool,
+) -> None:
+    # given
+    es = uninitialized_async_singleton_event_system
+    await es.configure(flush_timers=flush_timers)
+    calls: List[str] = []
+
+    async def record(data: Dict[str, Any]) -> None:
+        calls.append(data["dummy_data"])
+
+    try:
+        await es.start()
+        await es.subscribe("some_event", record)
+        timer = await es.post_after(60, "some_event", {"dummy_data": "later"})
+
+        # when
+        await es.stop()
+
+        # then
+        assert calls == (["later"] if flush_timers else [])
+        assert not timer.active
+    finally:
+        await es.configure()
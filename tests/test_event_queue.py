@@ -0,0 +1,154 @@
+import pytest
+
+from event_systems.base import event_queue
+from event_systems.base.envelope import Envelope
+from event_systems.base.event_queue import (
+    AsyncEventQueue,
+    EventQueue,
+    Overflow,
+    PriorityHeap,
+)
+
+
+def test_priority_queue_takes_lowest_priority_first_and_fifo_within_priority() -> None:
+    # given
+    queue = EventQueue(priorities=True)
+
+    # when
+    queue.put_many(
+        [
+            Envelope("telemetry", {"n": 1}, priority=5),
+            Envelope("shutdown", {"n": 2}, priority=0),
+            Envelope("telemetry", {"n": 3}, priority=5),
+            Envelope("breaker", {"n": 4}, priority=1),
+        ]
+    )
+
+    # then
+    taken = [queue.get() for _ in range(4)]
+    assert [envelope.data["n"] for envelope in taken if envelope] == [2, 4, 1, 3]
+
+
+def test_aging_lets_waiting_events_overtake_newer_urgent_ones(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given
+    heap = PriorityHeap(aging=1.0)
+    monkeypatch.setattr(event_queue.time, "monotonic", lambda: 100.0)
+    heap.push(Envelope("telemetry", {}, priority=5))
+
+    # when
+    monkeypatch.setattr(event_queue.time, "monotonic", lambda: 110.0)
+    heap.push(Envelope("control", {}, priority=0))
+
+    # then
+    assert [heap.pop().name, heap.pop().name] == ["telemetry", "control"]  # type: ignore
+
+
+def test_priority_queue_drops_least_urgent_event_when_full() -> None:
+    # given
+    queue = EventQueue(maxsize=2, overflow=Overflow.DROP_OLDEST, priorities=True)
+    queue.put(Envelope("control", {}, priority=0))
+    queue.put(Envelope("telemetry", {}, priority=9))
+
+    # when
+    queue.put(Envelope("breaker", {}, priority=1))
+
+    # then
+    assert queue.dropped == {"telemetry": 1}
+    assert [queue.get().name, queue.get().name] == ["control", "breaker"]  # type: ignore
+
+
+def test_coalescing_replaces_pending_event_in_place() -> None:
+    # given
+    queue = EventQueue()
+    queue.put(Envelope("price", {"price": 1}, coalesce_key="BTC"))
+    queue.put(Envelope("price", {"price": 10}, coalesce_key="ETH"))
+
+    # when
+    queue.put(Envelope("price", {"price": 2}, coalesce_key="BTC"))
+    queue.put_many([Envelope("price", {"price": 3}, coalesce_key="BTC")])
+
+    # then
+    assert queue.qsize() == 2
+    assert queue.coalescing.coalesced == {"price": 2}
+    assert [queue.get().data, queue.get().data] == [{"price": 3}, {"price": 10}]  # type: ignore
+
+
+def test_coalescing_enqueues_again_once_pending_event_is_taken() -> None:
+    # given
+    queue = EventQueue()
+    queue.put(Envelope("price", {"price": 1}, coalesce_key="BTC"))
+    queue.get()
+
+    # when
+    queue.put(Envelope("price", {"price": 2}, coalesce_key="BTC"))
+
+    # then
+    assert queue.qsize() == 1
+    assert queue.get().data == {"price": 2}  # type: ignore
+
+
+def test_coalescing_into_full_queue_does_not_raise() -> None:
+    # given
+    queue = EventQueue(maxsize=1, overflow=Overflow.RAISE)
+    queue.put(Envelope("price", {"price": 1}, coalesce_key="BTC"))
+
+    # when
+    queue.put(Envelope("price", {"price": 2}, coalesce_key="BTC"))
+
+    # then
+    assert queue.get().data == {"price": 2}  # type: ignore
+
+
+def test_dropped_and_coalesced_events_are_discarded() -> None:
+    # given
+    queue = EventQueue(maxsize=1, overflow=Overflow.DROP_NEWEST)
+    discarded = []
+    queue.on_discard = lambda envelope: discarded.append(envelope.sequence)
+    envelopes = [
+        Envelope("price", {"price": 1}, coalesce_key="BTC"),
+        Envelope("price", {"price": 2}, coalesce_key="BTC"),
+        Envelope("price", {"price": 10}, coalesce_key="ETH"),
+    ]
+    for sequence, envelope in enumerate(envelopes, 1):
+        envelope.sequence = sequence
+
+    # when
+    queue.put_many(envelopes)
+
+    # then the pending event takes over the journal record of its newer data
+    assert discarded == [1, 3]
+    assert queue.get().sequence == 2  # type: ignore
+
+
+def test_dropped_snapshot_is_a_copy() -> None:
+    # given
+    queue = EventQueue(maxsize=1, overflow=Overflow.DROP_NEWEST)
+    queue.put_many([Envelope("price", {}), Envelope("price", {})])
+
+    # when
+    snapshot = queue.dropped_snapshot()
+    queue.count_dropped("price")
+
+    # then
+    assert snapshot == {"price": 1}
+    assert queue.dropped_snapshot() == {"price": 2}
+
+
+@pytest.mark.asyncio
+async def test_async_coalescing_replaces_pending_event_in_place() -> None:
+    # given
+    queue = AsyncEventQueue(maxsize=2)
+    await queue.put(Envelope("price", {"price": 1}, coalesce_key="BTC"))
+    await queue.put(Envelope("price", {"price": 10}, coalesce_key="ETH"))
+
+    # when
+    await queue.put(Envelope("price", {"price": 2}, coalesce_key="BTC"))
+
+    # then
+    assert queue.qsize() == 2
+    assert [(await queue.get()).data, (await queue.get()).data] == [
+        {"price": 2},
+        {"price": 10},
+    ]
@@ -0,0 +1,130 @@
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from event_systems.base import journal as journal_module
+from event_systems.base.envelope import Envelope
+from event_systems.base.journal import Fsync, Journal
+
+
+def _append(journal: Journal, count: int) -> List[Envelope]:
+    envelopes = [Envelope("some_event", {"i": i}) for i in range(count)]
+    journal.append_many(envelopes)
+    return envelopes
+
+
+@pytest.mark.parametrize("fsync", list(Fsync))
+def test_unacknowledged_events_are_replayed(tmp_path: Path, fsync: Fsync) -> None:
+    # given
+    journal = Journal(tmp_path, fsync)
+    journal.open()
+    envelopes = _append(journal, 5)
+    for envelope in envelopes[:2]:
+        journal.ack(envelope.sequence)
+    journal.ack(envelopes[3].sequence)
+
+    # when the process dies without closing the journal
+    journal.sync()
+    journal.compact()
+    replayed = Journal(tmp_path, fsync).open()
+
+    # then acknowledged events behind a gap are replayed as well, at least once
+    assert [envelope.data["i"] for envelope in replayed] == [2, 3, 4]
+    assert [envelope.sequence for envelope in replayed] == [3, 4, 5]
+
+
+def test_closing_a_fully_acknowledged_journal_removes_its_segments(
+    tmp_path: Path,
+) -> None:
+    # given
+    journal = Journal(tmp_path, Fsync.NEVER, segment_size=100)
+    journal.open()
+    for envelope in _append(journal, 20):
+        journal.ack(envelope.sequence)
+
+    # when
+    journal.close()
+
+    # then
+    assert list(tmp_path.glob("*.log")) == []
+    reopened = Journal(tmp_path, Fsync.NEVER)
+    assert reopened.open() == []
+    assert _append(reopened, 1)[0].sequence == 21
+
+
+def test_compaction_drops_acknowledged_segments_only(tmp_path: Path) -> None:
+    # given small segments, so every append starts a new one
+    journal = Journal(tmp_path, Fsync.NEVER, segment_size=1)
+    journal.open()
+    envelopes = _append(journal, 1) + _append(journal, 1) + _append(journal, 1)
+    journal.ack(envelopes[0].sequence)
+    journal.ack(envelopes[2].sequence)
+
+    # when
+    journal.compact()
+
+    # then
+    segments = sorted(path.name for path in tmp_path.glob("*.log"))
+    assert segments == [f"{2:020d}.log", f"{3:020d}.log"]
+
+
+def test_replay_stops_at_a_torn_record(tmp_path: Path) -> None:
+    # given
+    journal = Journal(tmp_path, Fsync.NEVER)
+    journal.open()
+    _append(journal, 3)
+    (segment,) = tmp_path.glob("*.log")
+    segment.write_bytes(segment.read_bytes()[:-3])
+
+    # when
+    reopened = Journal(tmp_path, Fsync.NEVER)
+    replayed = reopened.open()
+
+    # then the torn event is lost, and appending continues in a new segment
+    assert [envelope.data["i"] for envelope in replayed] == [0, 1]
+    assert _append(reopened, 1)[0].sequence == 3
+    assert len(list(tmp_path.glob("*.log"))) == 2
+
+
+def test_concurrent_sync_does_not_cover_a_record_still_being_written(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # given a post whose write is held up while another thread syncs
+    journal = Journal(tmp_path, Fsync.ALWAYS)
+    journal.open()
+    order: List[str] = []
+    writing, synced = threading.Event(), threading.Event()
+    file = journal._file
+    assert file is not None
+
+    class SlowFile:
+        name = file.name
+
+        def write(self, data: bytes) -> int:
+            writing.set()
+            synced.wait(5)
+            order.append("write")
+            return file.write(data)  # type: ignore
+
+        def fileno(self) -> int:
+            return file.fileno()  # type: ignore
+
+        def close(self) -> None:
+            file.close()  # type: ignore
+
+    def fsync(fd: int) -> None:
+        order.append("fsync")
+
+    journal._file = SlowFile()  # type: ignore
+    monkeypatch.setattr(journal_module.os, "fsync", fsync)
+    syncer = threading.Thread(target=lambda: (writing.wait(5), journal.sync(), synced.set()))
+    syncer.start()
+
+    # when
+    _append(journal, 1)
+    syncer.join()
+
+    # then the post is only acknowledged by an fsync after its write
+    assert order == ["write", "fsync"]
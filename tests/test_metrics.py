@@ -0,0 +1,99 @@
+import urllib.request
+from typing import Any, Dict
+import pytest
+
+from event_systems.base.metrics import (
+    Histogram,
+    Metrics,
+    build_stats,
+    serve_metrics,
+    to_prometheus,
+)
+
+
+def failing_handler(data: Dict[str, Any]) -> None:
+    raise RuntimeError("handler failed")
+
+
+def test_histogram_snapshot_is_cumulative() -> None:
+    # given
+    histogram = Histogram(buckets=(0.1, 1.0))
+
+    # when
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value)
+
+    # then
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {0.1: 1, 1.0: 3, float("inf"): 4}
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(6.25)
+
+
+def test_instrumented_runner_records_runtime_and_failures() -> None:
+    # given
+    metrics = Metrics()
+    runner = metrics.instrument("some_event", failing_handler)
+
+    # when
+    with pytest.raises(RuntimeError):
+        runner({})
+
+    # then
+    stats = build_stats(metrics, queue_depth=0, dropped={})
+    assert stats["topics"]["some_event"]["failed"] == 1
+    assert stats["handler_runtime_seconds"]["count"] == 1
+    assert stats["in_flight_handlers"] == 0
+
+
+def test_stats_without_metrics_only_report_queue_state() -> None:
+    # when
+    stats = build_stats(None, queue_depth=3, dropped={"some_event": 2})
+
+    # then
+    assert stats["enabled"] is False
+    assert stats["queue_depth"] == 3
+    assert stats["topics"] == {
+        "some_event": {"posted": 0, "dispatched": 0, "failed": 0, "dropped": 2}
+    }
+
+
+def test_prometheus_text_contains_counters_gauges_and_histograms() -> None:
+    # given
+    metrics = Metrics()
+    metrics.record_posted("some_event", 2)
+    metrics.record_dispatched("some_event", queue_wait=0.002)
+
+    # when
+    text = to_prometheus(build_stats(metrics, 1, {}), system='my "system"')
+
+    # then
+    labels = 'system="my \\"system\\"",topic="some_event"'
+    assert f"event_system_events_posted_total{{{labels}}} 2" in text
+    assert f"event_system_events_dispatched_total{{{labels}}} 1" in text
+    assert 'event_system_queue_depth{system="my \\"system\\""} 1' in text
+    assert "# TYPE event_system_queue_wait_seconds histogram" in text
+    assert (
+        'event_system_queue_wait_seconds_bucket{system="my \\"system\\"",le="0.005"} 1'
+        in text
+    )
+    assert (
+        'event_system_queue_wait_seconds_bucket{system="my \\"system\\"",le="+Inf"} 1'
+        in text
+    )
+
+
+def test_serve_metrics_serves_rendered_text() -> None:
+    # given
+    server = serve_metrics(lambda: "some_metric 1\n", port=0)
+
+    try:
+        # when
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode()
+
+        # then
+        assert body == "some_metric 1\n"
+    finally:
+        server.shutdown()
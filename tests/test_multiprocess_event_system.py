@@ -0,0 +1,138 @@
+import os
+from typing import Any, Dict, List
+import pytest
+from event_systems.instanced.multiprocess_event_system import MultiprocessEventSystem
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+from tests.helpers.dummy_handlers import (
+    announcing_worker_setup,
+    exiting_worker_setup,
+    failing_worker_setup,
+    squaring_worker_setup,
+)
+
+
+def test_workers_handle_parent_events_and_post_back() -> None:
+    # given
+    es = MultiprocessEventSystem(squaring_worker_setup, processes=2)
+    replies: List[Dict[str, Any]] = []
+    es.subscribe("squared", replies.append)
+    es.start()
+
+    # when
+    for n in range(200):
+        es.post("square", {"n": n})
+    es.process_all_events()
+    es.stop()
+
+    # then every event was handled once, in a worker, and its reply reached the parent
+    assert sorted(reply["square"] for reply in replies) == [n**2 for n in range(200)]
+    pids = {reply["pid"] for reply in replies}
+    assert len(pids) == 2
+    assert os.getpid() not in pids
+
+
+def test_partition_key_pins_events_to_one_worker() -> None:
+    # given
+    es = MultiprocessEventSystem(squaring_worker_setup, processes=2)
+    replies: List[Dict[str, Any]] = []
+    es.subscribe("squared", replies.append)
+    es.start()
+
+    # when
+    for n in range(50):
+        es.post("square", {"n": n}, partition_key="some_key")
+    es.process_all_events()
+    es.stop()
+
+    # then
+    assert len(replies) == 50
+    assert len({reply["pid"] for reply in replies}) == 1
+
+
+def test_events_posted_during_worker_setup_keep_their_order() -> None:
+    # given
+    es = MultiprocessEventSystem(announcing_worker_setup, processes=1, batch_size=8)
+    announced: List[int] = []
+    es.subscribe("announced", lambda data: announced.append(data["n"]))
+    es.start()
+
+    # when
+    es.post("announce_more", {})
+    es.process_all_events()
+    es.stop()
+
+    # then
+    assert announced == list(range(501))
+
+
+def test_restarting_keeps_one_parent_event_system() -> None:
+    # given
+    es = MultiprocessEventSystem(squaring_worker_setup, processes=1)
+    instances = len(ThreadedEventSystem.instances)
+
+    # when
+    for _ in range(2):
+        es.start()
+        es.stop()
+
+    # then
+    assert len(ThreadedEventSystem.instances) == instances
+
+
+def test_stop_without_start_does_nothing() -> None:
+    # given
+    es = MultiprocessEventSystem(squaring_worker_setup, processes=1)
+
+    # when
+    es.stop()
+
+    # then
+    assert not es.is_running()
+
+
+def test_post_without_subscriptions_raises_error() -> None:
+    # given
+    es = MultiprocessEventSystem(squaring_worker_setup, processes=1)
+    es.start()
+
+    # when & then
+    try:
+        with pytest.raises(ValueError):
+            es.post("unknown_event", {})
+    finally:
+        es.stop()
+
+
+def test_failing_worker_setup_fails_start() -> None:
+    # given
+    es = MultiprocessEventSystem(failing_worker_setup, processes=2)
+
+    # when & then
+    with pytest.raises(RuntimeError, match="setup failed"):
+        es.start()
+    assert not es.is_running()
+
+
+def test_worker_exiting_during_setup_fails_start() -> None:
+    # given
+    es = MultiprocessEventSystem(exiting_worker_setup, processes=2)
+
+    # when & then
+    with pytest.raises(RuntimeError, match="exit code 3"):
+        es.start()
+    assert not es.is_running()
+
+
+def test_stop_shuts_workers_down_when_one_has_died() -> None:
+    # given
+    es = MultiprocessEventSystem(squaring_worker_setup, processes=2)
+    es.start()
+    workers = list(es._workers)
+    workers[0].kill()
+    workers[0].join()
+
+    # when & then
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        es.stop()
+    assert not any(worker.is_alive() for worker in workers)
+    assert not es.is_running()
@@ -0,0 +1,58 @@
+from event_systems.base.handler import Execution
+from event_systems.base.retry import DeadLetterQueue, FailedDelivery, RetryPolicy
+from event_systems.base.subscription import Subscription
+
+
+def _delivery(event_name: str) -> FailedDelivery:
+    subscription = Subscription(event_name, print)
+    return FailedDelivery(subscription, Execution.THREAD, print, event_name, {})
+
+
+def test_backoff_doubles_up_to_the_maximum() -> None:
+    # given
+    policy = RetryPolicy(initial_delay=0.1, max_delay=0.5, jitter=False)
+
+    # when
+    delays = [policy.delay(attempts) for attempts in range(1, 6)]
+
+    # then
+    assert delays == [0.1, 0.2, 0.4, 0.5, 0.5]
+    assert policy.delay(10_000) == 0.5
+
+
+def test_jitter_stays_within_the_backoff() -> None:
+    # given
+    policy = RetryPolicy(initial_delay=1.0, max_delay=4.0)
+
+    # when
+    delays = [policy.delay(3) for _ in range(1000)]
+
+    # then
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_delivery_fails_until_out_of_attempts() -> None:
+    # given
+    delivery = _delivery("some_event")
+    delivery.subscription.retry = RetryPolicy(max_attempts=2, jitter=False)
+
+    # when & then
+    assert delivery.fail(RuntimeError()) == 0.1
+    assert delivery.fail(RuntimeError()) is None
+    assert delivery.attempts == 2
+
+
+def test_full_dead_letter_queue_discards_oldest_and_takes_by_predicate() -> None:
+    # given
+    letters = DeadLetterQueue(maxlen=2)
+
+    # when
+    for event_name in ("a", "b", "c"):
+        letters.append(_delivery(event_name))
+    taken = letters.take(lambda delivery: delivery.event_name == "c")
+
+    # then
+    assert letters.discarded == {"a": 1}
+    assert [delivery.event_name for delivery in taken] == ["c"]
+    assert [delivery.event_name for delivery in letters.peek()] == ["b"]
@@ -0,0 +1,202 @@
+import multiprocessing
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+import pytest
+from event_systems.base.socket_bridge import BridgeReceiver, BridgeSender
+from event_systems.instanced.threaded_event_system import ThreadedEventSystem
+
+
+def run_receiver(
+    address: str,
+    received: "multiprocessing.Queue[Dict[str, Any]]",
+    ready: Any,
+    done: Any,
+) -> None:
+    es = ThreadedEventSystem()
+    es.subscribe("bridged", received.put)
+    es.start()
+    receiver = BridgeReceiver(es, address)
+    receiver.start()
+    ready.set()
+    done.wait()
+    receiver.stop()
+    es.stop()
+
+
+def test_sender_buffers_until_receiver_process_is_up(tmp_path: Path) -> None:
+    # given a sender whose receiver, in another process, isn't listening yet
+    address = str(tmp_path / "bridge.sock")
+    es = ThreadedEventSystem()
+    es.start()
+    sender = BridgeSender(es, address, ["bridged"], batch_size=16)
+    sender.start()
+    for n in range(100):
+        es.post("bridged", {"n": n})
+
+    # when
+    received: "multiprocessing.Queue[Dict[str, Any]]" = multiprocessing.Queue()
+    ready, done = multiprocessing.Event(), multiprocessing.Event()
+    child = multiprocessing.Process(
+        target=run_receiver, args=(address, received, ready, done)
+    )
+    child.start()
+    ready.wait()
+    es.process_all_events()
+    assert sender.flush(timeout=10)
+    events = sorted(received.get(timeout=10)["n"] for _ in range(100))
+    done.set()
+    child.join()
+    sender.stop()
+    es.stop()
+
+    # then
+    assert events == list(range(100))
+    assert sender.dropped == 0
+
+
+def test_sender_reconnects_to_restarted_receiver() -> None:
+    # given
+    remote = ThreadedEventSystem()
+    calls: List[int] = []
+    lock = threading.Lock()
+
+    def record(data: Dict[str, Any]) -> None:
+        with lock:
+            calls.append(data["n"])
+
+    remote.subscribe("bridged", record)
+    remote.start()
+    receiver = BridgeReceiver(remote, ("127.0.0.1", 0))
+    receiver.start()
+
+    es = ThreadedEventSystem()
+    es.start()
+    sender = BridgeSender(es, receiver.address, ["bridged"], max_reconnect_delay=0.05)
+    sender.start()
+
+    # when
+    for n in range(10):
+        es.post("bridged", {"n": n})
+    es.process_all_events()
+    assert sender.flush(timeout=10)
+    receiver.stop()
+    for n in range(10, 20):
+        es.post("bridged", {"n": n})
+    es.process_all_events()
+    restarted = BridgeReceiver(remote, receiver.address)
+    restarted.start()
+    assert sender.flush(timeout=10)
+    remote.process_all_events()
+
+    sender.stop()
+    es.stop()
+    restarted.stop()
+    remote.stop()
+
+    # then
+    assert sorted(calls) == list(range(20))
+    assert sender.connects == 2
+    assert restarted.received == 10
+
+
+def test_sender_rejects_wildcard_topics() -> None:
+    # given
+    es = ThreadedEventSystem()
+
+    # when & then
+    with pytest.raises(ValueError):
+        BridgeSender(es, ("127.0.0.1", 9), ["orders.*"])
+
+
+def test_unserializable_event_is_dropped_without_stalling_the_sender() -> None:
+    # given
+    remote = ThreadedEventSystem()
+    calls: List[int] = []
+    remote.subscribe("bridged", lambda data: calls.append(data["n"]))
+    remote.start()
+    receiver = BridgeReceiver(remote, ("127.0.0.1", 0))
+    receiver.start()
+
+    es = ThreadedEventSystem()
+    es.start()
+    sender = BridgeSender(es, receiver.address, ["bridged"], max_buffered=4)
+    sender.start()
+
+    # when
+    es.post("bridged", {"n": object()})
+    for n in range(20):
+        es.post("bridged", {"n": n})
+    es.process_all_events()
+    assert sender.flush(timeout=10)
+    remote.process_all_events()
+
+    sender.stop()
+    es.stop()
+    receiver.stop()
+    remote.stop()
+
+    # then
+    assert sorted(calls) == list(range(20))
+    assert sender.dropped == 1
+
+
+def test_events_the_receiver_cannot_post_are_acknowledged_as_rejected() -> None:
+    # given a remote system which isn't running, so posting to it fails
+    remote = ThreadedEventSystem()
+    remote.subscribe("bridged", lambda data: None)
+    receiver = BridgeReceiver(remote, ("127.0.0.1", 0))
+    receiver.start()
+
+    es = ThreadedEventSystem()
+    es.start()
+    sender = BridgeSender(es, receiver.address, ["bridged"])
+    sender.start()
+
+    # when
+    for n in range(5):
+        es.post("bridged", {"n": n})
+    es.process_all_events()
+    flushed = sender.flush(timeout=10)
+
+    sender.stop()
+    es.stop()
+    receiver.stop()
+
+    # then
+    assert flushed
+    assert sender.connects == 1
+    assert sender.rejected == 5
+    assert receiver.dropped == {"bridged": 5}
+
+
+def test_full_buffer_drops_bridged_events_without_stalling_other_topics() -> None:
+    # given a sender whose receiver isn't listening
+    with socket.socket() as unused:
+        unused.bind(("127.0.0.1", 0))
+        address = unused.getsockname()
+    es = ThreadedEventSystem()
+    handled: List[int] = []
+    es.subscribe("local", lambda data: handled.append(data["n"]))
+    es.start()
+    sender = BridgeSender(es, address, ["bridged"], max_buffered=2, block_timeout=0.05)
+    sender.start()
+
+    # when
+    start = time.monotonic()
+    for n in range(10):
+        es.post("bridged", {"n": n})
+        es.post("local", {"n": n})
+    es.process_all_events()
+    elapsed = time.monotonic() - start
+    dropped = sender.dropped
+
+    sender.stop(timeout=0.1)
+    es.stop()
+
+    # then only the first event which found the buffer full waited for room
+    assert sorted(handled) == list(range(10))
+    assert dropped == 8
+    assert elapsed < 1.0
@@ -1,6 +1,17 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+from queue import Full
+from typing import Any, Dict, List
 import pytest
+from event_systems.base.envelope import Envelope
+from event_systems.base.event_queue import Overflow
+from event_systems.base.handler import Execution
+from event_systems.base.journal import Fsync, Journal
+from event_systems.base.retry import RetryPolicy
 from event_systems.instanced.threaded_event_system import ThreadedEventSystem
-from tests.helpers.dummy_handlers import dummy_handler
+from tests.helpers.dummy_handlers import dummy_handler, failing_handler
 
 
 def test_two_instances_with_different_threads_dont_interfere(
@@ -35,3 +46,437 @@ def test_two_instances_with_different_threads_dont_interfere(
     assert len(es_2.get_subscriptions()) == 0
     out, _ = capsys.readouterr()
     assert out == "data 1\ndata 2\n"
+
+
+def test_stop_processes_pending_events_and_terminates_dispatcher(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # given
+    es = ThreadedEventSystem()
+    es.subscribe("some_event", dummy_handler)
+    es.start()
+    dispatcher = es._dispatcher
+
+    # when
+    es.post("some_event", {"dummy_data": "pending"})
+    es.stop()
+
+    # then
+    out, _ = capsys.readouterr()
+    assert out == "pending\n"
+    assert not dispatcher.is_alive()
+
+
+def test_idle_dispatcher_does_not_spin() -> None:
+    # given
+    es = ThreadedEventSystem()
+    es.subscribe("some_event", dummy_handler)
+    es.start()
+
+    # when
+    cpu_start = time.process_time()
+    time.sleep(0.5)
+    cpu = time.process_time() - cpu_start
+    es.stop()
+
+    # then a busy-spinning dispatcher would burn roughly the whole interval
+    assert cpu < 0.1
+
+
+@pytest.mark.parametrize(
+    "overflow, expected_handled",
+    [
+        (Overflow.DROP_NEWEST, [1, 2, 3]),
+        (Overflow.DROP_OLDEST, [1, 3, 4]),
+    ],
+)
+def test_bounded_queue_drops_events_according_to_overflow(
+    overflow: Overflow,
+    expected_handled: List[int],
+) -> None:
+    # given
+    es = ThreadedEventSystem(max_queue_size=2, overflow=overflow)
+    started, release = threading.Event(), threading.Event()
+    handled: List[int] = []
+
+    def blocking_handler(data: Dict[str, Any]) -> None:
+        started.set()
+        release.wait()
+        handled.append(data["index"])
+
+    es.subscribe("some_event", blocking_handler)
+    es.start()
+
+    # when the first event blocks the only worker, the queue fills up
+    es.post("some_event", {"index": 1})
+    started.wait()
+    for index in (2, 3, 4):
+        es.post("some_event", {"index": index})
+    release.set()
+    es.process_all_events()
+
+    # then
+    assert es.get_dropped_events() == {"some_event": 1}
+    es.stop()
+    assert handled == expected_handled
+
+
+def test_bounded_queue_with_raise_overflow_raises_when_full() -> None:
+    # given
+    es = ThreadedEventSystem(max_queue_size=1, overflow=Overflow.RAISE)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_handler(data: Dict[str, Any]) -> None:
+        started.set()
+        release.wait()
+
+    es.subscribe("some_event", blocking_handler)
+    es.start()
+    es.post("some_event", {})
+    started.wait()
+    es.post("some_event", {})
+
+    # when & then
+    with pytest.raises(Full):
+        es.post("some_event", {})
+    with pytest.raises(Full):
+        es.post_many([("some_event", {}), ("some_event", {})])
+
+    release.set()
+    es.stop()
+
+
+def test_coroutine_handlers_reuse_worker_loop_until_stop() -> None:
+    # given
+    es = ThreadedEventSystem()
+    loops: List[asyncio.AbstractEventLoop] = []
+
+    async def loop_recording_handler(data: Dict[str, Any]) -> None:
+        loops.append(asyncio.get_running_loop())
+
+    es.subscribe("some_event", loop_recording_handler)
+    es.start()
+
+    # when
+    for _ in range(3):
+        es.post("some_event", {})
+    es.process_all_events()
+    es.stop()
+
+    # then the single worker ran every event on the same loop, which stop() closed
+    assert len(loops) == 3
+    assert loops[0] is loops[1] is loops[2]
+    assert loops[0].is_closed()
+
+
+def test_metrics_count_posted_and_dispatched_events() -> None:
+    # given
+    es = ThreadedEventSystem(metrics=True)
+    es.subscribe("some_event", dummy_handler)
+    es.start()
+
+    # when
+    es.post("some_event", {"dummy_data": 1})
+    es.post_many([("some_event", {"dummy_data": 2}), ("some_event", {"dummy_data": 3})])
+    es.process_all_events()
+    stats = es.stats()
+    es.stop()
+
+    # then
+    assert stats["topics"]["some_event"] == {
+        "posted": 3,
+        "dispatched": 3,
+        "failed": 0,
+        "dropped": 0,
+    }
+    assert stats["queue_wait_seconds"]["count"] == 3
+    assert stats["handler_runtime_seconds"]["count"] == 3
+    assert stats["in_flight_handlers"] == 0
+    assert "event_system_events_posted_total" in es.prometheus_text()
+
+
+def test_subscription_churn_under_posting_load_loses_no_events() -> None:
+    # given
+    es = ThreadedEventSystem()
+    received: List[int] = []
+    es.subscribe("tick", lambda data: received.append(data["i"]))
+    es.start()
+    churning = threading.Event()
+    churning.set()
+    churn_count = 0
+
+    def churn() -> None:
+        nonlocal churn_count
+        while churning.is_set():
+            es.subscribe("tick", dummy_handler).cancel()
+            churn_count += 1
+
+    churner = threading.Thread(target=churn)
+    churner.start()
+
+    # when
+    for i in range(5000):
+        es.post("tick", {"i": i})
+    es.process_all_events()
+    churning.clear()
+    churner.join()
+    es.stop()
+
+    # then
+    assert churn_count > 0
+    assert received == list(range(5000))
+
+
+def test_priorities_dispatch_urgent_events_first() -> None:
+    # given
+    es = ThreadedEventSystem(priorities=True)
+    calls: List[str] = []
+    started, release = threading.Event(), threading.Event()
+
+    def record(data: Dict[str, Any]) -> None:
+        if data["dummy_data"] == "blocking":
+            started.set()
+            release.wait()
+        calls.append(data["dummy_data"])
+
+    es.subscribe("some_event", record)
+    es.start()
+    es.post("some_event", {"dummy_data": "blocking"})
+    started.wait()
+
+    # when
+    es.post("some_event", {"dummy_data": "telemetry"}, priority=5)
+    es.post("some_event", {"dummy_data": "shutdown"}, priority=-1)
+    release.set()
+    es.process_all_events()
+    es.stop()
+
+    # then
+    assert calls == ["blocking", "shutdown", "telemetry"]
+
+
+def test_coalesced_events_deliver_latest_data_per_key() -> None:
+    # given
+    es = ThreadedEventSystem()
+    calls: List[Any] = []
+    started, release = threading.Event(), threading.Event()
+
+    def record(data: Dict[str, Any]) -> None:
+        if data["symbol"] == "blocking":
+            started.set()
+            release.wait()
+        calls.append((data["symbol"], data["price"]))
+
+    es.subscribe("price", record)
+    es.start()
+    es.post("price", {"symbol": "blocking", "price": 0})
+    started.wait()
+
+    # when
+    for price in range(100):
+        for symbol in ("BTC", "ETH"):
+            es.post("price", {"symbol": symbol, "price": price}, coalesce_key=symbol)
+    release.set()
+    es.process_all_events()
+    es.stop()
+
+    # then
+    assert calls == [("blocking", 0), ("BTC", 99), ("ETH", 99)]
+
+
+def test_partitioned_events_keep_order_per_key_and_run_keys_in_parallel() -> None:
+    # given
+    es = ThreadedEventSystem(workers=4)
+    calls: Dict[str, List[int]] = {"a": [], "b": []}
+    both_running = threading.Barrier(2, timeout=5)
+
+    def record(data: Dict[str, Any]) -> None:
+        if data["sequence"] == 0:
+            # Only passes if the first events of both keys run at the same time.
+            both_running.wait()
+        time.sleep(0.001)
+        calls[data["key"]].append(data["sequence"])
+
+    es.subscribe("update", record)
+    es.start()
+
+    # when
+    for sequence in range(20):
+        for key in ("a", "b"):
+            es.post("update", {"key": key, "sequence": sequence}, partition_key=key)
+    es.process_all_events()
+    es.stop()
+
+    # then
+    assert calls == {"a": list(range(20)), "b": list(range(20))}
+
+
+@pytest.mark.parametrize("flush_timers", [True, False])
+def test_stop_flushes_or_discards_pending_timers(flush_timers: bool) -> None:
+    # given
+    es = ThreadedEventSystem(flush_timers=flush_timers)
+    calls: List[str] = []
+    es.subscribe("some_event", lambda data: calls.append(data["dummy_data"]))
+    es.start()
+    timer = es.post_after(60, "some_event", {"dummy_data": "later"})
+
+    # when
+    es.stop()
+
+    # then
+    assert calls == (["later"] if flush_timers else [])
+    assert not timer.active
+
+
+def test_post_and_collect_fails_when_bounded_queue_drops_event() -> None:
+    # given
+    es = ThreadedEventSystem(max_queue_size=1, overflow=Overflow.DROP_OLDEST)
+    started, release = threading.Event(), threading.Event()
+
+    def block(data: Dict[str, Any]) -> None:
+        if data["dummy_data"] == "blocking":
+            started.set()
+            release.wait()
+
+    es.subscribe("some_event", block)
+    es.start()
+    es.post("some_event", {"dummy_data": "blocking"})
+    started.wait()
+
+    # when
+    dropped = es.post_and_collect("some_event", {"dummy_data": "dropped"})
+    collected = es.post_and_collect("some_event", {"dummy_data": "collected"})
+    release.set()
+
+    # then
+    with pytest.raises(Full):
+        dropped.result(timeout=5)
+    assert collected.result(timeout=5) == [None]
+    es.stop()
+
+
+def test_journaled_events_are_replayed_after_a_crash(tmp_path: Path) -> None:
+    # given a run which dies while its handlers are blocked
+    es = ThreadedEventSystem(journal=Journal(tmp_path, Fsync.ALWAYS))
+    release = threading.Event()
+    es.subscribe("some_event", lambda data: release.wait())
+    es.start()
+    for i in range(3):
+        es.post("some_event", {"i": i})
+
+    # when
+    pending = Journal(tmp_path, Fsync.NEVER).open()
+    release.set()
+    es.stop()
+
+    # then
+    assert [envelope.data["i"] for envelope in pending] == [0, 1, 2]
+    assert Journal(tmp_path, Fsync.NEVER).open() == []
+
+
+def test_handled_events_are_not_replayed_after_a_crash(tmp_path: Path) -> None:
+    # given
+    es = ThreadedEventSystem(
+        journal=Journal(tmp_path, Fsync.ALWAYS, checkpoint_interval=0.01)
+    )
+    es.subscribe("some_event", lambda data: None, Execution.INLINE)
+    es.start()
+    for i in range(2):
+        es.post("some_event", {"i": i})
+    es.process_all_events()
+
+    # when the process dies after the next checkpoint, but before closing the journal
+    time.sleep(0.2)
+    replayed = Journal(tmp_path, Fsync.NEVER).open()
+    es.stop()
+
+    # then
+    assert replayed == []
+
+
+def test_start_replays_the_journal_and_acknowledges_handled_events(
+    tmp_path: Path,
+) -> None:
+    # given
+    journal = Journal(tmp_path, Fsync.NEVER)
+    journal.open()
+    journal.append_many(
+        [Envelope("some_event", {"i": i}) for i in range(3)]
+        + [Envelope("other_event", {"i": 3})]
+    )
+    es = ThreadedEventSystem(journal=Journal(tmp_path, Fsync.NEVER))
+    calls: List[int] = []
+    es.subscribe("some_event", lambda data: calls.append(data["i"]))
+
+    # when
+    es.start()
+    es.process_all_events()
+    es.post("some_event", {"i": 4}, coalesce_key="key")
+    es.stop()
+
+    # then
+    assert sorted(calls) == [0, 1, 2, 4]
+    assert Journal(tmp_path, Fsync.NEVER).open() == []
+
+
+def test_journaled_event_stays_pending_while_its_handler_backs_off(
+    tmp_path: Path,
+) -> None:
+    # given
+    journal = Journal(tmp_path, Fsync.NEVER)
+    es = ThreadedEventSystem(journal=journal)
+    policy = RetryPolicy(initial_delay=60, jitter=False)
+    es.subscribe("some_event", failing_handler, Execution.INLINE, retry=policy)
+    es.start()
+    es.post("some_event", {"dummy_data": "boom"})
+    es._event_queue.join()
+
+    # when the process dies during the backoff
+    journal.compact()
+    pending = Journal(tmp_path, Fsync.NEVER).open()
+    es.stop()
+
+    # then the event is replayed, and acknowledged once it is dead-lettered
+    assert [envelope.data for envelope in pending] == [{"dummy_data": "boom"}]
+    assert len(es.dead_letters) == 1
+    assert Journal(tmp_path, Fsync.NEVER).open() == []
+
+
+def test_failing_process_handler_is_retried_and_dead_lettered() -> None:
+    # given
+    es = ThreadedEventSystem()
+    es.subscribe(
+        "some_event",
+        failing_handler,
+        Execution.PROCESS,
+        retry=RetryPolicy(max_attempts=2, initial_delay=0.001),
+    )
+    es.start()
+
+    # when
+    es.post("some_event", {"dummy_data": "boom"})
+    es.process_all_events()
+    es.stop()
+
+    # then
+    (letter,) = es.dead_letters.peek()
+    assert letter.attempts == 2
+    assert str(letter.exception) == "boom"
+
+
+def test_stop_dead_letters_pending_retries() -> None:
+    # given
+    es = ThreadedEventSystem()
+    policy = RetryPolicy(initial_delay=60, jitter=False)
+    es.subscribe("some_event", failing_handler, retry=policy)
+    es.start()
+    es.post("some_event", {"dummy_data": "boom"})
+    while not es._timers:
+        time.sleep(0.001)
+
+    # when
+    es.stop()
+
+    # then
+    (letter,) = es.dead_letters.peek()
+    assert letter.attempts == 1
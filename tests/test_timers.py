@@ -0,0 +1,46 @@
+from event_systems.base.envelope import Envelope
+from event_systems.base.timers import TimerHeap
+
+
+def test_due_timers_pop_in_deadline_order() -> None:
+    # given
+    heap = TimerHeap()
+    for when in (3.0, 1.0, 2.0, 5.0):
+        heap.push(when, Envelope("some_event", {"when": when}))
+
+    # when
+    due = heap.pop_due(3.0)
+
+    # then
+    assert [timer.when for timer in due] == [1.0, 2.0, 3.0]
+    assert all(not timer.active for timer in due)
+    assert heap.next_deadline() == 5.0
+    assert len(heap) == 1
+
+
+def test_push_tells_whether_timer_is_earliest() -> None:
+    # given
+    heap = TimerHeap()
+
+    # when & then
+    assert heap.push(2.0, Envelope("some_event", {}))[1]
+    assert not heap.push(3.0, Envelope("some_event", {}))[1]
+    assert heap.push(1.0, Envelope("some_event", {}))[1]
+
+
+def test_cancelled_timers_are_skipped_and_compacted() -> None:
+    # given
+    heap = TimerHeap()
+    timers = [heap.push(float(i), Envelope("some_event", {}))[0] for i in range(200)]
+
+    # when
+    cancelled = [timer.cancel() for timer in timers[:150]]
+
+    # then
+    assert all(cancelled)
+    assert not timers[0].cancel()
+    assert len(heap) == 50
+    assert len(heap._entries) < 200
+    assert heap.next_deadline() == 150.0
+    assert [timer.when for timer in heap.pop_all()] == [float(i) for i in range(150, 200)]
+    assert heap.next_deadline() is None
@@ -0,0 +1,47 @@
+from event_systems.base.topic_trie import TopicTrie, is_pattern
+
+
+def test_is_pattern_detects_wildcard_segments() -> None:
+    assert is_pattern("orders.*")
+    assert is_pattern("#")
+    assert not is_pattern("orders.eu")
+    assert not is_pattern("orders.eu*")
+
+
+def test_one_segment_wildcard_matches_exactly_one_segment() -> None:
+    # given
+    trie = TopicTrie()
+    trie.add("orders.*")
+
+    # when & then
+    assert trie.match("orders.eu") == {"orders.*"}
+    assert trie.match("orders") == set()
+    assert trie.match("orders.eu.limit") == set()
+
+
+def test_any_segments_wildcard_matches_zero_or_more_segments() -> None:
+    # given
+    trie = TopicTrie()
+    trie.add("orders.#")
+    trie.add("#.limit")
+
+    # when & then
+    assert trie.match("orders") == {"orders.#"}
+    assert trie.match("orders.eu.limit") == {"orders.#", "#.limit"}
+    assert trie.match("trades.us.limit") == {"#.limit"}
+    assert trie.match("trades.us") == set()
+
+
+def test_remove_prunes_pattern_and_keeps_others() -> None:
+    # given
+    trie = TopicTrie()
+    trie.add("orders.*.limit")
+    trie.add("orders.#")
+
+    # when
+    trie.remove("orders.*.limit")
+
+    # then
+    assert trie.match("orders.eu.limit") == {"orders.#"}
+    trie.remove("orders.#")
+    assert not trie